@@ -0,0 +1,137 @@
+"""
+Benchmark the in-browser base64 decoders used for embedded assets.
+
+Collects the non-Python assets of the bundled example apps, base64-encodes
+them exactly as `iter_app_file_entries` does, and writes a self-contained HTML
+page that times each decoder on them:
+
+* ``atob loop``       - ``atob`` + a ``charCodeAt`` loop, the fallback for small payloads.
+* ``fetch data: URL`` - the fallback used for payloads over 64 KiB.
+* ``fromBase64``      - ``Uint8Array.fromBase64``, preferred where the browser supports it.
+
+Each decoder is timed decoding the assets one after another and all at once
+(as ``resolveFiles`` does). Open the page in a browser to see the results, or
+pass ``--node`` to run the same benchmark with Node.js (``fromBase64`` is
+skipped if the runtime does not provide it).
+
+Usage::
+
+    python benchmarks/decode_benchmark.py [--output decode_benchmark.html] [--repeat 5] [--node]
+"""
+import argparse
+import base64
+import json
+import os
+import shutil
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+EXAMPLE_DIR = os.path.join(REPO_ROOT, 'example')
+
+BENCHMARK_JS = r"""
+const decoders = {
+  "atob loop": async (n) => { const i = atob(n), a = i.length, l = new Uint8Array(a); for (let u = 0; u < a; u++) l[u] = i.charCodeAt(u); return l; },
+  "fetch data: URL": async (n) => new Uint8Array(await (await fetch("data:application/octet-stream;base64," + n)).arrayBuffer()),
+};
+if (Uint8Array.fromBase64) decoders["fromBase64"] = async (n) => Uint8Array.fromBase64(n);
+
+async function timeIt(fn, repeat) {
+  let best = Infinity;
+  for (let r = 0; r < repeat; r++) {
+    const t0 = performance.now();
+    await fn();
+    best = Math.min(best, performance.now() - t0);
+  }
+  return best;
+}
+
+async function runBenchmark(assets, repeat) {
+  const payloads = Object.values(assets);
+  const totalBytes = payloads.reduce((s, p) => s + Math.floor(p.length * 3 / 4), 0);
+  const results = [];
+  for (const [name, decode] of Object.entries(decoders)) {
+    const sequential = await timeIt(async () => { for (const p of payloads) await decode(p); }, repeat);
+    const concurrent = await timeIt(() => Promise.all(payloads.map(decode)), repeat);
+    results.push({ decoder: name, sequential_ms: +sequential.toFixed(2), concurrent_ms: +concurrent.toFixed(2),
+                   mb_per_s: +(totalBytes / 1e6 / (Math.min(sequential, concurrent) / 1000)).toFixed(1) });
+  }
+  return { assets: payloads.length, bytes: totalBytes, repeat, results };
+}
+"""
+
+PAGE_TEMPLATE = """<!doctype html>
+<html>
+<head><meta charset="UTF-8"><title>script2stlite decoder benchmark</title></head>
+<body>
+<h1>script2stlite decoder benchmark</h1>
+<pre id="out">Running...</pre>
+<script type="module">
+{js}
+const assets = {assets};
+runBenchmark(assets, {repeat}).then((r) => {{
+  document.getElementById("out").textContent = JSON.stringify(r, null, 2);
+}});
+</script>
+</body>
+</html>
+"""
+
+NODE_TEMPLATE = """{js}
+const assets = {assets};
+runBenchmark(assets, {repeat}).then((r) => console.log(JSON.stringify(r, null, 2)));
+"""
+
+
+def collect_assets(example_dir: str = EXAMPLE_DIR) -> dict:
+    """
+    Return the base64-encoded non-Python assets of the example apps.
+
+    Parameters
+    ----------
+    example_dir : str, optional
+        Directory containing the example apps.
+
+    Returns
+    -------
+    dict
+        Mapping of ``'<example>/<relative path>'`` to base64 text.
+    """
+    assets = {}
+    for root, dirs, files in os.walk(example_dir):
+        dirs[:] = sorted(d for d in dirs if not d.startswith('.') and d != '__pycache__')
+        for name in sorted(files):
+            if name.endswith(('.py', '.html', '.yaml', '.txt')):
+                continue  # code, previous build outputs and settings are not embedded as base64
+            path = os.path.join(root, name)
+            with open(path, 'rb') as f:
+                assets[os.path.relpath(path, example_dir)] = base64.b64encode(f.read()).decode('ascii')
+    return assets
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark in-browser base64 decoders on the example apps' assets.")
+    parser.add_argument('--output', default='decode_benchmark.html', help="Path of the generated benchmark page.")
+    parser.add_argument('--repeat', type=int, default=5, help="Runs per decoder; the best time is reported.")
+    parser.add_argument('--node', action='store_true', help="Also run the benchmark with Node.js.")
+    args = parser.parse_args()
+
+    assets = collect_assets()
+    payload = json.dumps(assets)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        f.write(PAGE_TEMPLATE.format(js=BENCHMARK_JS, assets=payload, repeat=args.repeat))
+    print(f"* Wrote {args.output} ({len(assets)} assets). Open it in a browser to run the benchmark.")
+
+    if args.node:
+        node = shutil.which('node')
+        if node is None:
+            print("* Node.js not found; skipping.")
+            return 1
+        return subprocess.run([node, '--input-type=module', '-'],
+                              input=NODE_TEMPLATE.format(js=BENCHMARK_JS, assets=payload, repeat=args.repeat),
+                              text=True).returncode
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,154 @@
+"""
+Compare page startup cost of the two embedding modes on the bundled example apps.
+
+Each example app is converted twice, with ``EMBED_MODE: inline`` (payloads in
+JavaScript string literals inside the module script) and ``EMBED_MODE: blocks``
+(payloads in non-executable ``<script>`` blocks read at mount time). For each
+build the script reports the HTML size and the size of the module script that
+the JavaScript engine has to parse.
+
+With ``--node``, the module script of each build is also timed in Node.js:
+
+* ``compile_ms`` - time to compile the module script.
+* ``startup_ms`` - time from loading the module script until ``mount()`` is
+  called with every file decoded (fresh process per run, median of ``--repeat``).
+
+``mount`` and ``document`` are stubbed; the ``<script>`` blocks are handed to the
+stub before timing starts, since a browser's HTML parser reads them (in both
+modes, the same bytes pass through the HTML tokenizer). Open the generated HTML
+files in a browser with the performance panel for end-to-end numbers.
+
+Usage::
+
+    python benchmarks/startup_benchmark.py [--output-dir startup_benchmark] [--repeat 5] [--node]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from script2stlite.functions import load_yaml_from_file  # noqa: E402
+from script2stlite.script2stlite import _s2s_convert_core  # noqa: E402
+
+EXAMPLE_DIR = os.path.join(REPO_ROOT, 'example')
+MODES = ('inline', 'blocks')
+
+MODULE_PATTERN = re.compile(r'<script type="module">(.*?)</script>', re.S)
+BLOCK_PATTERN = re.compile(r'<script type="application/octet-stream" id="([^"]+)">(.*?)</script>', re.S)
+IMPORT_PATTERN = re.compile(r'import \{ mount \} from "[^"]*"')
+
+RUNNER_JS = """
+import vm from "node:vm";
+import fs from "node:fs";
+globalThis.window = globalThis;
+const blocks = JSON.parse(fs.readFileSync(process.argv[3], "utf-8"));
+globalThis.document = {
+  baseURI: "http://localhost/",
+  getElementById: (id) => (id in blocks ? { textContent: blocks[id] } : {}),
+};
+let mounted;
+globalThis.__mounted = new Promise((resolve) => (mounted = resolve));
+globalThis.__mount = () => mounted(performance.now());
+const modulePath = process.argv[2];
+const source = fs.readFileSync(modulePath, "utf-8");
+const c0 = performance.now();
+new vm.Script("(async () => {" + source.replace(/^const mount = .*$/m, "") + "\\n})");
+const compileMs = performance.now() - c0;
+const t0 = performance.now();
+await import("file://" + modulePath);
+const startupMs = (await globalThis.__mounted) - t0;
+console.log(JSON.stringify({ compile_ms: compileMs, startup_ms: startupMs }));
+"""
+
+
+def build_examples(output_dir: str) -> list:
+    """Convert every example app in both embedding modes and return one record per build."""
+    records = []
+    for example in sorted(os.listdir(EXAMPLE_DIR)):
+        source = os.path.join(EXAMPLE_DIR, example)
+        settings_path = os.path.join(source, 'settings.yaml')
+        if not os.path.isfile(settings_path):
+            continue
+        for mode in MODES:
+            with tempfile.TemporaryDirectory() as tmp:
+                directory = os.path.join(tmp, example)
+                shutil.copytree(source, directory)
+                settings = load_yaml_from_file(os.path.join(directory, 'settings.yaml'))
+                settings['EMBED_MODE'] = mode
+                settings['BUILD_CACHE'] = False
+                with contextlib.redirect_stdout(io.StringIO()):
+                    built = _s2s_convert_core(settings, directory).output_path
+                target = os.path.join(output_dir, f'{example}.{mode}.html')
+                shutil.copyfile(built, target)
+            with open(target, 'r', encoding='utf-8') as f:
+                html = f.read()
+            records.append({
+                'example': example,
+                'mode': mode,
+                'html': target,
+                'html_bytes': len(html.encode('utf-8')),
+                'module_script_bytes': len(MODULE_PATTERN.search(html).group(1).encode('utf-8')),
+            })
+    return records
+
+
+def time_in_node(node: str, record: dict, work_dir: str, repeat: int) -> dict:
+    """Time compiling and starting the module script of one build in fresh Node.js processes."""
+    with open(record['html'], 'r', encoding='utf-8') as f:
+        html = f.read()
+    stem = os.path.join(work_dir, f"{record['example']}.{record['mode']}")
+    with open(stem + '.mjs', 'w', encoding='utf-8') as f:
+        f.write(IMPORT_PATTERN.sub('const mount = globalThis.__mount', MODULE_PATTERN.search(html).group(1)))
+    with open(stem + '.blocks.json', 'w', encoding='utf-8') as f:
+        json.dump(dict(BLOCK_PATTERN.findall(html)), f)
+    runner = os.path.join(work_dir, 'runner.mjs')
+    if not os.path.isfile(runner):
+        with open(runner, 'w', encoding='utf-8') as f:
+            f.write(RUNNER_JS)
+
+    runs = []
+    for _ in range(repeat):
+        result = subprocess.run([node, runner, stem + '.mjs', stem + '.blocks.json'],
+                                capture_output=True, text=True, check=True)
+        runs.append(json.loads(result.stdout.strip().splitlines()[-1]))
+    return {key: round(statistics.median(run[key] for run in runs), 2) for key in ('compile_ms', 'startup_ms')}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare startup cost of inline and block asset embedding.")
+    parser.add_argument('--output-dir', default='startup_benchmark', help="Directory for the generated HTML files.")
+    parser.add_argument('--repeat', type=int, default=5, help="Node.js runs per build; the median is reported.")
+    parser.add_argument('--node', action='store_true', help="Time the module scripts with Node.js.")
+    args = parser.parse_args()
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    records = build_examples(args.output_dir)
+
+    if args.node:
+        node = shutil.which('node')
+        if node is None:
+            print("* Node.js not found; skipping timings.")
+        else:
+            with tempfile.TemporaryDirectory() as work_dir:
+                for record in records:
+                    record.update(time_in_node(node, record, work_dir, args.repeat))
+
+    columns = ['example', 'mode', 'html_bytes', 'module_script_bytes', 'compile_ms', 'startup_ms']
+    print(' | '.join(columns))
+    for record in records:
+        print(' | '.join(str(record.get(column, '-')) for column in columns))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
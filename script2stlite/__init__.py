@@ -5,5 +5,9 @@ script2stlite - Convert Streamlit scripts to stlite HTML files
 __version__ = "0.1.0"  # Placeholder version
 
 from .script2stlite import Script2StliteConverter, convert_app
+from .batch import convert_many
+from .build_result import BuildResult, StageTiming
+from .in_memory import convert_to_bytes, convert_to_stream
 
-__all__ = ["Script2StliteConverter", "convert_app"]
+__all__ = ["Script2StliteConverter", "convert_app", "convert_many", "BuildResult", "StageTiming",
+           "convert_to_bytes", "convert_to_stream"]
@@ -0,0 +1,203 @@
+"""
+Batch conversion of many app directories across a process pool.
+
+The version indices are loaded once in the parent process and handed to every
+worker, and each worker parses the HTML template once, so the per-app cost is
+only discovery, encoding and writing. Conversions run in parallel with
+`ProcessPoolExecutor`, so throughput scales with the number of CPU cores.
+"""
+import contextlib
+import glob
+import io
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from .functions import load_all_versions, load_text_from_subfolder, load_yaml_from_file, folder_exists
+from .script2stlite import _s2s_convert_core
+from .template import parse_template
+
+# Version indices handed to each worker process by `_init_worker`.
+_WORKER_VERSIONS: Optional[Tuple[Any, ...]] = None
+
+
+def expand_app_directories(patterns: Union[str, Iterable[str]]) -> List[str]:
+    """
+    Expand directory paths and glob patterns into a sorted list of app directories.
+
+    Parameters
+    ----------
+    patterns : Union[str, Iterable[str]]
+        A directory, a glob pattern (e.g. ``'apps/*'``), or a list of either.
+
+    Returns
+    -------
+    List[str]
+        Matching directories, without duplicates.
+
+    Raises
+    ------
+    ValueError
+        If a plain path (not a pattern) is not an existing directory.
+    """
+    if isinstance(patterns, str):
+        patterns = [patterns]
+    directories = set()
+    for pattern in patterns:
+        if glob.has_magic(pattern):
+            directories.update(p for p in glob.glob(pattern) if folder_exists(p))
+        elif folder_exists(pattern):
+            directories.add(pattern)
+        else:
+            raise ValueError(f"* {pattern} does not exist on this system.")
+    return sorted(os.path.normpath(d) for d in directories)
+
+
+def _init_worker(versions: Tuple[Any, ...]) -> None:
+    """Store the shared version indices and parse the HTML template once per worker."""
+    global _WORKER_VERSIONS
+    _WORKER_VERSIONS = versions
+    parse_template(load_text_from_subfolder(subfolder='templates', filename='html_template.txt'))
+
+
+def _convert_one(task: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert a single app in a worker process and return its report entry."""
+    directory = task['directory']
+    report: Dict[str, Any] = {'directory': directory, 'output': None, 'status': 'ok', 'error': None, 'bytes': 0}
+    log = io.StringIO()
+    started = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(log):
+            settings_path = os.path.join(directory, 'settings.yaml')
+            if os.path.isfile(settings_path):
+                settings = load_yaml_from_file(settings_path)
+            elif task['entrypoint'] is not None:
+                settings = {
+                    'APP_NAME': os.path.basename(os.path.normpath(directory)),
+                    'APP_ENTRYPOINT': task['entrypoint'],
+                    'APP_FILES': [],
+                    'APP_REQUIREMENTS': [],
+                }
+            else:
+                raise ValueError(f"* No settings file found in {directory} and no entrypoint given.")
+            os.makedirs(task['output_dir'], exist_ok=True)
+            result = _s2s_convert_core(
+                settings=settings,
+                directory=directory,
+                stlite_version=task['stlite_version'],
+                pyodide_version=task['pyodide_version'],
+                packages=task['packages'],
+                versions=_WORKER_VERSIONS,
+                output_dir=task['output_dir']
+            )
+        report['output'] = result.output_path
+        report['bytes'] = result.html_bytes
+    except Exception as e:
+        report['status'] = 'failed'
+        report['error'] = str(e)
+        report['log'] = log.getvalue()
+    report['seconds'] = round(time.perf_counter() - started, 4)
+    return report
+
+
+def convert_many(
+    directories: Union[str, Iterable[str]],
+    output_dir: Optional[str] = None,
+    entrypoint: Optional[str] = None,
+    workers: Optional[int] = None,
+    stlite_version: Optional[str] = None,
+    pyodide_version: Optional[str] = None,
+    packages: Optional[Dict[str, str]] = None,
+    report_path: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Convert many Streamlit app directories in parallel.
+
+    Each directory is converted from its ``settings.yaml``; directories without one
+    are converted from `entrypoint` (if given), using the directory name as app name.
+
+    Parameters
+    ----------
+    directories : Union[str, Iterable[str]]
+        App directories and/or glob patterns (e.g. ``'apps/*'``).
+    output_dir : Optional[str], optional
+        If given, each app's HTML is written to ``<output_dir>/<app directory name>/``.
+        Otherwise it is written into the app's own directory.
+    entrypoint : Optional[str], optional
+        Entrypoint for directories without a ``settings.yaml``.
+    workers : Optional[int], optional
+        Number of worker processes. Defaults to the number of CPU cores.
+    stlite_version : Optional[str], optional
+        The specific version of stlite to use for every app.
+    pyodide_version : Optional[str], optional
+        The specific version of Pyodide to use for every app.
+    packages : Optional[Dict[str, str]], optional
+        Package version overrides applied to every app.
+    report_path : Optional[str], optional
+        If given, the consolidated report is also written to this path as JSON.
+
+    Returns
+    -------
+    Dict[str, Any]
+        The consolidated report: ``apps`` (one entry per app with ``directory``,
+        ``output``, ``status``, ``error``, ``seconds`` and ``bytes``), ``succeeded``,
+        ``failed``, ``total_bytes``, ``wall_seconds`` and ``workers``.
+
+    Raises
+    ------
+    ValueError
+        If a directory does not exist, or two apps would write to the same destination.
+    """
+    app_dirs = expand_app_directories(directories)
+    tasks = []
+    destinations = {}
+    for directory in app_dirs:
+        destination = directory
+        if output_dir is not None:
+            destination = os.path.join(output_dir, os.path.basename(os.path.normpath(directory)))
+        if destination in destinations:
+            raise ValueError(f"* {directory} and {destinations[destination]} would both be written to {destination}.")
+        destinations[destination] = directory
+        tasks.append({
+            'directory': directory,
+            'output_dir': destination,
+            'entrypoint': entrypoint,
+            'stlite_version': stlite_version,
+            'pyodide_version': pyodide_version,
+            'packages': packages,
+        })
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(tasks) or 1))
+
+    print(f"* Converting {len(tasks)} app(s) with {workers} worker process(es)...")
+    started = time.perf_counter()
+    versions = load_all_versions()  # loaded once, shared by every worker
+    apps = []
+    if tasks:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(versions,)) as executor:
+            futures = [executor.submit(_convert_one, task) for task in tasks]
+            for future in as_completed(futures):
+                app = future.result()
+                status = 'ok' if app['status'] == 'ok' else f"FAILED: {app['error']}"
+                print(f"  - {app['directory']} ({app['seconds']:.2f}s): {status}")
+                apps.append(app)
+    apps.sort(key=lambda a: a['directory'])
+
+    report = {
+        'apps': apps,
+        'succeeded': sum(1 for a in apps if a['status'] == 'ok'),
+        'failed': sum(1 for a in apps if a['status'] != 'ok'),
+        'total_bytes': sum(a['bytes'] for a in apps),
+        'wall_seconds': round(time.perf_counter() - started, 4),
+        'workers': workers,
+    }
+    print(f"* Converted {report['succeeded']}/{len(apps)} app(s) in {report['wall_seconds']:.2f}s "
+          f"({report['total_bytes']:,} bytes written).")
+    if report_path is not None:
+        with open(report_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    return report
@@ -0,0 +1,320 @@
+"""
+Persistent, content-addressed cache of encoded asset fragments.
+
+Encoding assets (base64, compression...) is the most expensive part of a
+rebuild, yet most assets do not change between builds. `BuildCache` stores the
+encoded form of each asset under the SHA-256 of its content, and keeps a
+per-project index of (relative path, size, mtime) -> content hash:
+
+* If a file's size and mtime match the index, the stored fragment is streamed
+  back without reading or encoding the file.
+* Otherwise the file is hashed; if a fragment for that content already exists
+  (e.g. the file was only touched, or the same file lives in another project)
+  it is reused.
+* Only genuinely new content is encoded, and the result is stored for next time.
+
+The cache does not grow forever: after each build, fragments that no project
+index refers to any more are deleted, and if the remaining fragments exceed
+``S2S_BUILD_CACHE_MAX_BYTES`` the least recently used ones are evicted
+(see `prune_build_cache`). `clear_build_cache` deletes everything.
+"""
+import hashlib
+import json
+import os
+import shutil
+import time
+from typing import BinaryIO, Callable, Dict, Iterator, List, Mapping, Optional, Set, Tuple
+
+from .version_cache import get_cache_dir
+
+FRAGMENT_READ_SIZE = 256 * 1024  # characters streamed per read from a cached fragment
+HASH_READ_SIZE = 1024 * 1024     # bytes read per step when hashing a file
+DEFAULT_BUILD_CACHE_MAX_BYTES = 512 * 1024 * 1024  # fragments kept before the least recently used are evicted
+PRUNE_GRACE_SECONDS = 3600       # unreferenced fragments this recent may belong to a build still running
+
+# An encoder turns an open binary stream into chunks of encoded text.
+Encoder = Callable[[BinaryIO], Iterator[str]]
+
+
+def file_sha256(path: str) -> str:
+    """
+    Return the hex SHA-256 digest of a file's content.
+
+    Parameters
+    ----------
+    path : str
+        Path to the file.
+
+    Returns
+    -------
+    str
+        The hex digest.
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_READ_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _default_max_bytes() -> int:
+    """Return the build cache size cap, honouring the ``S2S_BUILD_CACHE_MAX_BYTES`` environment variable."""
+    value = os.environ.get('S2S_BUILD_CACHE_MAX_BYTES')
+    if value is None:
+        return DEFAULT_BUILD_CACHE_MAX_BYTES
+    try:
+        return int(value)
+    except ValueError:
+        print(f"Warning: Ignoring invalid S2S_BUILD_CACHE_MAX_BYTES value: {value}")
+        return DEFAULT_BUILD_CACHE_MAX_BYTES
+
+
+def _referenced_hashes(root: str) -> Set[str]:
+    """Return the content hashes any project index under `root` refers to."""
+    hashes: Set[str] = set()
+    index_dir = os.path.join(root, 'index')
+    if not os.path.isdir(index_dir):
+        return hashes
+    for entry in os.scandir(index_dir):
+        if not entry.name.endswith('.json'):
+            continue
+        try:
+            with open(entry.path, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if isinstance(index, dict):
+            hashes.update(str(item.get('sha256')) for item in index.values() if isinstance(item, dict))
+    return hashes
+
+
+def prune_build_cache(cache_dir: Optional[str] = None, max_bytes: Optional[int] = None) -> Tuple[int, int]:
+    """
+    Delete cached fragments that are no longer referenced or that exceed the size cap.
+
+    Fragments whose content hash no project index refers to are deleted (unless
+    written within the last `PRUNE_GRACE_SECONDS`, as a build still running has not
+    saved its index yet). If the remaining fragments are larger than `max_bytes`,
+    the least recently used are deleted until they fit; an evicted fragment is
+    simply encoded again by the next build that needs it.
+
+    Parameters
+    ----------
+    cache_dir : Optional[str], optional
+        Root cache directory. Defaults to ``get_cache_dir()``.
+    max_bytes : Optional[int], optional
+        Size cap for the stored fragments. Defaults to the ``S2S_BUILD_CACHE_MAX_BYTES``
+        environment variable, or 512 MiB.
+
+    Returns
+    -------
+    Tuple[int, int]
+        The number of fragments deleted and the bytes freed.
+    """
+    root = os.path.join(cache_dir if cache_dir is not None else get_cache_dir(), 'build')
+    if max_bytes is None:
+        max_bytes = _default_max_bytes()
+    blob_dir = os.path.join(root, 'blobs')
+    if not os.path.isdir(blob_dir):
+        return 0, 0
+    referenced = _referenced_hashes(root)
+    cutoff = time.time() - PRUNE_GRACE_SECONDS
+    kept: List[Tuple[float, int, str]] = []
+    removed = freed = 0
+    for bucket in os.scandir(blob_dir):
+        if not bucket.is_dir():
+            continue
+        for entry in os.scandir(bucket.path):
+            stat = entry.stat()
+            sha256 = entry.name.split('.', 1)[0]
+            if sha256 in referenced or stat.st_mtime >= cutoff:
+                kept.append((stat.st_mtime, stat.st_size, entry.path))
+                continue
+            os.remove(entry.path)
+            removed += 1
+            freed += stat.st_size
+    total = sum(size for _, size, _ in kept)
+    for _, size, path in sorted(kept):
+        if total <= max_bytes:
+            break
+        os.remove(path)
+        removed += 1
+        freed += size
+        total -= size
+    return removed, freed
+
+
+def clear_build_cache(cache_dir: Optional[str] = None) -> int:
+    """
+    Delete the whole build cache (fragments and project indexes).
+
+    Parameters
+    ----------
+    cache_dir : Optional[str], optional
+        Root cache directory. Defaults to ``get_cache_dir()``.
+
+    Returns
+    -------
+    int
+        The bytes freed.
+    """
+    root = os.path.join(cache_dir if cache_dir is not None else get_cache_dir(), 'build')
+    freed = sum(os.path.getsize(os.path.join(d, f)) for d, _, files in os.walk(root) for f in files)
+    shutil.rmtree(root, ignore_errors=True)
+    return freed
+
+
+class BuildCache:
+    """
+    Cache of encoded asset fragments for one project directory.
+
+    Parameters
+    ----------
+    directory : str
+        The root directory of the application being built.
+    cache_dir : Optional[str], optional
+        Root cache directory. Defaults to ``get_cache_dir()``.
+    stats : Optional[Mapping[str, os.stat_result]], optional
+        Stat results already gathered for the project's files (e.g. by
+        `discovery.scan_tree`), keyed by relative path. Files not listed are stat-ed.
+    """
+    def __init__(self, directory: str, cache_dir: Optional[str] = None,
+                 stats: Optional[Mapping[str, os.stat_result]] = None):
+        if cache_dir is None:
+            cache_dir = get_cache_dir()
+        self.cache_dir = cache_dir
+        self.directory = directory
+        self.root = os.path.join(cache_dir, 'build')
+        project_key = hashlib.sha1(os.path.abspath(directory).encode('utf-8')).hexdigest()[:16]
+        self.index_path = os.path.join(self.root, 'index', f'{project_key}.json')
+        self.hits = 0
+        self.misses = 0
+        self._index: Dict[str, Dict[str, object]] = self._load_index()
+        self._seen: Dict[str, Dict[str, object]] = {}
+        self._stats: Mapping[str, os.stat_result] = stats if stats is not None else {}
+        self._paths: Dict[str, str] = {}
+
+    def add_file(self, rel_path: str, path: str) -> None:
+        """
+        Serve `rel_path` from a file outside the project directory (e.g. an embedded wheel).
+
+        Parameters
+        ----------
+        rel_path : str
+            The file's path in the bundle.
+        path : str
+            The file on disk.
+        """
+        self._paths[rel_path] = path
+
+    def _path(self, rel_path: str) -> str:
+        return self._paths.get(rel_path) or os.path.join(self.directory, rel_path)
+
+    def _load_index(self) -> Dict[str, Dict[str, object]]:
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return index if isinstance(index, dict) else {}
+
+    def _blob_path(self, sha256: str, kind: str) -> str:
+        return os.path.join(self.root, 'blobs', sha256[:2], f'{sha256}.{kind}')
+
+    def _stream_blob(self, blob_path: str) -> Iterator[str]:
+        with open(blob_path, 'r', encoding='utf-8') as f:
+            for chunk in iter(lambda: f.read(FRAGMENT_READ_SIZE), ''):
+                yield chunk
+
+    def _encode_and_store(self, path: str, blob_path: str, encoder: Encoder) -> Iterator[str]:
+        os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+        tmp_path = f'{blob_path}.{os.getpid()}.tmp'
+        try:
+            with open(path, 'rb') as source, open(tmp_path, 'w', encoding='utf-8') as blob:
+                for chunk in encoder(source):
+                    blob.write(chunk)
+                    yield chunk
+            os.replace(tmp_path, blob_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def content_hash(self, rel_path: str) -> str:
+        """
+        Return the SHA-256 of a file, reusing the indexed hash if the file is unchanged.
+
+        Parameters
+        ----------
+        rel_path : str
+            The file path relative to the project directory.
+
+        Returns
+        -------
+        str
+            The hex digest of the file's content.
+        """
+        path = self._path(rel_path)
+        stat = self._stats.get(rel_path) or os.stat(path)
+        entry = self._index.get(rel_path)
+        if entry and entry.get('size') == stat.st_size and entry.get('mtime_ns') == stat.st_mtime_ns:
+            sha256 = str(entry['sha256'])
+        else:
+            sha256 = file_sha256(path)
+        self._seen[rel_path] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': sha256}
+        return sha256
+
+    def fragment(self, rel_path: str, kind: str, encoder: Encoder) -> Iterator[str]:
+        """
+        Yield the encoded fragment for a file, reusing a cached copy when possible.
+
+        Parameters
+        ----------
+        rel_path : str
+            The file path relative to the project directory.
+        kind : str
+            Name of the encoding (e.g. ``'b64'``). Fragments of different kinds
+            for the same content are stored separately.
+        encoder : Encoder
+            Function that encodes an open binary stream into text chunks. Only
+            called on a cache miss.
+
+        Yields
+        ------
+        str
+            Consecutive chunks of the encoded fragment.
+        """
+        blob_path = self._blob_path(self.content_hash(rel_path), kind)
+        if os.path.isfile(blob_path):
+            self.hits += 1
+            try:
+                os.utime(blob_path)  # recently used fragments are evicted last
+            except OSError:
+                pass
+            yield from self._stream_blob(blob_path)
+        else:
+            self.misses += 1
+            yield from self._encode_and_store(self._path(rel_path), blob_path, encoder)
+
+    def save(self) -> None:
+        """
+        Persist the index for the files seen during this build, then prune the cache.
+
+        Failures are reported but never abort a conversion.
+        """
+        try:
+            os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+            tmp_path = f'{self.index_path}.{os.getpid()}.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._seen, f)
+            os.replace(tmp_path, self.index_path)
+        except OSError as e:
+            print(f"Warning: Could not write build cache index {self.index_path}: {e}")
+            return
+        try:
+            prune_build_cache(self.cache_dir)
+        except OSError as e:
+            print(f"Warning: Could not prune build cache {self.root}: {e}")
+
+    def summary(self) -> str:
+        """Return a one-line hit/miss summary for this build."""
+        return f"{self.hits} hit(s), {self.misses} miss(es)"
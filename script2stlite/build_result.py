@@ -0,0 +1,181 @@
+"""
+Structured build results and per-stage timing.
+
+A conversion runs through these stages, in order:
+
+* ``versions``     - loading the stlite/Pyodide version indices.
+* ``requirements`` - parsing ``requirements.txt``.
+* ``discovery``    - finding the app files.
+* ``prepare``      - validating settings, placing external assets, finding duplicates.
+* ``encode``       - reading and encoding file payloads (base64, deflate, escaping).
+* ``render``       - rendering the template and writing the HTML file.
+* ``finalize``     - size report, bundle hash, build manifest and build cache.
+
+The HTML is streamed, so encoding and rendering are interleaved: both stages are
+measured during the same pass and reported together once the HTML is complete.
+`BuildTimer` measures wall and CPU time for each stage. At each stage boundary
+it logs the timing to the ``script2stlite.build`` logger (at INFO level) and
+calls an optional callback, so metrics can be exported to build telemetry.
+"""
+import logging
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+logger = logging.getLogger('script2stlite.build')
+
+
+@dataclass
+class StageTiming:
+    """
+    Timing of one build stage.
+
+    Attributes
+    ----------
+    name : str
+        The stage name (see the module docstring).
+    wall_seconds : float
+        Elapsed wall-clock time.
+    cpu_seconds : float
+        CPU time used by the process (all threads) during the stage.
+    bytes : int
+        Bytes processed: discovered file sizes for ``discovery``, encoded
+        output for ``encode``, the HTML size for ``render``, and so on.
+    """
+    name: str
+    wall_seconds: float = 0.0
+    cpu_seconds: float = 0.0
+    bytes: int = 0
+
+
+# Called with each stage's timing as soon as the stage finishes.
+StageCallback = Callable[[StageTiming], None]
+
+
+class BuildTimer:
+    """
+    Measures build stages and reports each one as it finishes.
+
+    Parameters
+    ----------
+    callback : Optional[StageCallback], optional
+        Function called with the `StageTiming` of every finished stage.
+    """
+    def __init__(self, callback: Optional[StageCallback] = None):
+        self.callback = callback
+        self.stages: List[StageTiming] = []
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[StageTiming]:
+        """
+        Time the enclosed block as stage `name`.
+
+        The yielded `StageTiming` can be given a ``bytes`` count inside the
+        block. The stage is only recorded if the block completes.
+
+        Parameters
+        ----------
+        name : str
+            The stage name.
+
+        Yields
+        ------
+        StageTiming
+            The timing being measured.
+        """
+        timing = StageTiming(name)
+        wall, cpu = time.perf_counter(), time.process_time()
+        yield timing
+        timing.wall_seconds = time.perf_counter() - wall
+        timing.cpu_seconds = time.process_time() - cpu
+        self._finish(timing)
+
+    def record(self, name: str, wall_seconds: float, cpu_seconds: float, bytes: int = 0) -> StageTiming:
+        """
+        Record a stage measured elsewhere (e.g. split out of an interleaved pass).
+
+        Parameters
+        ----------
+        name : str
+            The stage name.
+        wall_seconds : float
+            Elapsed wall-clock time.
+        cpu_seconds : float
+            CPU time used.
+        bytes : int, optional
+            Bytes processed.
+
+        Returns
+        -------
+        StageTiming
+            The recorded timing.
+        """
+        timing = StageTiming(name, max(wall_seconds, 0.0), max(cpu_seconds, 0.0), bytes)
+        self._finish(timing)
+        return timing
+
+    def _finish(self, timing: StageTiming) -> None:
+        self.stages.append(timing)
+        logger.info("stage %s: %.4f s wall, %.4f s CPU, %d bytes",
+                    timing.name, timing.wall_seconds, timing.cpu_seconds, timing.bytes)
+        if self.callback is not None:
+            self.callback(timing)
+
+
+@dataclass
+class BuildResult:
+    """
+    Outcome of a conversion.
+
+    Attributes
+    ----------
+    output_path : str
+        The generated HTML file.
+    stages : List[StageTiming]
+        Timing of each build stage, in order.
+    html_bytes : int
+        Size of the HTML file.
+    total_bytes : int
+        Size of the HTML file plus any external assets.
+    file_count : int
+        Number of app files in the bundle, including the entrypoint.
+    cache_hits : int
+        Assets served from the build cache (0 when the cache is disabled).
+    cache_misses : int
+        Assets encoded because they were not in the build cache.
+    external_paths : List[str]
+        Other files written by the build: external assets, size report, bundle hash.
+    size_report : Optional[Dict[str, Any]]
+        The bundle size report (see `size_report.build_size_report`).
+    """
+    output_path: str
+    stages: List[StageTiming] = field(default_factory=list)
+    html_bytes: int = 0
+    total_bytes: int = 0
+    file_count: int = 0
+    cache_hits: int = 0
+    cache_misses: int = 0
+    external_paths: List[str] = field(default_factory=list)
+    size_report: Optional[Dict[str, Any]] = None
+
+    @property
+    def wall_seconds(self) -> float:
+        """Total wall-clock time of all stages."""
+        return sum(stage.wall_seconds for stage in self.stages)
+
+    @property
+    def cpu_seconds(self) -> float:
+        """Total CPU time of all stages."""
+        return sum(stage.cpu_seconds for stage in self.stages)
+
+    def stage(self, name: str) -> Optional[StageTiming]:
+        """Return the timing of stage `name`, or None if it did not run."""
+        return next((stage for stage in self.stages if stage.name == name), None)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the result as plain (JSON-serializable) data, e.g. for metrics export."""
+        data = asdict(self)
+        data['wall_seconds'] = self.wall_seconds
+        data['cpu_seconds'] = self.cpu_seconds
+        return data
@@ -0,0 +1,67 @@
+"""
+Command line interface for script2stlite.
+
+Usage::
+
+    script2stlite batch "apps/*" --output-dir dist --workers 8 --report report.json
+    script2stlite clear-cache
+"""
+import argparse
+import sys
+from typing import List, Optional
+
+from .batch import convert_many
+from .build_cache import clear_build_cache
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Return the argument parser for the ``script2stlite`` command."""
+    parser = argparse.ArgumentParser(prog='script2stlite', description='Convert Streamlit apps to stlite HTML files.')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    batch = subparsers.add_parser('batch', help='Convert many app directories in parallel.')
+    batch.add_argument('directories', nargs='+', help='App directories or glob patterns (e.g. "apps/*").')
+    batch.add_argument('--output-dir', help='Write each app to <output-dir>/<app directory name>/ instead of its own directory.')
+    batch.add_argument('--entrypoint', help='Entrypoint for directories without a settings.yaml.')
+    batch.add_argument('--workers', type=int, help='Number of worker processes (default: CPU count).')
+    batch.add_argument('--stlite-version', help='stlite version to use for every app.')
+    batch.add_argument('--pyodide-version', help='Pyodide version to use for every app.')
+    batch.add_argument('--report', help='Write the consolidated timing and size report to this JSON file.')
+
+    subparsers.add_parser('clear-cache', help='Delete the cache of encoded assets.')
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Run the command line interface.
+
+    Parameters
+    ----------
+    argv : Optional[List[str]], optional
+        Command line arguments (without the program name). Defaults to ``sys.argv[1:]``.
+
+    Returns
+    -------
+    int
+        The process exit code: 0 on success, 1 if any conversion failed.
+    """
+    args = build_parser().parse_args(argv)
+    if args.command == 'batch':
+        report = convert_many(
+            args.directories,
+            output_dir=args.output_dir,
+            entrypoint=args.entrypoint,
+            workers=args.workers,
+            stlite_version=args.stlite_version,
+            pyodide_version=args.pyodide_version,
+            report_path=args.report
+        )
+        return 1 if report['failed'] else 0
+    if args.command == 'clear-cache':
+        print(f"* Cleared the asset cache ({clear_build_cache():,} bytes freed).")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,5 +1,12 @@
 import os
-from typing import Set
+import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from .ignore import GITIGNORE_FILENAME, S2SIGNORE_FILENAME, IgnoreRules
+
+# Records the files written by previous builds so they are never bundled into later ones.
+MANIFEST_FILENAME = '.s2s_manifest.json'
 
 DEFAULT_IGNORE_DIRS = {
     '.git',
@@ -19,47 +26,361 @@ DEFAULT_IGNORE_DIRS = {
 DEFAULT_IGNORE_FILES = {
     '.DS_Store',
     '.gitignore',
+    S2SIGNORE_FILENAME,
     '.env',
-    'requirements.txt'
+    'requirements.txt',
+    MANIFEST_FILENAME
 }
 
-def discover_all_files(root_dir: str, ignore_dirs: Set[str] = None, ignore_files: Set[str] = None) -> Set[str]:
+# Same default as ThreadPoolExecutor: discovery threads mostly wait on the file system.
+DEFAULT_DISCOVERY_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+
+def _read_manifest(root_dir: str) -> Dict[str, Any]:
+    """Return the project's manifest, or an empty one if there is no (readable) manifest."""
+    try:
+        with open(os.path.join(root_dir, MANIFEST_FILENAME), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return manifest if isinstance(manifest, dict) else {}
+
+def _write_manifest(root_dir: str, manifest: Dict[str, Any]) -> None:
+    try:
+        with open(os.path.join(root_dir, MANIFEST_FILENAME), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+    except OSError as e:
+        print(f"Warning: Could not write build manifest in {root_dir}: {e}")
+
+def load_build_manifest(root_dir: str) -> Set[str]:
     """
-    Recursively find all files in the root_dir, excluding those in the ignore lists.
+    Return the build outputs recorded in the project's manifest.
+
+    Parameters
+    ----------
+    root_dir : str
+        The root directory of the application.
+
+    Returns
+    -------
+    Set[str]
+        Output paths relative to root_dir. Empty if there is no (readable) manifest.
+    """
+    outputs = _read_manifest(root_dir).get('outputs', [])
+    return {str(o) for o in outputs} if isinstance(outputs, list) else set()
+
+def update_build_manifest(root_dir: str, outputs: Iterable[str]) -> None:
+    """
+    Add build outputs to the project's manifest.
+
+    Entries from earlier builds are kept while the files still exist (e.g. the
+    HTML written under a previous APP_NAME), so they stay excluded as well.
 
     Parameters
     ----------
     root_dir : str
         The root directory of the application.
-    ignore_dirs : Set[str]
+    outputs : Iterable[str]
+        Output paths relative to root_dir.
+    """
+    manifest = _read_manifest(root_dir)
+    recorded = {o for o in load_build_manifest(root_dir) if os.path.exists(os.path.join(root_dir, o))}
+    recorded.update(outputs)
+    manifest['outputs'] = sorted(recorded)
+    _write_manifest(root_dir, manifest)
+
+def prune_external_assets(root_dir: str, output: str, assets: Iterable[str]) -> List[str]:
+    """
+    Record the split-output assets an HTML file refers to, and delete the ones it no longer needs.
+
+    An asset recorded for `output` by an earlier build is deleted when neither
+    this build nor the last build of any other HTML file in the project refers
+    to it, so the ``s2s_assets/`` folder does not keep growing with every change.
+
+    Parameters
+    ----------
+    root_dir : str
+        The root directory of the application.
+    output : str
+        The HTML file, relative to root_dir.
+    assets : Iterable[str]
+        The assets the HTML file refers to now, relative to root_dir.
+
+    Returns
+    -------
+    List[str]
+        The deleted assets, relative to root_dir.
+    """
+    manifest = _read_manifest(root_dir)
+    by_output = manifest.get('assets')
+    if not isinstance(by_output, dict):
+        by_output = {}
+    assets = sorted(set(assets))
+    in_use = set(assets)
+    for other, other_assets in by_output.items():
+        if other != output and os.path.exists(os.path.join(root_dir, other)) and isinstance(other_assets, list):
+            in_use.update(other_assets)
+    deleted = []
+    for asset in by_output.get(output) or []:
+        if asset in in_use:
+            continue
+        try:
+            os.remove(os.path.join(root_dir, asset))
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            print(f"Warning: Could not delete unused asset {asset}: {e}")
+            continue
+        deleted.append(asset)
+    by_output = {o: a for o, a in by_output.items() if o != output and os.path.exists(os.path.join(root_dir, o))}
+    if assets:
+        by_output[output] = assets
+    manifest['assets'] = by_output
+    if deleted and isinstance(manifest.get('outputs'), list):
+        manifest['outputs'] = [o for o in manifest['outputs'] if o not in deleted]
+    _write_manifest(root_dir, manifest)
+    return deleted
+
+class _ScanOptions(NamedTuple):
+    ignore_dirs: Set[str]
+    ignore_files: Set[str]
+    exclude_paths: Set[str]
+    ignore_filenames: Tuple[str, ...]
+    follow_symlinks: bool
+
+
+def _scan_directory(root_dir: str, rel_dir: str, rules: IgnoreRules, ancestors: FrozenSet[Tuple[int, int]],
+                    options: _ScanOptions, found: Dict[str, os.stat_result]) -> List[Tuple[str, FrozenSet[Tuple[int, int]]]]:
+    """List one directory: record its files in `found` and return the subdirectories to descend into."""
+    try:
+        with os.scandir(os.path.join(root_dir, rel_dir) if rel_dir else root_dir) as it:
+            entries = list(it)
+    except OSError:
+        return []  # unreadable directory, as os.walk does
+    prefix = rel_dir + os.sep if rel_dir else ''
+    base = rel_dir.replace(os.sep, '/')
+
+    # Patterns from this directory's ignore files apply to everything below it.
+    names = {entry.name for entry in entries}
+    for ignore_filename in options.ignore_filenames:
+        if ignore_filename in names:
+            rules.add_file(os.path.join(root_dir, prefix + ignore_filename), base=base)
+
+    subdirs = []
+    for entry in entries:
+        rel_path = prefix + entry.name
+        try:
+            is_dir = entry.is_dir()
+        except OSError:
+            continue
+        if is_dir:
+            if entry.name in options.ignore_dirs or (rules and rules.is_ignored(rel_path, is_dir=True)):
+                continue  # pruned: the subtree is never listed
+            if not options.follow_symlinks:
+                if not entry.is_symlink():
+                    subdirs.append((rel_path, ancestors))
+                continue
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            identity = (stat.st_dev, stat.st_ino)
+            if identity in ancestors:
+                continue  # symlink loop: this directory is already being walked above us
+            subdirs.append((rel_path, ancestors | {identity}))
+            continue
+
+        if entry.name in options.ignore_files or rel_path in options.exclude_paths:
+            continue
+        if rules and rules.is_ignored(rel_path):
+            continue
+        try:
+            found[rel_path] = entry.stat()
+        except OSError:
+            continue  # broken symlink, or deleted while scanning
+    return subdirs
+
+
+def _scan_subtree(root_dir: str, rel_dir: str, rules: IgnoreRules, ancestors: FrozenSet[Tuple[int, int]],
+                  options: _ScanOptions) -> Dict[str, os.stat_result]:
+    """Walk one subtree depth-first with an explicit stack (run in a worker thread)."""
+    found: Dict[str, os.stat_result] = {}
+    stack = [(rel_dir, ancestors)]
+    while stack:
+        rel_dir, ancestors = stack.pop()
+        stack.extend(_scan_directory(root_dir, rel_dir, rules, ancestors, options, found))
+    return found
+
+
+def scan_tree(root_dir: str, ignore_dirs: Set[str] = None, ignore_files: Set[str] = None,
+              exclude_paths: Optional[Set[str]] = None, use_gitignore: bool = False,
+              follow_symlinks: bool = False, workers: Optional[int] = None) -> Dict[str, os.stat_result]:
+    """
+    Find all files in root_dir that would be bundled, together with their `os.stat` results.
+
+    Directories are listed with `os.scandir`, so file types come from the
+    directory listing and each file is stat-ed exactly once, in the same pass.
+    The root is listed first; its subdirectories are then walked in parallel,
+    one task per top-level directory, which mainly pays off on network file
+    systems and very large trees where listing a directory is I/O bound.
+
+    Patterns in ``.s2signore`` files (and, with `use_gitignore`, ``.gitignore``
+    files) found in the root or any subdirectory are applied with gitignore
+    semantics (see `script2stlite.ignore`). Ignored directories are pruned before
+    they are entered, so their contents are never listed.
+
+    Parameters
+    ----------
+    root_dir : str
+        The root directory to search.
+    ignore_dirs : Set[str], optional
+        Set of directory names to ignore. Defaults to DEFAULT_IGNORE_DIRS.
+    ignore_files : Set[str], optional
+        Set of file names to ignore. Defaults to DEFAULT_IGNORE_FILES.
+    exclude_paths : Optional[Set[str]]
+        Set of relative file paths to exclude (e.g. outputs of previous builds).
+    use_gitignore : bool, optional
+        Whether to also apply ``.gitignore`` files. Default False.
+    follow_symlinks : bool, optional
+        Whether to descend into symlinked directories. A symlink pointing back to
+        one of its own ancestors is skipped, so loops terminate. Default False
+        (symlinked files are always included; symlinked directories are not, as with `os.walk`).
+    workers : Optional[int], optional
+        Maximum number of threads walking top-level directories. Defaults to
+        DEFAULT_DISCOVERY_WORKERS; 1 walks the tree serially.
+
+    Returns
+    -------
+    Dict[str, os.stat_result]
+        Mapping of relative file path (relative to root_dir) to its stat result.
+        Files that cannot be stat-ed (e.g. broken symlinks) are left out.
+    """
+    options = _ScanOptions(
+        ignore_dirs=DEFAULT_IGNORE_DIRS if ignore_dirs is None else ignore_dirs,
+        ignore_files=DEFAULT_IGNORE_FILES if ignore_files is None else ignore_files,
+        exclude_paths=set() if exclude_paths is None else exclude_paths,
+        ignore_filenames=(GITIGNORE_FILENAME, S2SIGNORE_FILENAME) if use_gitignore else (S2SIGNORE_FILENAME,),
+        follow_symlinks=follow_symlinks,
+    )
+    if workers is None:
+        workers = DEFAULT_DISCOVERY_WORKERS
+
+    root_identity: FrozenSet[Tuple[int, int]] = frozenset()
+    if follow_symlinks:
+        root_stat = os.stat(root_dir)
+        root_identity = frozenset({(root_stat.st_dev, root_stat.st_ino)})
+    rules = IgnoreRules()
+    found: Dict[str, os.stat_result] = {}
+    subdirs = _scan_directory(root_dir, '', rules, root_identity, options, found)
+
+    # Each subtree gets its own copy of the root rules, to which it adds the
+    # patterns of its nested ignore files.
+    if workers <= 1 or len(subdirs) <= 1:
+        for rel_dir, ancestors in subdirs:
+            found.update(_scan_subtree(root_dir, rel_dir, rules.copy(), ancestors, options))
+    else:
+        with ThreadPoolExecutor(max_workers=min(workers, len(subdirs))) as executor:
+            futures = [executor.submit(_scan_subtree, root_dir, rel_dir, rules.copy(), ancestors, options)
+                       for rel_dir, ancestors in subdirs]
+            for future in futures:
+                found.update(future.result())
+    return found
+
+
+def discover_all_files(root_dir: str, ignore_dirs: Set[str] = None, ignore_files: Set[str] = None,
+                       exclude_paths: Optional[Set[str]] = None, use_gitignore: bool = False,
+                       follow_symlinks: bool = False) -> Set[str]:
+    """
+    Recursively find all files in the root_dir, excluding those in the ignore lists.
+
+    See `scan_tree`, which also returns the stat result of each file.
+
+    Parameters
+    ----------
+    root_dir : str
+        The root directory to search.
+    ignore_dirs : Set[str], optional
         Set of directory names to ignore.
-    ignore_files : Set[str]
+    ignore_files : Set[str], optional
         Set of file names to ignore.
+    exclude_paths : Optional[Set[str]]
+        Set of relative file paths to exclude (e.g. outputs of previous builds).
+    use_gitignore : bool, optional
+        Whether to also apply ``.gitignore`` files. Default False.
+    follow_symlinks : bool, optional
+        Whether to descend into symlinked directories (loop-safe). Default False.
 
     Returns
     -------
     Set[str]
         A set of relative file paths (relative to root_dir).
     """
-    if ignore_dirs is None:
-        ignore_dirs = DEFAULT_IGNORE_DIRS
-    if ignore_files is None:
-        ignore_files = DEFAULT_IGNORE_FILES
+    return set(scan_tree(root_dir, ignore_dirs=ignore_dirs, ignore_files=ignore_files, exclude_paths=exclude_paths,
+                         use_gitignore=use_gitignore, follow_symlinks=follow_symlinks))
 
-    discovered_files = set()
 
-    for root, dirs, files in os.walk(root_dir):
-        # Modify dirs in-place to skip ignored directories
-        dirs[:] = [d for d in dirs if d not in ignore_dirs]
+def filter_paths(paths: Iterable[str], read_text: Callable[[str], str], ignore_dirs: Set[str] = None,
+                 ignore_files: Set[str] = None, exclude_paths: Optional[Set[str]] = None,
+                 use_gitignore: bool = False) -> Set[str]:
+    """
+    Apply discovery's ignore rules to a flat list of files (e.g. the members of an archive).
 
-        for file in files:
-            if file in ignore_files:
-                continue
+    The result matches what `scan_tree` would return for the same files on disk:
+    ignored directory names prune everything below them, and ``.s2signore``
+    (with `use_gitignore`, ``.gitignore``) files in the list are applied to
+    their own directory and below, shallower files first.
+
+    Parameters
+    ----------
+    paths : Iterable[str]
+        Relative file paths (os.sep separated).
+    read_text : Callable[[str], str]
+        Returns the content of one of the paths (used for ignore files).
+    ignore_dirs : Set[str], optional
+        Set of directory names to ignore. Defaults to DEFAULT_IGNORE_DIRS.
+    ignore_files : Set[str], optional
+        Set of file names to ignore. Defaults to DEFAULT_IGNORE_FILES.
+    exclude_paths : Optional[Set[str]]
+        Set of relative file paths to exclude.
+    use_gitignore : bool, optional
+        Whether to also apply ``.gitignore`` files. Default False.
+
+    Returns
+    -------
+    Set[str]
+        The paths that would be bundled.
+    """
+    ignore_dirs = DEFAULT_IGNORE_DIRS if ignore_dirs is None else ignore_dirs
+    ignore_files = DEFAULT_IGNORE_FILES if ignore_files is None else ignore_files
+    exclude_paths = set() if exclude_paths is None else exclude_paths
+    ignore_filenames = (GITIGNORE_FILENAME, S2SIGNORE_FILENAME) if use_gitignore else (S2SIGNORE_FILENAME,)
+
+    paths = sorted(paths, key=lambda p: (p.count(os.sep), p))
+    rules = IgnoreRules()
+    for rel_path in paths:
+        rel_dir, name = os.path.split(rel_path)
+        if name in ignore_filenames:
+            try:
+                rules.add_patterns(read_text(rel_path).splitlines(), base=rel_dir.replace(os.sep, '/'))
+            except (OSError, UnicodeDecodeError):
+                pass
 
-            # Construct full path and relative path
-            full_path = os.path.join(root, file)
-            rel_path = os.path.relpath(full_path, root_dir)
+    pruned: Dict[str, bool] = {}
 
-            discovered_files.add(rel_path)
+    def is_pruned(rel_dir: str) -> bool:
+        if not rel_dir:
+            return False
+        if rel_dir not in pruned:
+            parent, name = os.path.split(rel_dir)
+            pruned[rel_dir] = (is_pruned(parent) or name in ignore_dirs
+                               or (bool(rules) and rules.is_ignored(rel_dir, is_dir=True)))
+        return pruned[rel_dir]
 
-    return discovered_files
+    found = set()
+    for rel_path in paths:
+        rel_dir, name = os.path.split(rel_path)
+        if name in ignore_files or rel_path in exclude_paths or is_pruned(rel_dir):
+            continue
+        if rules and rules.is_ignored(rel_path):
+            continue
+        found.add(rel_path)
+    return found
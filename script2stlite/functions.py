@@ -3,14 +3,40 @@ import yaml
 import tomli
 import os
 import shutil
-from typing import Any, Dict, Tuple, Union, List
-from pathlib import Path
+from typing import Any, Dict, Tuple, Union, List, Optional, Iterator, BinaryIO, Mapping
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path, PurePosixPath
 import base64
+import json
+import mmap
+import time
+import zlib
+from .version_cache import load_versions_yaml
+from .build_cache import BuildCache, file_sha256
+from .sources import AppSource, as_app_source
+from .size_report import SizeRecorder, utf8_length
+from .build_result import BuildTimer
+from .template import parse_template, render_template, render_template_to, Segments, TemplateValue
 
 stylesheet_url = r'https://raw.githubusercontent.com/LukeAFullard/script2stlite/refs/heads/main/stlite_versions/stylesheet.yaml'
 js_url         = r'https://raw.githubusercontent.com/LukeAFullard/script2stlite/refs/heads/main/stlite_versions/js.yaml'
 pyodide_url    = r'https://raw.githubusercontent.com/LukeAFullard/script2stlite/refs/heads/main/stlite_versions/pyodide.yaml'
 
+BASE64_CHUNK_SIZE = 3 * 64 * 1024      # bytes encoded per chunk; a multiple of 3 so chunks concatenate into valid base64
+MMAP_THRESHOLD    = 16 * 1024 * 1024   # files at least this large are encoded from a memory map
+DEFLATE_LEVEL     = 9
+EXTERNAL_ASSETS_DIRNAME = 's2s_assets'  # folder next to the HTML that holds assets in split-output mode
+EMBED_MODES = ('inline', 'blocks')     # inline: payloads in JS string literals; blocks: in non-executable <script> elements
+ASSET_BLOCK_ID = 's2s-asset-{}'
+
+# Formats that are already compressed; deflating them again only costs build and load time.
+INCOMPRESSIBLE_EXTENSIONS = {
+    '.png', '.jpg', '.jpeg', '.gif', '.webp', '.avif', '.ico',
+    '.zip', '.gz', '.tgz', '.bz2', '.xz', '.7z', '.whl',
+    '.mp3', '.mp4', '.m4a', '.ogg', '.webm', '.woff', '.woff2',
+    '.pdf', '.parquet', '.feather', '.xlsx', '.docx', '.pptx', '.npz',
+}
+
 def get_value_of_max_key(data: Dict[Any, Any]) -> Any:
     """
     Return the value corresponding to the maximum key in the dictionary.
@@ -202,28 +228,49 @@ def parse_requirements(file_path: Union[str, os.PathLike]) -> List[str]:
 
     try:
         with open(file_path, 'r', encoding='utf-8') as f:
-            for line in f:
-                line = line.strip()
-                # Skip comments and empty lines
-                if not line or line.startswith('#'):
-                    continue
-                # For now, we assume standard pip-style requirements
-                # We do not strictly validate them here, relying on micropip to handle/reject them
-                requirements.append(line)
+            requirements = parse_requirements_text(f.read())
     except Exception as e:
         print(f"Warning: Failed to parse requirements file {file_path}: {e}")
 
     return requirements
 
+def parse_requirements_text(text: str) -> List[str]:
+    """
+    Parse the content of a requirements.txt file and return a list of requirements.
+
+    Parameters
+    ----------
+    text : str
+        The content of the requirements file.
+
+    Returns
+    -------
+    List[str]
+        A list of requirement strings.
+    """
+    requirements = []
+    for line in text.splitlines():
+        line = line.strip()
+        # Skip comments and empty lines
+        if not line or line.startswith('#'):
+            continue
+        # For now, we assume standard pip-style requirements
+        # We do not strictly validate them here, relying on micropip to handle/reject them
+        requirements.append(line)
+    return requirements
+
+
+# Escapes that make text safe inside a JavaScript template literal.
+TEMPLATE_LITERAL_ESCAPES = {
+    "\\": "\\\\",
+    "`": "\\`",
+    "${": "\\${"
+}
 
 def load_text_from_file(
     path: Union[str, os.PathLike],
     escape_text: bool = True,
-    escape_string_map: Dict[str, str] = {
-        "\\": "\\\\",
-        "`": "\\`",
-        "${": "\\${"
-    }
+    escape_string_map: Dict[str, str] = TEMPLATE_LITERAL_ESCAPES
     ) -> str:
     """
     Load a plain text file from the local file system and return its contents as a string.
@@ -266,10 +313,12 @@ def load_text_from_file(
 
     return text
 
-def load_stylesheet(url: str = stylesheet_url, timeout: int = 10) -> Tuple[Dict[str, Any], Any]:
+def load_stylesheet(url: str = stylesheet_url, timeout: int = 10, session: Optional[requests.Session] = None) -> Tuple[Dict[str, Any], Any]:
     """
     Load the stylesheet version dictionary from a YAML file at the specified URL,
     and return both the full dictionary and the value corresponding to the maximum version key.
+    The file is served from the persistent version cache when possible and falls back
+    to the snapshot shipped with the package when the network is unavailable.
 
     Parameters
     ----------
@@ -277,6 +326,8 @@ def load_stylesheet(url: str = stylesheet_url, timeout: int = 10) -> Tuple[Dict[
         The URL pointing to the raw YAML stylesheet version file.
     timeout : int
         Timeout in seconds for the HTTP request.
+    session : Optional[requests.Session]
+        Session to reuse for the HTTP request (connection pooling). If None, a one-off request is made.
 
     Returns
     -------
@@ -285,15 +336,17 @@ def load_stylesheet(url: str = stylesheet_url, timeout: int = 10) -> Tuple[Dict[
         - The full stylesheet version dictionary
         - The value corresponding to the maximum key
     """
-    stylesheet_versions: Dict[str, Any] = load_yaml_from_url(url=url, timeout=timeout)
+    stylesheet_versions: Dict[str, Any] = load_versions_yaml(url=url, timeout=timeout, session=session)
     stylesheet_top_version: Any = get_value_of_max_key(stylesheet_versions)
     return stylesheet_versions, stylesheet_top_version
 
 
-def load_js(url: str = js_url, timeout: int = 10) -> Tuple[Dict[str, Any], Any]:
+def load_js(url: str = js_url, timeout: int = 10, session: Optional[requests.Session] = None) -> Tuple[Dict[str, Any], Any]:
     """
     Load the JavaScript version dictionary from a YAML file at the specified URL,
     and return both the full dictionary and the value corresponding to the maximum version key.
+    The file is served from the persistent version cache when possible and falls back
+    to the snapshot shipped with the package when the network is unavailable.
 
     Parameters
     ----------
@@ -301,6 +354,8 @@ def load_js(url: str = js_url, timeout: int = 10) -> Tuple[Dict[str, Any], Any]:
         The URL pointing to the raw YAML JavaScript version file.
     timeout : int
         Timeout in seconds for the HTTP request.
+    session : Optional[requests.Session]
+        Session to reuse for the HTTP request (connection pooling). If None, a one-off request is made.
 
     Returns
     -------
@@ -309,14 +364,16 @@ def load_js(url: str = js_url, timeout: int = 10) -> Tuple[Dict[str, Any], Any]:
         - The full JavaScript version dictionary
         - The value corresponding to the maximum key
     """
-    js_versions: Dict[str, Any] = load_yaml_from_url(url=url, timeout=timeout)
+    js_versions: Dict[str, Any] = load_versions_yaml(url=url, timeout=timeout, session=session)
     js_top_version: Any = get_value_of_max_key(js_versions)
     return js_versions, js_top_version
 
-def load_pyodide(url: str = pyodide_url, timeout: int = 10) -> Tuple[Dict[str, Any], Any]:
+def load_pyodide(url: str = pyodide_url, timeout: int = 10, session: Optional[requests.Session] = None) -> Tuple[Dict[str, Any], Any]:
     """
     Load the Pyodide version dictionary from a YAML file at the specified URL,
     and return both the full dictionary and the value corresponding to the maximum version key.
+    The file is served from the persistent version cache when possible and falls back
+    to the snapshot shipped with the package when the network is unavailable.
 
     Parameters
     ----------
@@ -324,6 +381,8 @@ def load_pyodide(url: str = pyodide_url, timeout: int = 10) -> Tuple[Dict[str, A
         The URL pointing to the raw YAML Pyodide version file.
     timeout : int
         Timeout in seconds for the HTTP request.
+    session : Optional[requests.Session]
+        Session to reuse for the HTTP request (connection pooling). If None, a one-off request is made.
 
     Returns
     -------
@@ -332,16 +391,20 @@ def load_pyodide(url: str = pyodide_url, timeout: int = 10) -> Tuple[Dict[str, A
         - The full Pyodide version dictionary
         - The value corresponding to the maximum key
     """
-    pyodide_versions: Dict[str, Any] = load_yaml_from_url(url=url, timeout=timeout)
+    pyodide_versions: Dict[str, Any] = load_versions_yaml(url=url, timeout=timeout, session=session)
     pyodide_top_version: Any = get_value_of_max_key(pyodide_versions)
     return pyodide_versions, pyodide_top_version
 
-def load_all_versions(stylesheet_url: str = stylesheet_url, js_url: str = js_url, pyd_url: str = pyodide_url, timeout: int = 10
+def load_all_versions(stylesheet_url: str = stylesheet_url, js_url: str = js_url, pyd_url: str = pyodide_url, timeout: int = 10,
+                      concurrent: bool = True
                       ) -> Tuple[Dict[str, Any], Any, Dict[str, Any], Any]:
     """
     Load stylesheet, Pyodide and JavaScript version dictionaries from their respective YAML files,
     and return dictionaries and their top-version values.
 
+    By default the three files are fetched concurrently over a single pooled
+    `requests.Session`, so a cold start costs one round trip rather than three.
+
     Parameters
     ----------
     stylesheet_url : str
@@ -352,6 +415,8 @@ def load_all_versions(stylesheet_url: str = stylesheet_url, js_url: str = js_url
         The URL pointing to the raw YAML Pyodide version file.
     timeout : int
         Timeout in seconds for the HTTP requests.
+    concurrent : bool
+        If True (default), fetch the three files in parallel. If False, fetch them one after another.
 
     Returns
     -------
@@ -364,9 +429,19 @@ def load_all_versions(stylesheet_url: str = stylesheet_url, js_url: str = js_url
         - Pyodide version dictionary
         - Pyodide top version value
     """
-    stylesheet_versions, stylesheet_top_version = load_stylesheet(url=stylesheet_url, timeout=timeout)
-    js_versions, js_top_version = load_js(url=js_url, timeout=timeout)
-    pyodide_versions, pyodide_top_version = load_pyodide(url = pyd_url, timeout=timeout)
+    with requests.Session() as session:
+        if concurrent:
+            with ThreadPoolExecutor(max_workers=3) as executor:
+                stylesheet_future = executor.submit(load_stylesheet, url=stylesheet_url, timeout=timeout, session=session)
+                js_future = executor.submit(load_js, url=js_url, timeout=timeout, session=session)
+                pyodide_future = executor.submit(load_pyodide, url=pyd_url, timeout=timeout, session=session)
+                stylesheet_versions, stylesheet_top_version = stylesheet_future.result()
+                js_versions, js_top_version = js_future.result()
+                pyodide_versions, pyodide_top_version = pyodide_future.result()
+        else:
+            stylesheet_versions, stylesheet_top_version = load_stylesheet(url=stylesheet_url, timeout=timeout, session=session)
+            js_versions, js_top_version = load_js(url=js_url, timeout=timeout, session=session)
+            pyodide_versions, pyodide_top_version = load_pyodide(url = pyd_url, timeout=timeout, session=session)
     return stylesheet_versions, stylesheet_top_version, js_versions, js_top_version, pyodide_versions, pyodide_top_version
 
 ###############################################################################
@@ -548,6 +623,127 @@ def file_to_ou_base64_string(file_path: str) -> str:
     with open(file_path, "rb") as f:
         encoded: bytes = base64.b64encode(f.read())
         return encoded.decode("utf-8")
+
+def iter_base64_chunks(stream: BinaryIO, chunk_size: int = BASE64_CHUNK_SIZE) -> Iterator[str]:
+    """
+    Base64-encode a binary stream in fixed-size chunks.
+
+    Only one chunk is held in memory at a time. The chunks concatenate to exactly
+    the same text as encoding the whole stream at once.
+
+    Parameters
+    ----------
+    stream : BinaryIO
+        An open binary stream (file, archive member, ``io.BytesIO``...).
+    chunk_size : int, optional
+        Number of input bytes per chunk. Must be a multiple of 3.
+
+    Yields
+    ------
+    str
+        Consecutive pieces of the base64 encoding.
+
+    Raises
+    ------
+    ValueError
+        If `chunk_size` is not a positive multiple of 3.
+    """
+    if chunk_size <= 0 or chunk_size % 3:
+        raise ValueError(f"chunk_size must be a positive multiple of 3, got {chunk_size}")
+    pending = b''
+    while True:
+        data = stream.read(chunk_size)
+        if not data:
+            break
+        pending += data
+        usable = len(pending) - len(pending) % 3  # short reads must not split a 3-byte group
+        if usable:
+            yield base64.b64encode(pending[:usable]).decode("ascii")
+            pending = pending[usable:]
+    if pending:
+        yield base64.b64encode(pending).decode("ascii")
+
+def iter_deflate_base64_chunks(stream: BinaryIO, chunk_size: int = BASE64_CHUNK_SIZE, level: int = DEFLATE_LEVEL) -> Iterator[str]:
+    """
+    Deflate (zlib format) and base64-encode a binary stream in fixed-size chunks.
+
+    The result is what the HTML template's Oz("...") helper inflates in the browser
+    with `DecompressionStream("deflate")`. Only one chunk is held in memory at a time.
+
+    Parameters
+    ----------
+    stream : BinaryIO
+        An open binary stream.
+    chunk_size : int, optional
+        Number of input bytes read per step.
+    level : int, optional
+        zlib compression level (default is 9).
+
+    Yields
+    ------
+    str
+        Consecutive pieces of the base64 encoding of the compressed stream.
+    """
+    compressor = zlib.compressobj(level)
+    pending = b''
+    while True:
+        data = stream.read(chunk_size)
+        if not data:
+            break
+        pending += compressor.compress(data)
+        usable = len(pending) - len(pending) % 3
+        if usable:
+            yield base64.b64encode(pending[:usable]).decode("ascii")
+            pending = pending[usable:]
+    pending += compressor.flush()
+    if pending:
+        yield base64.b64encode(pending).decode("ascii")
+
+def should_compress(file_path: str) -> bool:
+    """
+    Return True if an asset is worth deflating before it is embedded.
+
+    Parameters
+    ----------
+    file_path : str
+        Path (or name) of the asset.
+
+    Returns
+    -------
+    bool
+        False for formats that are already compressed (see `INCOMPRESSIBLE_EXTENSIONS`).
+    """
+    return Path(file_path).suffix.lower() not in INCOMPRESSIBLE_EXTENSIONS
+
+def iter_file_base64(file_path: str, chunk_size: int = BASE64_CHUNK_SIZE) -> Iterator[str]:
+    """
+    Base64-encode a file in fixed-size chunks, for streaming into Ou("...").
+
+    Large files (see `MMAP_THRESHOLD`) are read through a memory map, so the
+    encoder never holds more than one chunk of the file in process memory.
+
+    Parameters
+    ----------
+    file_path : str
+        Path to the file.
+    chunk_size : int, optional
+        Number of input bytes per chunk. Must be a multiple of 3.
+
+    Yields
+    ------
+    str
+        Consecutive pieces of the base64 encoding of the file.
+    """
+    with open(file_path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size < MMAP_THRESHOLD:
+            yield from iter_base64_chunks(f, chunk_size)
+            return
+        if chunk_size <= 0 or chunk_size % 3:
+            raise ValueError(f"chunk_size must be a positive multiple of 3, got {chunk_size}")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            for start in range(0, size, chunk_size):
+                yield base64.b64encode(mapped[start:start + chunk_size]).decode("ascii")
 ############################################################################### 
 def write_text_file(
     filename: str,
@@ -603,141 +799,711 @@ def replace_text(input_text: str, replace_flag: str, replacement_text: str, add_
     else:
         return input_text.replace(replace_flag, replacement_text)
 
-def create_html(directory: str, app_settings: Dict[str, Any], packages: Union[Dict[str, str], None] = None) -> str:
+def hashed_asset_name(file_path: str, sha256: str) -> str:
     """
-    Generates an HTML file content for an stlite application.
+    Return the content-hashed file name used for an external asset.
 
-    This function takes directory, application settings, and optional package information
-    to populate an HTML template. It replaces placeholders in the template with
-    actual values like CSS links, JS links, Pyodide version, application name,
-    requirements, entrypoint, main application script content, and other files.
+    Parameters
+    ----------
+    file_path : str
+        The asset path (only its file name is used).
+    sha256 : str
+        The hex SHA-256 of the asset's content.
+
+    Returns
+    -------
+    str
+        E.g. ``'medals.3fa9c1e2b4d5a6f7.csv'`` for ``'data/medals.csv'``.
+    """
+    name = PurePosixPath(file_path.replace(os.sep, '/'))
+    return f"{name.stem}.{sha256[:16]}{name.suffix}"
+
+def place_external_assets(directory: Union[str, AppSource], app_files: List[str], threshold: int, output_dir: str,
+                          cache: Optional[BuildCache] = None) -> Dict[str, str]:
+    """
+    Copy large assets next to the HTML file under content-hashed names.
+
+    Non-Python files of at least `threshold` bytes are copied to
+    ``<output_dir>/s2s_assets/``. Because the file name contains a hash of the
+    content, an unchanged asset keeps its name (and its browser-cached copy)
+    across builds and is not copied again.
 
     Parameters
     ----------
-    directory : str
-        The root directory of the application where 'settings.yaml' and other app files are located.
-    app_settings : Dict[str, Any]
-        A dictionary containing application settings, typically loaded from 'settings.yaml'.
-        Expected keys include:
-        - '|STLITE_CSS|': URL for the stlite CSS file.
-        - '|STLITE_JS|': URL for the stlite JavaScript file.
-        - '|PYODIDE_VERSION|': Version of Pyodide to use.
-        - '|APP_NAME|': Name of the application.
-        - '|APP_REQUIREMENTS|': A list of Python package requirements.
-        - '|APP_ENTRYPOINT|': The main Python script for the application (e.g., 'streamlit_app.py').
-        - '|APP_FILES|': A list of other files to include in the stlite bundle.
-    packages : Union[Dict[str, str], None], optional
-        A dictionary mapping package names to specific versions. If None (default),
-        the latest versions specified in requirements are used. This allows for
-        pinning package versions if needed.
+    directory : Union[str, AppSource]
+        The root directory of the application, or the `AppSource` to read the files from.
+    app_files : List[str]
+        File paths relative to `directory`.
+    threshold : int
+        Minimum size in bytes of an asset placed outside the HTML.
+    output_dir : str
+        The directory the HTML file is written to.
+    cache : Optional[BuildCache], optional
+        Build cache to reuse content hashes from. If None, every candidate is hashed.
+
+    Returns
+    -------
+    Dict[str, str]
+        Mapping of each external asset (relative to `directory`) to its URL
+        relative to the HTML file.
+    """
+    urls = {}
+    source = as_app_source(directory)
+    asset_dir = os.path.join(output_dir, EXTERNAL_ASSETS_DIRNAME)
+    for file_j in app_files:
+        if Path(file_j).suffix == '.py' or source.size(file_j) < threshold:
+            continue
+        sha256 = cache.content_hash(file_j) if cache is not None else source.sha256(file_j)
+        name = hashed_asset_name(file_j, sha256)
+        target = os.path.join(asset_dir, name)
+        if not os.path.isfile(target):
+            os.makedirs(asset_dir, exist_ok=True)
+            tmp_target = f"{target}.{os.getpid()}.tmp"
+            try:
+                path = source.local_path(file_j)
+                if path is not None:
+                    shutil.copyfile(path, tmp_target)
+                else:
+                    with source.open(file_j) as src, open(tmp_target, 'wb') as dst:
+                        shutil.copyfileobj(src, dst)
+                os.replace(tmp_target, target)
+            finally:
+                if os.path.exists(tmp_target):
+                    os.remove(tmp_target)
+        urls[file_j] = f"{EXTERNAL_ASSETS_DIRNAME}/{name}"
+    return urls
+
+def _payload_encoding(file_j: str, compress: bool) -> str:
+    """Return how a file's payload is embedded: 'text' for Python files, else its browser decoder ('Ou' or 'Oz')."""
+    if Path(file_j).suffix == '.py':
+        return 'text'
+    return 'Oz' if compress and should_compress(file_j) else 'Ou'
+
+def find_duplicate_files(directory: Union[str, AppSource], app_files: List[str], cache: Optional[BuildCache] = None,
+                         exclude: Optional[Mapping[str, str]] = None, compress: bool = False) -> Dict[str, str]:
+    """
+    Find app files whose content is identical to an earlier file in `app_files`.
+
+    Files are grouped by size first, so only files that share a size are hashed
+    (with hashes reused from `cache` where possible). Empty files are ignored.
+    Only files whose payloads are encoded the same way are treated as duplicates
+    (a ``.py`` file is embedded as text, other files as plain or deflated base64),
+    so every file sharing a payload is decoded correctly.
+
+    Parameters
+    ----------
+    directory : Union[str, AppSource]
+        The root directory of the application, or the `AppSource` to read the files from.
+    app_files : List[str]
+        File paths relative to `directory`, in bundle order.
+    cache : Optional[BuildCache], optional
+        Build cache to reuse content hashes from.
+    exclude : Optional[Mapping[str, str]], optional
+        Files to leave out (e.g. assets placed outside the HTML).
+    compress : bool, optional
+        Whether compressible assets are deflated (see `should_compress`). Default False.
+
+    Returns
+    -------
+    Dict[str, str]
+        Mapping of each duplicate file to the first file with the same content and encoding.
+    """
+    if exclude is None:
+        exclude = {}
+    source = as_app_source(directory)
+    by_size: Dict[int, List[str]] = {}
+    for file_j in app_files:
+        if file_j not in exclude:
+            by_size.setdefault(source.size(file_j), []).append(file_j)
+
+    duplicates = {}
+    for size, same_size in by_size.items():
+        if len(same_size) < 2 or size == 0:
+            continue  # unique size, or empty files (nothing to save)
+        first_by_key: Dict[Tuple[str, str], str] = {}
+        for file_j in same_size:
+            sha256 = cache.content_hash(file_j) if cache is not None else source.sha256(file_j)
+            key = (sha256, _payload_encoding(file_j, compress))
+            if key in first_by_key:
+                duplicates[file_j] = first_by_key[key]
+            else:
+                first_by_key[key] = file_j
+    return duplicates
+
+def _blob_table_files(app_files: List[str], duplicates: Mapping[str, str]) -> List[str]:
+    """Return the files stored in the blob table: the first copy of each duplicated file, in bundle order."""
+    shared = set(duplicates.values())
+    return [file_j for file_j in app_files if file_j in shared]
+
+def escape_block_text(text: str) -> str:
+    """
+    Escape text so it can be placed in a non-executable ``<script>`` block.
+
+    ``<`` becomes ``%3C`` (so the text can never close the block or open an HTML
+    comment) and ``%`` becomes ``%25``. The browser reverses this with Bs().
+
+    Parameters
+    ----------
+    text : str
+        The text to escape.
 
     Returns
     -------
     str
-        The generated HTML content as a string.
+        The escaped text.
+    """
+    return text.replace('%', '%25').replace('<', '%3C')
+
+def _iter_asset_payload(directory: Union[str, AppSource], file_j: str, cache: Optional[BuildCache] = None,
+                        compress: bool = False) -> Tuple[str, Iterator[str]]:
+    """Return the browser decoder ('Ou' or 'Oz') and the base64 payload chunks of a non-Python asset."""
+    source = as_app_source(directory)
+    if compress and should_compress(file_j):
+        if cache is not None:
+            return 'Oz', cache.fragment(file_j, 'deflate-b64', iter_deflate_base64_chunks)
+        def deflated() -> Iterator[str]:
+            with source.open(file_j) as f:
+                yield from iter_deflate_base64_chunks(f)
+        return 'Oz', deflated()
+    if cache is not None:
+        return 'Ou', cache.fragment(file_j, 'b64', iter_base64_chunks)
+    path = source.local_path(file_j)
+    if path is not None:
+        return 'Ou', iter_file_base64(path)
+    def encoded() -> Iterator[str]:
+        with source.open(file_j) as f:
+            yield from iter_base64_chunks(f)
+    return 'Ou', encoded()
+
+def load_app_text(source: AppSource, file_j: str, escape_text: bool = True) -> str:
+    """
+    Load an app text file (e.g. a Python file) from `source`, escaped as by `load_text_from_file`.
 
-    Raises
+    Parameters
+    ----------
+    source : AppSource
+        Where the app files are read from.
+    file_j : str
+        The file, relative to the app root.
+    escape_text : bool, optional
+        Whether to escape the text for a JavaScript template literal (default is True).
+
+    Returns
+    -------
+    str
+        The contents of the file.
+    """
+    path = source.local_path(file_j)
+    if path is not None:
+        return load_text_from_file(path, escape_text=escape_text)
+    text = source.read_text(file_j)
+    if escape_text:
+        for target, replacement in TEMPLATE_LITERAL_ESCAPES.items():
+            text = text.replace(target, replacement)
+    return text
+
+def iter_app_file_entries(directory: Union[str, AppSource], app_files: List[str], cache: Optional[BuildCache] = None,
+                          compress: bool = False, external_urls: Optional[Mapping[str, str]] = None,
+                          blocks: bool = False, duplicates: Optional[Mapping[str, str]] = None,
+                          recorder: Optional[SizeRecorder] = None) -> Iterator[str]:
+    """
+    Yield the JavaScript `files` entries for the given app files, one chunk at a time.
+
+    Python files are embedded as escaped template literals; all other files are
+    base64-encoded in fixed-size chunks and wrapped in Ou("..."), so a large
+    asset is never held in memory as a whole. With `compress`, compressible
+    assets are deflated first and wrapped in Oz("..."), which inflates them in
+    the browser before they are handed to stlite. Files listed in
+    `external_urls` are referenced by URL instead, and stlite fetches them.
+    With `blocks`, entries only refer to the ``<script>`` blocks written by
+    `iter_asset_blocks`, which are read when the app is mounted. Files with the
+    same content (see `find_duplicate_files`) share one payload: in the blob
+    table written by `iter_blob_table`, or in the first copy's block.
+
+    Parameters
+    ----------
+    directory : Union[str, AppSource]
+        The root directory of the application, or the `AppSource` to read the files from.
+    app_files : List[str]
+        File paths relative to `directory`.
+    cache : Optional[BuildCache], optional
+        Build cache to reuse encoded assets from. If None, every asset is encoded.
+    compress : bool, optional
+        If True, deflate compressible assets (see `should_compress`). Default False.
+    external_urls : Optional[Mapping[str, str]], optional
+        URLs (relative to the HTML file) of assets placed outside the HTML,
+        as returned by `place_external_assets`.
+    blocks : bool, optional
+        If True, refer to the payloads in ``<script>`` blocks instead of embedding them.
+    duplicates : Optional[Mapping[str, str]], optional
+        Mapping of duplicate files to the first file with the same content.
+    recorder : Optional[SizeRecorder], optional
+        If given, the bytes yielded for each file are added to its output size.
+
+    Yields
     ------
-    ValueError
-        If essential settings like CSS, JS, Pyodide version, or app entrypoint are missing,
-        or if the app entrypoint is not a '.py' file.
-    FileNotFoundError
-        If the HTML template or specified application files are not found.
+    str
+        Consecutive pieces of the `files` object body.
+    """
+    if external_urls is None:
+        external_urls = {}
+    if duplicates is None:
+        duplicates = {}
+    source = as_app_source(directory)
+    blob_index = {file_j: i for i, file_j in enumerate(_blob_table_files(app_files, duplicates))}
+    position = {file_j: j for j, file_j in enumerate(app_files)}
+
+    def entry(file_j: str) -> Iterator[str]:
+        bundle_path = file_j.replace(os.sep, '/')  # paths inside the bundle are the same on every OS
+        shared_file = duplicates.get(file_j, file_j)
+        if file_j in external_urls:
+            yield f'"{bundle_path}":' + f' {{url: new URL({json.dumps(external_urls[file_j])}, document.baseURI).href}},'
+        elif blocks:
+            block_id = ASSET_BLOCK_ID.format(position[shared_file])
+            encoding = _payload_encoding(file_j, compress)
+            if encoding == 'text':
+                yield f'"{bundle_path}": Bs("{block_id}"),'
+            else:
+                yield f'"{bundle_path}": {encoding}(Bt("{block_id}")),'
+        elif shared_file in blob_index:
+            yield f'"{bundle_path}": Bd({blob_index[shared_file]}),'
+        elif not Path(file_j).suffix == '.py':
+            decoder, payload = _iter_asset_payload(source, file_j, cache=cache, compress=compress)
+            yield f'"{bundle_path}":' + f' {decoder}("'
+            yield from payload
+            yield '"),'
+        else:
+            yield f'"{bundle_path}":' + '`' + load_app_text(source, file_j) + '`,'
+
+    for file_j in app_files:
+        yield from entry(file_j) if recorder is None else recorder.count(file_j, entry(file_j))
+
+def iter_asset_blocks(directory: Union[str, AppSource], app_files: List[str], cache: Optional[BuildCache] = None,
+                      compress: bool = False, external_urls: Optional[Mapping[str, str]] = None,
+                      duplicates: Optional[Mapping[str, str]] = None,
+                      recorder: Optional[SizeRecorder] = None) -> Iterator[str]:
+    """
+    Yield non-executable ``<script>`` blocks holding the app files' payloads.
+
+    Used when EMBED_MODE is 'blocks'. The browser's HTML parser skips over these
+    blocks cheaply; unlike string literals in the module script, they are never
+    parsed as JavaScript. Python files are stored as text (see `escape_block_text`),
+    other files as base64 (deflated with `compress`, as in `iter_app_file_entries`).
+
+    Parameters
+    ----------
+    directory : Union[str, AppSource]
+        The root directory of the application, or the `AppSource` to read the files from.
+    app_files : List[str]
+        File paths relative to `directory`, in the same order as given to
+        `iter_app_file_entries`.
+    cache : Optional[BuildCache], optional
+        Build cache to reuse encoded assets from. If None, every asset is encoded.
+    compress : bool, optional
+        If True, deflate compressible assets (see `should_compress`). Default False.
+    external_urls : Optional[Mapping[str, str]], optional
+        Assets placed outside the HTML; no block is written for them.
+    duplicates : Optional[Mapping[str, str]], optional
+        Duplicate files; no block is written for them, as they share the first copy's block.
+    recorder : Optional[SizeRecorder], optional
+        If given, the bytes of each block are added to its file's output size.
+
+    Yields
+    ------
+    str
+        Consecutive pieces of the ``<script>`` blocks.
+    """
+    if external_urls is None:
+        external_urls = {}
+    if duplicates is None:
+        duplicates = {}
+
+    source = as_app_source(directory)
+
+    def block(j: int, file_j: str) -> Iterator[str]:
+        yield f'\n    <script type="application/octet-stream" id="{ASSET_BLOCK_ID.format(j)}">'
+        if Path(file_j).suffix == '.py':
+            yield escape_block_text(load_app_text(source, file_j, escape_text=False))
+        else:
+            yield from _iter_asset_payload(source, file_j, cache=cache, compress=compress)[1]
+        yield '</script>'
+
+    for j, file_j in enumerate(app_files):
+        if file_j in external_urls or file_j in duplicates:
+            continue
+        yield from block(j, file_j) if recorder is None else recorder.count(file_j, block(j, file_j))
+
+def iter_blob_table(directory: Union[str, AppSource], app_files: List[str], duplicates: Mapping[str, str],
+                    cache: Optional[BuildCache] = None, compress: bool = False,
+                    recorder: Optional[SizeRecorder] = None) -> Iterator[str]:
+    """
+    Yield the blob table holding one payload for each set of identical files.
+
+    Used in 'inline' EMBED_MODE. The table is a JavaScript array declared before
+    ``mount()``; every path with that content refers to its entry with Bd(index).
+    Nothing is yielded if there are no duplicates.
+
+    Parameters
+    ----------
+    directory : Union[str, AppSource]
+        The root directory of the application, or the `AppSource` to read the files from.
+    app_files : List[str]
+        File paths relative to `directory`, in bundle order.
+    duplicates : Mapping[str, str]
+        Mapping of duplicate files to the first file with the same content.
+    cache : Optional[BuildCache], optional
+        Build cache to reuse encoded assets from. If None, every asset is encoded.
+    compress : bool, optional
+        If True, deflate compressible assets (see `should_compress`). Default False.
+    recorder : Optional[SizeRecorder], optional
+        If given, the bytes of each shared payload are added to the output size
+        of the first file with that content.
+
+    Yields
+    ------
+    str
+        Consecutive pieces of the blob table declaration.
+    """
+    shared_files = _blob_table_files(app_files, duplicates)
+    if not shared_files:
+        return
+
+    source = as_app_source(directory)
+
+    def blob(file_j: str) -> Iterator[str]:
+        if Path(file_j).suffix == '.py':
+            yield '`' + load_app_text(source, file_j) + '`,\n'
+        else:
+            decoder, payload = _iter_asset_payload(source, file_j, cache=cache, compress=compress)
+            yield f'{decoder}("'
+            yield from payload
+            yield '"),\n'
+
+    yield 'const S2S_BLOBS = [\n'
+    for file_j in shared_files:
+        yield from blob(file_j) if recorder is None else recorder.count(file_j, blob(file_j))
+    yield '];\n'
+
+def _prepare_html(directory: Union[str, AppSource], app_settings: Dict[str, Any], packages: Union[Dict[str, str], None] = None,
+                  cache: Optional[BuildCache] = None, output_dir: Optional[str] = None,
+                  recorder: Optional[SizeRecorder] = None) -> Tuple[Segments, Dict[str, TemplateValue], List[str]]:
+    """
+    Validate the settings and collect the template and its placeholder values.
+
+    Every value except '|APP_FILES|' is computed eagerly, so configuration errors are
+    raised before any output is produced. External assets (split-output mode) are
+    also copied here. See `create_html` for parameters and errors.
+
+    Returns
+    -------
+    Tuple[Segments, Dict[str, TemplateValue], List[str]]
+        The parsed HTML template, the value for each of its placeholders, and the
+        paths of the external asset files the HTML references.
     """
     if packages is None:
         packages = {}
-    #1 load html file
-    html = load_text_from_subfolder(subfolder='templates', filename='html_template.txt')
-    
-    #2) replace css
+    source = as_app_source(directory)
+    #1 load html file (parsed once into literal/placeholder segments and cached)
+    template = parse_template(load_text_from_subfolder(subfolder='templates', filename='html_template.txt'))
+    # Values for every placeholder are collected first and substituted in a single pass at the end,
+    # so placeholder-like text inside user files is never rewritten.
+    values: Dict[str, TemplateValue] = {}
+
+    #2) css
     if app_settings.get('|STLITE_CSS|') is not None:
-        html = replace_text(html, '|STLITE_CSS|', app_settings.get('|STLITE_CSS|'), add_stlite_punctuation = False)
+        values['|STLITE_CSS|'] = app_settings.get('|STLITE_CSS|')
     else: raise ValueError("No stlite css version defined.")
-        
-    
-    #3) replace JS
+
+
+    #3) JS
     if app_settings.get('|STLITE_JS|') is not None:
-        html = replace_text(html, '|STLITE_JS|', app_settings.get('|STLITE_JS|'), add_stlite_punctuation = False)
+        values['|STLITE_JS|'] = app_settings.get('|STLITE_JS|')
     else: raise ValueError("No stlite JS version defined.")
-    
-    #4) replace Pyodide
+
+    #4) Pyodide
     if app_settings.get('|PYODIDE_VERSION|') is not None:
-        html = replace_text(html, '|PYODIDE_VERSION|', app_settings.get('|PYODIDE_VERSION|'), add_stlite_punctuation = False)
+        values['|PYODIDE_VERSION|'] = app_settings.get('|PYODIDE_VERSION|')
     else: raise ValueError("No stlite Pyodide version defined.")
-    
-    #5) replace '|APP_NAME|'
+
+    #5) '|APP_NAME|'
     if app_settings.get('APP_NAME') is not None:
-        html = replace_text(html, '|APP_NAME|', app_settings.get('APP_NAME'), add_stlite_punctuation = False)
+        values['|APP_NAME|'] = app_settings.get('APP_NAME')
     else:
-        html = replace_text(html, '|APP_NAME|', '', add_stlite_punctuation = False)
-        
-    #6) replace '|APP_REQUIREMENTS|'
+        values['|APP_NAME|'] = ''
+
+    #6) '|APP_REQUIREMENTS|'
     if app_settings.get('APP_REQUIREMENTS') is not None:
         package_requirements = [packages.get(x,x) for x in app_settings.get('APP_REQUIREMENTS')] # note, the dictionary packages allows us to define specific package versions. Not necessary, but may be useful one day.
-        package_requirements = str(package_requirements)
-        html = replace_text(html, '|APP_REQUIREMENTS|', package_requirements, add_stlite_punctuation = False)
+        values['|APP_REQUIREMENTS|'] = str(package_requirements)
     else:
-        html = replace_text(html, '|APP_REQUIREMENTS|', '[]', add_stlite_punctuation = False)    
-        
-    #7) replace '|APP_ENTRYPOINT|' 
+        values['|APP_REQUIREMENTS|'] = '[]'
+
+    #7) '|APP_ENTRYPOINT|'
     if app_settings.get('APP_ENTRYPOINT') is not None:
-        html = replace_text(html, '|APP_ENTRYPOINT|', app_settings.get('APP_ENTRYPOINT'), add_stlite_punctuation = False)
+        values['|APP_ENTRYPOINT|'] = app_settings.get('APP_ENTRYPOINT')
     else:
-        html = replace_text(html, '|APP_ENTRYPOINT|', '', add_stlite_punctuation = False)
-    
-    #8) replace '|APP_HOME|'
+        values['|APP_ENTRYPOINT|'] = ''
+
+    #8) '|APP_HOME|'
     entrypoint = app_settings.get('APP_ENTRYPOINT')
     if not entrypoint:
         raise ValueError("APP_ENTRYPOINT not defined in settings.yaml")
 
-    entrypoint_path = os.path.join(directory, entrypoint)
+    entrypoint_path = source.local_path(entrypoint) or entrypoint
     if not Path(entrypoint_path).suffix == '.py':
         raise ValueError(f"APP ENTRYPOINT must be a .py file: {entrypoint_path}")
 
-    html = replace_text(html, '|APP_HOME|', load_text_from_file(entrypoint_path), add_stlite_punctuation=False)
-    
-    #9) replace |CONFIG|
+    values['|APP_HOME|'] = load_app_text(source, entrypoint)
+    if recorder is not None:
+        recorder.encoded[entrypoint] = utf8_length(values['|APP_HOME|'])
+
+    #9) |CONFIG|
     #check if it exists
-    if not file_exists(os.path.join(directory,str(app_settings.get('CONFIG')))): 
+    if not source.exists(str(app_settings.get('CONFIG'))):
         print(f"** No config file found - setting config blank")
-        config = "{}"
+        config = {}
     else:
+        config_path = source.local_path(app_settings.get('CONFIG')) or app_settings.get('CONFIG')
         #ensure is a toml file
-        if not Path(os.path.join(directory,app_settings.get('CONFIG'))).suffix == '.toml': raise ValueError(f"APP CONFIG must be a .toml file: {os.path.join(directory,app_settings.get('CONFIG'))}")
+        if not Path(config_path).suffix == '.toml': raise ValueError(f"APP CONFIG must be a .toml file: {config_path}")
+        elif source.root is not None:
+            config = flatten_dict(load_toml_from_file(config_path))
         else:
-            config = flatten_dict(load_toml_from_file(os.path.join(directory,app_settings.get('CONFIG'))))
-    config = str(config).replace('False','false').replace('True','true')        
-    html = replace_text(html, '|CONFIG|', config, add_stlite_punctuation = False)           
-    
-    
-    #10) replace '|APP_FILES|' 
-    app_files = ''
-    if app_settings.get('APP_FILES') is not None:
-        for file_j in app_settings.get('APP_FILES'):
-            if not Path(os.path.join(directory,file_j)).suffix == '.py': 
-                binary_text = file_to_ou_base64_string(os.path.join(directory,file_j))
-                app_files += f'"{file_j}":' + ' Ou("' + binary_text + '"),'
-            else:
-                app_files += f'"{file_j}":' + '`' + load_text_from_file(os.path.join(directory,file_j)) + '`,'
-    html = replace_text(html, '|APP_FILES|', app_files, add_stlite_punctuation = False)
+            try:
+                config = flatten_dict(tomli.loads(source.read_text(app_settings.get('CONFIG'))))
+            except (tomli.TOMLDecodeError, UnicodeDecodeError) as e:
+                raise RuntimeError(f"Failed to parse TOML content from {config_path}: {e}") from e
+    # Serialized as JSON with sorted keys, so the same config always produces the same bytes.
+    values['|CONFIG|'] = json.dumps(config, sort_keys=True, default=str)
+
+
+    #10) '|APP_FILES|' - produced lazily, file by file, while the template is rendered.
+    # In split-output mode, assets above the threshold are copied next to the HTML and referenced by URL.
+    app_files = app_settings.get('APP_FILES') or []
+    if output_dir is None:
+        output_dir = source.root
+    embed_mode = app_settings.get('EMBED_MODE') or 'inline'
+    if embed_mode not in EMBED_MODES:
+        raise ValueError(f"EMBED_MODE must be one of {list(EMBED_MODES)}: {embed_mode}")
+    compress = app_settings.get('COMPRESS_ASSETS') is True
+    threshold = app_settings.get('EXTERNAL_ASSET_THRESHOLD')
+    external_urls: Dict[str, str] = {}
+    if threshold is not None:
+        if isinstance(threshold, bool) or not isinstance(threshold, int) or threshold < 0:
+            raise ValueError(f"EXTERNAL_ASSET_THRESHOLD must be a non-negative number of bytes: {threshold}")
+        if output_dir is None:
+            raise ValueError("EXTERNAL_ASSET_THRESHOLD needs an output directory.")
+        external_urls = place_external_assets(source, app_files, threshold, output_dir, cache=cache)
+    # Files with identical content are embedded once.
+    duplicates = find_duplicate_files(source, app_files, cache=cache, exclude=external_urls, compress=compress)
+    if duplicates:
+        saved_bytes = sum(source.size(f) for f in duplicates)
+        print(f"* Deduplicated {len(duplicates)} identical file(s) ({saved_bytes:,} bytes embedded only once).")
+    if recorder is not None:
+        recorder.duplicates.update(duplicates)
+        recorder.external.update(external_urls)
+        recorder.embed_mode = embed_mode
+    values['|APP_FILES|'] = iter_app_file_entries(source, app_files, cache=cache, compress=compress,
+                                                  external_urls=external_urls, blocks=embed_mode == 'blocks',
+                                                  duplicates=duplicates, recorder=recorder)
+    # With EMBED_MODE 'blocks', the payloads go in <script> blocks ahead of the module script instead.
+    if embed_mode == 'blocks':
+        values['|ASSET_BLOCKS|'] = iter_asset_blocks(source, app_files, cache=cache, compress=compress,
+                                                     external_urls=external_urls, duplicates=duplicates,
+                                                     recorder=recorder)
+        values['|BLOB_TABLE|'] = ''
+    else:
+        values['|ASSET_BLOCKS|'] = ''
+        values['|BLOB_TABLE|'] = iter_blob_table(source, app_files, duplicates, cache=cache, compress=compress,
+                                                 recorder=recorder)
 
     #10) Handle SharedWorker
     if app_settings.get('SHARED_WORKER') is True:
-        html = replace_text(html, '|SHARED_WORKER_OPTION|', 'sharedWorker: true,', add_stlite_punctuation=False)
+        values['|SHARED_WORKER_OPTION|'] = 'sharedWorker: true,'
     else:
-        html = replace_text(html, '|SHARED_WORKER_OPTION|', '', add_stlite_punctuation=False)
+        values['|SHARED_WORKER_OPTION|'] = ''
 
     #11) Handle IDBFS Mountpoints
     if app_settings.get('IDBFS_MOUNTPOINTS') is not None:
-        import json
         mountpoints_str = json.dumps(app_settings.get('IDBFS_MOUNTPOINTS'))
-        replacement = f"idbfsMountpoints: {mountpoints_str},"
-        html = replace_text(html, '|IDBFS_MOUNTPOINTS|', replacement, add_stlite_punctuation=False)
+        values['|IDBFS_MOUNTPOINTS|'] = f"idbfsMountpoints: {mountpoints_str},"
     else:
-        html = replace_text(html, '|IDBFS_MOUNTPOINTS|', '', add_stlite_punctuation=False)
-    
-    #12) return html
-    return html
-        
-    
-    
+        values['|IDBFS_MOUNTPOINTS|'] = ''
+
+    external_paths = sorted({os.path.join(output_dir, *url.split('/')) for url in external_urls.values()})
+    return template, values, external_paths
+
+
+def create_html(directory: Union[str, AppSource], app_settings: Dict[str, Any], packages: Union[Dict[str, str], None] = None,
+                cache: Optional[BuildCache] = None, output_dir: Optional[str] = None) -> str:
+    """
+    Generates an HTML file content for an stlite application.
+
+    This function takes directory, application settings, and optional package information
+    to populate an HTML template. It replaces placeholders in the template with
+    actual values like CSS links, JS links, Pyodide version, application name,
+    requirements, entrypoint, main application script content, and other files.
+
+    Parameters
+    ----------
+    directory : Union[str, AppSource]
+        The root directory of the application where 'settings.yaml' and other app files are located,
+        or the `AppSource` to read the app files from.
+    app_settings : Dict[str, Any]
+        A dictionary containing application settings, typically loaded from 'settings.yaml'.
+        Expected keys include:
+        - '|STLITE_CSS|': URL for the stlite CSS file.
+        - '|STLITE_JS|': URL for the stlite JavaScript file.
+        - '|PYODIDE_VERSION|': Version of Pyodide to use.
+        - '|APP_NAME|': Name of the application.
+        - '|APP_REQUIREMENTS|': A list of Python package requirements.
+        - '|APP_ENTRYPOINT|': The main Python script for the application (e.g., 'streamlit_app.py').
+        - '|APP_FILES|': A list of other files to include in the stlite bundle.
+        - 'COMPRESS_ASSETS': If True, deflate non-Python assets before embedding them.
+        - 'EXTERNAL_ASSET_THRESHOLD': If set, non-Python assets of at least this many
+          bytes are written to `output_dir`/s2s_assets/ and referenced by URL (split-output mode).
+        - 'EMBED_MODE': 'inline' (default) to embed payloads in the module script, or 'blocks'
+          to embed them in non-executable <script> blocks read at mount time.
+    packages : Union[Dict[str, str], None], optional
+        A dictionary mapping package names to specific versions. If None (default),
+        the latest versions specified in requirements are used. This allows for
+        pinning package versions if needed.
+    cache : Optional[BuildCache], optional
+        Build cache to reuse encoded assets from (see `BuildCache`). If None (default),
+        every asset is encoded.
+    output_dir : Optional[str], optional
+        The directory the HTML will be served from. External assets are written
+        there in split-output mode. Defaults to `directory`.
+
+    Returns
+    -------
+    str
+        The generated HTML content as a string.
+
+    Raises
+    ------
+    ValueError
+        If essential settings like CSS, JS, Pyodide version, or app entrypoint are missing,
+        or if the app entrypoint is not a '.py' file.
+    FileNotFoundError
+        If the HTML template or specified application files are not found.
+    """
+    template, values, _ = _prepare_html(directory, app_settings, packages=packages, cache=cache, output_dir=output_dir)
+    return render_template(template, values)
+
+def write_html(
+    filename: str,
+    directory: Union[str, AppSource],
+    app_settings: Dict[str, Any],
+    packages: Union[Dict[str, str], None] = None,
+    encoding: str = "utf-8",
+    cache: Optional[BuildCache] = None,
+    recorder: Optional[SizeRecorder] = None,
+    timer: Optional[BuildTimer] = None
+) -> List[str]:
+    """
+    Generate the stlite HTML for an application and stream it straight to a file.
+
+    This produces the same document as `create_html`, but template segments and
+    assets are written to the file as they are generated, and assets are
+    base64-encoded in fixed-size chunks. Peak memory therefore stays roughly
+    constant regardless of bundle size. The document is written to a temporary
+    file first and moved into place once complete, so a failed build never
+    leaves a truncated HTML file behind.
+
+    Parameters
+    ----------
+    filename : str
+        The path of the HTML file to write.
+    directory : Union[str, AppSource]
+        The root directory of the application, or the `AppSource` to read the files from.
+    app_settings : Dict[str, Any]
+        The application settings (see `create_html`).
+    packages : Union[Dict[str, str], None], optional
+        Package version overrides (see `create_html`).
+    encoding : str, optional
+        The output file encoding (default is 'utf-8').
+    cache : Optional[BuildCache], optional
+        Build cache to reuse encoded assets from. If None (default), every asset is encoded.
+    recorder : Optional[SizeRecorder], optional
+        If given, filled with the output bytes of each app file (see `size_report`).
+    timer : Optional[BuildTimer], optional
+        If given, the 'prepare' and 'render' stages are recorded on it, and the
+        'encode' stage too when a `recorder` is given (see `build_result`).
+
+    Returns
+    -------
+    List[str]
+        The paths of the external asset files written next to `filename` in
+        split-output mode (empty when every asset is embedded).
+
+    Raises
+    ------
+    ValueError
+        If the settings are invalid (see `create_html`).
+    FileNotFoundError
+        If an application file is missing.
+    """
+    if timer is None:
+        timer = BuildTimer()
+    with timer.stage('prepare'):
+        template, values, external_paths = _prepare_html(directory, app_settings, packages=packages, cache=cache,
+                                                         output_dir=os.path.dirname(os.path.abspath(filename)),
+                                                         recorder=recorder)
+    tmp_filename = f"{filename}.tmp"
+    try:
+        f = open(tmp_filename, 'w', encoding=encoding, newline='\n')  # same line endings on every OS
+    except IOError:
+        print(f"Error writing to {filename}")
+        return []
+    # Payloads are encoded while the template is rendered; the recorder separates the two.
+    wall, cpu = time.perf_counter(), time.process_time()
+    try:
+        with f:
+            render_template_to(template, values, f)
+        os.replace(tmp_filename, filename)
+    finally:
+        if os.path.exists(tmp_filename):
+            os.remove(tmp_filename)
+    wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+    if recorder is not None:
+        timer.record('encode', recorder.encode_seconds, recorder.encode_cpu_seconds, sum(recorder.encoded.values()))
+        wall -= recorder.encode_seconds
+        cpu -= recorder.encode_cpu_seconds
+    timer.record('render', wall, cpu, os.path.getsize(filename))
+    print(f"Content successfully written to {filename}")
+    if external_paths:
+        print(f"* {len(external_paths)} asset(s) written to {os.path.join(os.path.dirname(filename), EXTERNAL_ASSETS_DIRNAME)}")
+    return external_paths
+
+def write_bundle_hash(filename: str) -> str:
+    """
+    Write the SHA-256 of a generated HTML file to ``<filename>.sha256``.
+
+    The file uses the ``sha256sum`` format (``<hex digest>  <file name>``), so it
+    can be checked with ``sha256sum -c``. It is only rewritten when the digest
+    changes, so deploy tools can skip unchanged apps by comparing it (or its
+    modification time) with the deployed copy.
+
+    Parameters
+    ----------
+    filename : str
+        The path of the generated HTML file.
+
+    Returns
+    -------
+    str
+        The hex SHA-256 digest of the file.
+    """
+    digest = file_sha256(filename)
+    hash_filename = f"{filename}.sha256"
+    content = f"{digest}  {os.path.basename(filename)}\n"
+    try:
+        with open(hash_filename, 'r', encoding='utf-8') as f:
+            unchanged = f.read() == content
+    except OSError:
+        unchanged = False
+    if not unchanged:
+        with open(hash_filename, 'w', encoding='utf-8', newline='\n') as f:
+            f.write(content)
+    return digest
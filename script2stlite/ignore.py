@@ -0,0 +1,200 @@
+"""
+Gitignore-style ignore rules for auto-discovery.
+
+Patterns are read from ``.s2signore`` files (and, optionally, ``.gitignore``
+files) anywhere in the project and follow gitignore semantics:
+
+* ``#`` starts a comment; blank lines are skipped.
+* ``*`` and ``?`` match within one path segment, ``[abc]`` matches a character class.
+* ``**`` matches across segments (``notebooks/**``, ``**/cache``, ``a/**/b``).
+* A pattern without a ``/`` (other than a trailing one) matches at any depth;
+  otherwise it is anchored to the directory of the file that defines it.
+* A trailing ``/`` only matches directories.
+* ``!`` re-includes a path excluded by an earlier pattern. The last matching
+  pattern wins, and patterns in deeper directories come after shallower ones.
+
+Each pattern is compiled to a regular expression once. Discovery checks
+directories before descending into them, so an ignored subtree is never walked.
+"""
+import os
+import re
+from typing import Iterable, List, Optional, Pattern, Tuple
+
+S2SIGNORE_FILENAME = '.s2signore'
+GITIGNORE_FILENAME = '.gitignore'
+
+
+def _translate_glob(pattern: str) -> str:
+    """Translate a gitignore glob (without leading or trailing '/') into a regular expression."""
+    regex = []
+    i, n = 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        if c == '*':
+            if pattern.startswith('**', i) and (i == 0 or pattern[i - 1] == '/') and (i + 2 == n or pattern[i + 2] == '/'):
+                if i + 2 == n:
+                    regex.append('.*')          # 'dir/**': everything inside
+                    i += 2
+                else:
+                    regex.append('(?:.*/)?')    # '**/': zero or more directories
+                    i += 3
+                continue
+            while i < n and pattern[i] == '*':  # any other run of '*' stays within one segment
+                i += 1
+            regex.append('[^/]*')
+            continue
+        if c == '?':
+            regex.append('[^/]')
+        elif c == '[':
+            start = i + 1
+            if pattern[start:start + 1] in ('!', '^'):
+                start += 1
+            if pattern[start:start + 1] == ']':
+                start += 1  # a leading ']' is part of the class
+            end = pattern.find(']', start)
+            if end == -1:
+                regex.append(re.escape(c))
+            else:
+                body = pattern[i + 1:end]
+                if body[:1] in ('!', '^'):
+                    body = '^' + body[1:]
+                regex.append('[' + body.replace('\\', '\\\\') + ']')
+                i = end
+        elif c == '\\' and i + 1 < n:
+            i += 1
+            regex.append(re.escape(pattern[i]))
+        else:
+            regex.append(re.escape(c))
+        i += 1
+    return ''.join(regex)
+
+
+def compile_pattern(line: str) -> Optional[Tuple[Pattern[str], bool, bool]]:
+    """
+    Compile one line of an ignore file.
+
+    Parameters
+    ----------
+    line : str
+        A line from a ``.s2signore`` or ``.gitignore`` file.
+
+    Returns
+    -------
+    Optional[Tuple[Pattern[str], bool, bool]]
+        ``(regex, negated, directory_only)``, or None for blank lines and comments.
+        The regex matches paths relative to the directory defining the pattern,
+        using ``/`` as separator.
+    """
+    line = line.rstrip('\n').rstrip('\r')
+    if not line.endswith('\\ '):
+        line = line.rstrip(' ')
+    if not line or line.startswith('#'):
+        return None
+    negated = line.startswith('!')
+    if negated:
+        line = line[1:]
+    directory_only = line.endswith('/')
+    line = line.rstrip('/')
+    if not line:
+        return None
+    anchored = '/' in line
+    glob = _translate_glob(line.lstrip('/'))
+    regex = ('^' if anchored else '^(?:.*/)?') + glob + '$'
+    return re.compile(regex, re.DOTALL), negated, directory_only
+
+
+class IgnoreRules:
+    """
+    Ordered set of compiled ignore patterns, possibly from several ignore files.
+
+    Parameters
+    ----------
+    patterns : Optional[Iterable[str]], optional
+        Root-level pattern lines to start with.
+    """
+    def __init__(self, patterns: Optional[Iterable[str]] = None):
+        # (base directory, regex, negated, directory_only), in precedence order.
+        self._rules: List[Tuple[str, Pattern[str], bool, bool]] = []
+        if patterns is not None:
+            self.add_patterns(patterns)
+
+    def __bool__(self) -> bool:
+        return bool(self._rules)
+
+    def copy(self) -> 'IgnoreRules':
+        """Return an independent copy, so patterns added to it do not affect this set."""
+        rules = IgnoreRules()
+        rules._rules = list(self._rules)
+        return rules
+
+    def add_patterns(self, lines: Iterable[str], base: str = '') -> None:
+        """
+        Add pattern lines defined in the directory `base` (relative, '/'-separated; '' for the root).
+
+        Parameters
+        ----------
+        lines : Iterable[str]
+            Lines of an ignore file.
+        base : str, optional
+            Directory the patterns are relative to.
+        """
+        for line in lines:
+            compiled = compile_pattern(line)
+            if compiled is not None:
+                self._rules.append((base, *compiled))
+
+    def add_file(self, path: str, base: str = '') -> bool:
+        """
+        Add the patterns of an ignore file, if it exists.
+
+        Parameters
+        ----------
+        path : str
+            Path of the ignore file.
+        base : str, optional
+            Directory (relative to the project root, '/'-separated) that contains it.
+
+        Returns
+        -------
+        bool
+            True if the file was read.
+        """
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                self.add_patterns(f.read().splitlines(), base=base)
+        except (OSError, UnicodeDecodeError):
+            return False
+        return True
+
+    def is_ignored(self, rel_path: str, is_dir: bool = False) -> bool:
+        """
+        Return True if a path is excluded by the rules.
+
+        Only the path itself is tested; discovery never descends into ignored
+        directories, so their contents do not need to be checked.
+
+        Parameters
+        ----------
+        rel_path : str
+            Path relative to the project root ('/' or os.sep separated).
+        is_dir : bool, optional
+            Whether the path is a directory.
+
+        Returns
+        -------
+        bool
+            True if the last matching pattern excludes the path.
+        """
+        rel_path = rel_path.replace(os.sep, '/')
+        for base, regex, negated, directory_only in reversed(self._rules):
+            if directory_only and not is_dir:
+                continue
+            if base:
+                if not rel_path.startswith(base + '/'):
+                    continue
+                candidate = rel_path[len(base) + 1:]
+            else:
+                candidate = rel_path
+            if regex.match(candidate):
+                return not negated
+        return False
@@ -0,0 +1,253 @@
+"""
+Static import analysis of the bundled Python files.
+
+Every requirement is downloaded and installed by micropip when the page
+loads, so requirements that no bundled file imports only slow the app down,
+while third-party imports that no requirement covers fail at runtime. The
+`.py` files of the bundle (entrypoint, ``pages/`` and helper modules) are
+parsed with `ast` to find their top-level imports, which are mapped to
+distribution names and compared with APP_REQUIREMENTS.
+
+The analysis is static: modules imported dynamically (``importlib``,
+``__import__``) and packages only used indirectly (e.g. ``openpyxl`` through
+``pandas.read_excel``) are not seen, so unused requirements are only pruned
+when asked to. A requirement counts as used whenever an import could belong
+to it: namespace packages such as ``google`` or ``azure`` are shared by many
+distributions (``google-generativeai``, ``azure-storage-blob``...), so any
+requirement named after an imported namespace is kept.
+"""
+import ast
+import os
+import sys
+import sysconfig
+import warnings
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, List, Mapping, Optional, Set, Tuple
+
+from .requirements import normalize_name, parse_requirement
+from .wheels import parse_wheel_filename
+
+# Import names whose distribution is named differently (keys are top-level modules).
+# Namespace packages shared by several distributions (google, azure...) are deliberately
+# left out: they are matched by name prefix instead (see `could_provide`).
+IMPORT_DISTRIBUTIONS = {
+    'Bio': 'biopython',
+    'Crypto': 'pycryptodome',
+    'OpenSSL': 'pyopenssl',
+    'PIL': 'pillow',
+    'attr': 'attrs',
+    'bs4': 'beautifulsoup4',
+    'cv2': 'opencv-python',
+    'dateutil': 'python-dateutil',
+    'docx': 'python-docx',
+    'dotenv': 'python-dotenv',
+    'fitz': 'pymupdf',
+    'jwt': 'pyjwt',
+    'mpl_toolkits': 'matplotlib',
+    'pptx': 'python-pptx',
+    'serial': 'pyserial',
+    'skimage': 'scikit-image',
+    'sklearn': 'scikit-learn',
+    'yaml': 'pyyaml',
+}
+# Modules available in every stlite app without a requirement: the Pyodide
+# runtime, and streamlit with the packages it depends on.
+PROVIDED_MODULES = ('js', 'micropip', 'pyodide', 'pyodide_js', 'streamlit', 'altair', 'numpy', 'pandas', 'pyarrow',
+                    'PIL', 'packaging', 'typing_extensions')
+
+
+@lru_cache(maxsize=None)
+def stdlib_modules() -> FrozenSet[str]:
+    """
+    Return the names of the standard library's top-level modules.
+
+    Returns
+    -------
+    FrozenSet[str]
+        The module names (``sys.stdlib_module_names`` on Python 3.10+,
+        otherwise the contents of the standard library directory).
+    """
+    names = getattr(sys, 'stdlib_module_names', None)
+    if names is not None:
+        return frozenset(names)
+    names = set(sys.builtin_module_names)
+    stdlib = sysconfig.get_paths()['stdlib']
+    for entry in os.listdir(stdlib):
+        name, ext = os.path.splitext(entry)
+        if ext == '.py' or (not ext and os.path.isdir(os.path.join(stdlib, entry))):
+            names.add(name)
+    lib_dynload = os.path.join(stdlib, 'lib-dynload')
+    if os.path.isdir(lib_dynload):
+        names.update(entry.split('.')[0] for entry in os.listdir(lib_dynload))
+    return frozenset(names)
+
+
+def find_imports(source: str, filename: str = '<app>') -> Set[str]:
+    """
+    Return the top-level modules a Python file imports with absolute imports.
+
+    Parameters
+    ----------
+    source : str
+        The file's source code.
+    filename : str, optional
+        The file name, used in messages.
+
+    Returns
+    -------
+    Set[str]
+        Top-level module names (``import a.b`` and ``from a.b import c`` give
+        ``'a'``). Relative imports are skipped. A file that cannot be parsed is
+        skipped with a warning.
+    """
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')  # e.g. invalid escape sequences in the app's own code
+            tree = ast.parse(source, filename=filename)
+    except (SyntaxError, ValueError) as e:
+        print(f"Warning: Could not parse {filename} for imports: {e}")
+        return set()
+    modules = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            modules.update(alias.name.split('.')[0] for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+            modules.add(node.module.split('.')[0])
+    return modules
+
+
+def local_module_names(paths: Iterable[str]) -> Set[str]:
+    """
+    Return the top-level module names the bundle itself provides.
+
+    Parameters
+    ----------
+    paths : Iterable[str]
+        Relative paths of the bundled files.
+
+    Returns
+    -------
+    Set[str]
+        ``'utils'`` for ``utils.py``, ``'helpers'`` for ``helpers/x.py``, and so on.
+    """
+    names = set()
+    for path in paths:
+        parts = path.replace(os.sep, '/').split('/')
+        if len(parts) > 1:
+            names.add(parts[0])
+        elif parts[0].endswith(('.py', '.pyc')):
+            names.add(os.path.splitext(parts[0])[0])
+    return names
+
+
+def distribution_for_module(module: str) -> str:
+    """
+    Return the normalized distribution name that provides a top-level module.
+
+    Parameters
+    ----------
+    module : str
+        A top-level module name.
+
+    Returns
+    -------
+    str
+        The distribution name from `IMPORT_DISTRIBUTIONS`, or the module name
+        itself, normalized (see `requirements.normalize_name`).
+    """
+    return normalize_name(IMPORT_DISTRIBUTIONS.get(module, module))
+
+
+def requirement_key(requirement: str) -> Optional[str]:
+    """
+    Return the normalized distribution name a requirement installs.
+
+    Parameters
+    ----------
+    requirement : str
+        A requirement line, or the path or URL of a wheel (e.g. an ``emfs:``
+        path written for an embedded wheel).
+
+    Returns
+    -------
+    Optional[str]
+        The normalized name, or None if it cannot be determined.
+    """
+    parsed = parse_requirement(requirement)
+    if parsed is not None:
+        return parsed.key
+    wheel = parse_wheel_filename(requirement.strip().split('#')[0].split('?')[0])
+    return wheel.name if wheel is not None else None
+
+
+def could_provide(distribution: str, module: str, provided_imports: Optional[Mapping[str, Iterable[str]]] = None) -> bool:
+    """
+    Return whether a distribution could provide a top-level module.
+
+    Parameters
+    ----------
+    distribution : str
+        A normalized distribution name.
+    module : str
+        A top-level module name.
+    provided_imports : Optional[Mapping[str, Iterable[str]]], optional
+        Known top-level modules of distributions, keyed by normalized name
+        (e.g. the ``imports`` of a Pyodide lock file's packages).
+
+    Returns
+    -------
+    bool
+        True if the distribution is known to provide the module, is the
+        module's distribution (see `distribution_for_module`), or is named
+        after it as a namespace (``google-generativeai`` for ``google``).
+    """
+    if provided_imports is not None and module in provided_imports.get(distribution, ()):
+        return True
+    return distribution == distribution_for_module(module) or distribution.startswith(normalize_name(module) + '-')
+
+
+def check_requirements(requirements: List[str], imports: Mapping[str, Set[str]], local_modules: Set[str],
+                       provided_imports: Optional[Mapping[str, Iterable[str]]] = None
+                       ) -> Tuple[List[str], Dict[str, List[str]]]:
+    """
+    Compare requirements with the third-party modules the app imports.
+
+    Parameters
+    ----------
+    requirements : List[str]
+        The APP_REQUIREMENTS.
+    imports : Mapping[str, Set[str]]
+        Top-level imports of each bundled Python file (see `find_imports`).
+    local_modules : Set[str]
+        Modules provided by the bundle itself (see `local_module_names`).
+    provided_imports : Optional[Mapping[str, Iterable[str]]], optional
+        Known top-level modules of distributions (see `could_provide`).
+
+    Returns
+    -------
+    Tuple[List[str], Dict[str, List[str]]]
+        The requirements that no file imports (in order; requirements whose
+        distribution cannot be determined, such as URLs, are never reported),
+        and each third-party module that no requirement covers, with the files
+        importing it. Wheel paths (e.g. ``emfs:`` paths of embedded wheels)
+        count as their distribution.
+    """
+    ignored = stdlib_modules() | local_modules | set(PROVIDED_MODULES) | {'__future__'}
+    importers: Dict[str, List[str]] = {}
+    for path in sorted(imports):
+        for module in sorted(imports[path] - ignored):
+            importers.setdefault(module, []).append(path)
+    imported = {module for modules in imports.values() for module in modules}
+
+    keys = set()
+    unused = []
+    for requirement in requirements:
+        key = requirement_key(requirement)
+        if key is None:
+            continue
+        keys.add(key)
+        if not any(could_provide(key, module, provided_imports) for module in imported):
+            unused.append(requirement)
+    missing = {module: paths for module, paths in importers.items()
+               if not any(could_provide(key, module, provided_imports) for key in keys)}
+    return unused, missing
@@ -0,0 +1,257 @@
+"""
+In-memory conversion: render an app to HTML bytes without writing any files.
+
+`convert_to_bytes` and `convert_to_stream` take the app from a directory, a zip
+archive or a mapping of relative path to content (see `script2stlite.sources`)
+and return the same HTML the file-based conversion writes, either as one
+``bytes`` object or as a stream of encoded chunks (e.g. for a streaming HTTP
+response). The source tree is only read: no HTML, manifest, build cache entry,
+size report or bundle hash is written, so a web service can convert uploads
+without a scratch directory.
+"""
+import copy
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+import yaml
+
+from .build_result import BuildTimer
+from .functions import _prepare_html, load_all_versions
+from .script2stlite import _apply_versions, _collect_app_files
+from .sources import AppSource, SourceLike, open_source
+from .template import iter_rendered
+
+STREAM_CHUNK_SIZE = 64 * 1024  # characters gathered into each chunk of a stream
+
+
+def _resolve_settings(source: AppSource, app_name: Optional[str], entrypoint: Optional[str],
+                      settings: Optional[Mapping[str, Any]], options: Dict[str, Any]) -> Dict[str, Any]:
+    """Return the settings to build with: given explicitly, built from `entrypoint`, or read from settings.yaml."""
+    if settings is not None:
+        resolved = copy.deepcopy(dict(settings))
+    elif entrypoint is not None:
+        resolved = {
+            'APP_NAME': app_name if app_name is not None else Path(entrypoint).stem,
+            'APP_ENTRYPOINT': entrypoint,
+            'APP_FILES': [],
+            'APP_REQUIREMENTS': [],
+            **options,
+        }
+    elif source.exists('settings.yaml'):
+        resolved = yaml.safe_load(source.read_text('settings.yaml'))
+        if not isinstance(resolved, dict):
+            raise ValueError("settings.yaml is not a dictionary (mapping type)")
+    else:
+        raise ValueError("No entrypoint given and no settings.yaml found in the app files.")
+    if app_name is not None:
+        resolved['APP_NAME'] = app_name
+    if not resolved.get('APP_NAME'):
+        raise ValueError("APP_NAME not defined")
+    return resolved
+
+
+def _prepare(source: AppSource, app_name: Optional[str], entrypoint: Optional[str],
+             settings: Optional[Mapping[str, Any]], stlite_version: Optional[str], pyodide_version: Optional[str],
+             packages: Optional[Dict[str, str]], versions: Optional[Tuple[Any, ...]],
+             options: Dict[str, Any]) -> Tuple[Any, Dict[str, Any]]:
+    """Resolve settings, requirements and app files, and return the template and its values."""
+    settings = _resolve_settings(source, app_name, entrypoint, settings, options)
+    if settings.get('EXTERNAL_ASSET_THRESHOLD') is not None:
+        raise ValueError("EXTERNAL_ASSET_THRESHOLD is not supported by in-memory conversion "
+                         "(external assets would have to be written to disk).")
+    entrypoint = settings.get('APP_ENTRYPOINT')
+    if not entrypoint:
+        raise ValueError("APP_ENTRYPOINT not defined in settings.yaml")
+    if not source.exists(entrypoint):
+        raise ValueError(f"Entrypoint file '{entrypoint}' not found in the app files.")
+
+    if versions is None:
+        versions = load_all_versions()
+    _apply_versions(settings, versions, stlite_version, pyodide_version)
+
+    # Same requirements and discovery as the file-based conversion, including which build outputs are
+    # skipped (an app exported with its previous HTML must not embed it), so the bytes are the same either way.
+    # A relative WHEELHOUSE or PYODIDE_LOCK is found next to a directory source, else in the working directory.
+    base_dir = source.root if source.root is not None else os.getcwd()
+    source = _collect_app_files(settings, source, base_dir, 'the app files', BuildTimer()).source
+
+    template, values, _ = _prepare_html(source, settings, packages=packages)
+    return template, values
+
+
+def _iter_encoded(chunks: Iterable[str], encoding: str, chunk_size: int) -> Iterator[bytes]:
+    """Gather text chunks into encoded chunks of about `chunk_size` characters."""
+    buffer: List[str] = []
+    size = 0
+    for chunk in chunks:
+        buffer.append(chunk)
+        size += len(chunk)
+        if size >= chunk_size:
+            yield ''.join(buffer).encode(encoding)
+            buffer, size = [], 0
+    if buffer:
+        yield ''.join(buffer).encode(encoding)
+
+
+def convert_to_stream(
+    source: SourceLike,
+    app_name: Optional[str] = None,
+    entrypoint: Optional[str] = None,
+    settings: Optional[Mapping[str, Any]] = None,
+    stlite_version: Optional[str] = None,
+    pyodide_version: Optional[str] = None,
+    packages: Optional[Dict[str, str]] = None,
+    versions: Optional[Tuple[Any, ...]] = None,
+    config: Optional[str] = None,
+    shared_worker: bool = False,
+    idbfs_mountpoints: Optional[list] = None,
+    compress_assets: bool = False,
+    embed_mode: str = 'inline',
+    use_gitignore: bool = False,
+    follow_symlinks: bool = False,
+    wheelhouse: Optional[str] = None,
+    pyodide_lock: Optional[str] = None,
+    package_index: Optional[str] = None,
+    resolve_action: str = 'warn',
+    prune_requirements: bool = False,
+    discovery_mode: str = 'all',
+    encoding: str = 'utf-8',
+    chunk_size: int = STREAM_CHUNK_SIZE
+) -> Iterator[bytes]:
+    """
+    Convert an app to stlite HTML and return it as a stream of encoded chunks.
+
+    Settings are taken from `settings` if given; otherwise from `entrypoint` and
+    the keyword options (as in `Script2StliteConverter.convert_from_entrypoint`);
+    otherwise from the ``settings.yaml`` in the app files. A ``requirements.txt``
+    in the app files is merged into APP_REQUIREMENTS, and the remaining files are
+    discovered with the usual ignore rules.
+
+    The settings are validated and the app files checked before this function
+    returns, so configuration errors are raised here rather than mid-stream.
+    File payloads are read and encoded while the stream is consumed.
+
+    Parameters
+    ----------
+    source : SourceLike
+        The app: a directory, a zip archive (path, bytes or binary file object),
+        a mapping of relative path to content, or an `AppSource`.
+    app_name : Optional[str], optional
+        The application name. Defaults to the entrypoint's file name (without
+        suffix); overrides APP_NAME from `settings` or settings.yaml.
+    entrypoint : Optional[str], optional
+        The entrypoint script, relative to the app root.
+    settings : Optional[Mapping[str, Any]], optional
+        Settings as in settings.yaml. Not modified.
+    stlite_version : Optional[str], optional
+        The specific version of stlite to use. Defaults to the latest.
+    pyodide_version : Optional[str], optional
+        The specific version of Pyodide to use.
+    packages : Optional[Dict[str, str]], optional
+        Package version overrides.
+    versions : Optional[Tuple[Any, ...]], optional
+        Pre-loaded result of `load_all_versions()`, e.g. shared across requests.
+    config : Optional[str], optional
+        Path to a streamlit config file in the app files. Default None.
+    shared_worker : bool, optional
+        Whether to use SharedWorker mode. Default False.
+    idbfs_mountpoints : Optional[list], optional
+        List of mountpoints for IDBFS. Default ['/mnt'].
+    compress_assets : bool, optional
+        Whether to deflate non-Python assets and inflate them in the browser. Default False.
+    embed_mode : str, optional
+        'inline' (default) or 'blocks'.
+    use_gitignore : bool, optional
+        Whether discovery also skips files matched by ``.gitignore`` files. Default False.
+    follow_symlinks : bool, optional
+        Whether discovery descends into symlinked directories of a directory source. Default False.
+    wheelhouse : Optional[str], optional
+        Directory of local wheels to embed for matching requirements (relative to a
+        directory source, otherwise to the working directory). Default None.
+    pyodide_lock : Optional[str], optional
+        A ``pyodide-lock.json`` file (or directory of them) to pin requirements against. Default None.
+    package_index : Optional[str], optional
+        Directory of wheels used to pin requirements the lock file does not provide. Default None.
+    resolve_action : str, optional
+        'warn' (default) or 'fail' for requirements that cannot be resolved.
+    prune_requirements : bool, optional
+        Whether to drop requirements that no bundled .py file imports. Default False.
+    discovery_mode : str, optional
+        'all' (default) or 'reachable' (bundle only files reachable from the entrypoint and pages).
+    encoding : str, optional
+        The encoding of the output (default is 'utf-8').
+    chunk_size : int, optional
+        Approximate number of characters in each chunk.
+
+    Returns
+    -------
+    Iterator[bytes]
+        The HTML document, chunk by chunk.
+
+    Raises
+    ------
+    ValueError
+        If the settings are invalid, a file is missing, or EXTERNAL_ASSET_THRESHOLD is set.
+    """
+    options = {
+        'CONFIG': config,
+        'SHARED_WORKER': shared_worker,
+        'IDBFS_MOUNTPOINTS': idbfs_mountpoints if idbfs_mountpoints is not None else ['/mnt'],
+        'COMPRESS_ASSETS': compress_assets,
+        'EMBED_MODE': embed_mode,
+        'USE_GITIGNORE': use_gitignore,
+        'FOLLOW_SYMLINKS': follow_symlinks,
+        'WHEELHOUSE': wheelhouse,
+        'PYODIDE_LOCK': pyodide_lock,
+        'PACKAGE_INDEX': package_index,
+        'RESOLVE_ACTION': resolve_action,
+        'PRUNE_REQUIREMENTS': prune_requirements,
+        'DISCOVERY_MODE': discovery_mode,
+    }
+    app_source = open_source(source)
+    owned = app_source is not source
+    try:
+        template, values = _prepare(app_source, app_name, entrypoint, settings, stlite_version, pyodide_version,
+                                    packages, versions, options)
+    except BaseException:
+        if owned:
+            app_source.close()
+        raise
+
+    def stream() -> Iterator[bytes]:
+        try:
+            yield from _iter_encoded(iter_rendered(template, values), encoding, chunk_size)
+        finally:
+            if owned:
+                app_source.close()
+
+    return stream()
+
+
+def convert_to_bytes(source: SourceLike, app_name: Optional[str] = None, entrypoint: Optional[str] = None,
+                     **kwargs: Any) -> bytes:
+    """
+    Convert an app to stlite HTML and return the document as bytes.
+
+    Takes the same arguments as `convert_to_stream`. For a directory, the result
+    is identical to the HTML file the file-based conversion writes.
+
+    Parameters
+    ----------
+    source : SourceLike
+        The app: a directory, a zip archive (path, bytes or binary file object),
+        a mapping of relative path to content, or an `AppSource`.
+    app_name : Optional[str], optional
+        The application name.
+    entrypoint : Optional[str], optional
+        The entrypoint script, relative to the app root.
+    **kwargs : Any
+        Further options, see `convert_to_stream`.
+
+    Returns
+    -------
+    bytes
+        The HTML document.
+    """
+    return b''.join(convert_to_stream(source, app_name=app_name, entrypoint=entrypoint, **kwargs))
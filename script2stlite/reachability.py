@@ -0,0 +1,280 @@
+"""
+Reachability-based discovery ("tree shaking").
+
+Auto-discovery bundles every file in the project, which is safe but also
+embeds modules and data the app never uses. With ``DISCOVERY_MODE:
+reachable``, the discovered files are narrowed down to those reachable from
+the roots (the entrypoint, ``pages/``, files listed in APP_FILES, the config
+file and ``.streamlit/``):
+
+* Python files are parsed with `ast`, and their static imports (absolute and
+  relative) are followed to the bundled modules and packages they name.
+* A string literal naming a bundled file keeps that file, wherever it appears
+  (e.g. ``open("data/x.json")`` or ``DATA = "data/x.csv"``).
+* Directories and glob patterns passed to file functions (``os.listdir``,
+  ``glob.glob``...) keep the files they cover.
+
+Anything dynamic falls back to including a whole subtree. A path computed at
+runtime in a file function (``open(f"data/{name}.json")``) keeps everything
+under its literal prefix (``data/``), or under the calling file's folder if
+it has none. A non-literal ``importlib.import_module`` keeps the calling
+file's whole package, and ``from pkg import *`` of a bundled package keeps
+that package's whole folder (its ``__all__`` may name any submodule).
+"""
+import ast
+import fnmatch
+import posixpath
+import warnings
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+# Functions whose first argument is a file or directory path.
+PATH_FUNCTIONS = frozenset({
+    'open', 'read_csv', 'read_excel', 'read_json', 'read_parquet', 'read_table', 'read_feather', 'read_pickle',
+    'read_fwf', 'read_xml', 'read_text', 'read_bytes', 'loadtxt', 'genfromtxt', 'imread', 'listdir', 'scandir',
+    'walk', 'glob', 'iglob', 'run_path', 'Page', 'switch_page', 'page_link',
+})
+# Functions that take a path only sometimes (also images, arrays, bytes...): literals only, never dynamic.
+MEDIA_FUNCTIONS = frozenset({'image', 'audio', 'video', 'Image'})
+DYNAMIC_IMPORT_FUNCTIONS = frozenset({'import_module', '__import__'})
+DISCOVERY_MODES = ('all', 'reachable')
+ALWAYS_REACHABLE_DIRS = ('.streamlit', 'pages')
+
+
+def _join_path(parts: List[str], complete: bool) -> str:
+    """Join path parts, skipping empty ones; an unknown last part leaves a trailing '/'."""
+    path = posixpath.join(*[part for part in parts if part]) if any(parts) else ''
+    return path + '/' if path and not complete and not parts[-1] else path
+
+
+def _call_name(node: ast.Call) -> Optional[str]:
+    if isinstance(node.func, ast.Name):
+        return node.func.id
+    if isinstance(node.func, ast.Attribute):
+        return node.func.attr
+    return None
+
+
+class _FileScan(ast.NodeVisitor):
+    """Collect the imports, string literals and path arguments of one Python file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.imports: List[Tuple[int, str, List[str]]] = []  # (level, module, imported names)
+        self.strings: Set[str] = set()
+        self.path_args: List[Tuple[str, bool]] = []  # (path or literal prefix, is the whole path known)
+        self.dynamic_import = False
+        self.constants: Dict[str, str] = {}
+
+    def visit_Import(self, node: ast.Import) -> None:
+        for alias in node.names:
+            self.imports.append((0, alias.name, []))
+
+    def visit_ImportFrom(self, node: ast.ImportFrom) -> None:
+        self.imports.append((node.level, node.module or '', [alias.name for alias in node.names]))
+
+    def visit_Assign(self, node: ast.Assign) -> None:
+        if isinstance(node.value, ast.Constant) and isinstance(node.value.value, str):
+            for target in node.targets:
+                if isinstance(target, ast.Name):
+                    self.constants[target.id] = node.value.value
+        self.generic_visit(node)
+
+    def visit_Constant(self, node: ast.Constant) -> None:
+        if isinstance(node.value, str):
+            self.strings.add(node.value)
+
+    def visit_Call(self, node: ast.Call) -> None:
+        name = _call_name(node)
+        if node.args and name in DYNAMIC_IMPORT_FUNCTIONS:
+            module, complete = self._evaluate(node.args[0])
+            if complete:
+                self.imports.append((0, module, []))
+            else:
+                self.dynamic_import = True
+        elif node.args and name in PATH_FUNCTIONS:
+            self.path_args.append(self._evaluate(node.args[0]))
+        elif node.args and name in MEDIA_FUNCTIONS:
+            path, complete = self._evaluate(node.args[0])
+            if complete:
+                self.path_args.append((path, True))
+        self.generic_visit(node)
+
+    def _evaluate(self, node: ast.AST) -> Tuple[str, bool]:
+        """Evaluate a path expression statically: (value, True), or (literal prefix, False) if it is computed."""
+        if isinstance(node, ast.Constant) and isinstance(node.value, str):
+            return node.value, True
+        if isinstance(node, ast.Name):
+            if node.id == '__file__':
+                return self.path, True
+            if node.id in self.constants:
+                return self.constants[node.id], True
+            return '', False
+        if isinstance(node, ast.JoinedStr):
+            prefix = ''
+            for value in node.values:
+                if not (isinstance(value, ast.Constant) and isinstance(value.value, str)):
+                    return prefix, False
+                prefix += value.value
+            return prefix, True
+        if isinstance(node, ast.BinOp) and isinstance(node.op, (ast.Add, ast.Div)):
+            left, complete = self._evaluate(node.left)
+            if not complete:
+                return left, False
+            right, complete = self._evaluate(node.right)
+            if isinstance(node.op, ast.Div):
+                return _join_path([left, right], complete), complete
+            return left + right, complete
+        if isinstance(node, ast.Attribute) and node.attr == 'parent':
+            value, complete = self._evaluate(node.value)
+            return (posixpath.dirname(value), True) if complete else ('', False)
+        if isinstance(node, ast.Call):
+            name = _call_name(node)
+            if name in ('Path', 'PurePath', 'PurePosixPath', 'join') and node.args:
+                parts = []
+                for arg in node.args:
+                    part, complete = self._evaluate(arg)
+                    parts.append(part)
+                    if not complete:
+                        return _join_path(parts, False), False
+                return _join_path(parts, True), True
+            if name in ('dirname', 'abspath', 'realpath', 'resolve', 'normpath') and (node.args or name == 'resolve'):
+                value, complete = self._evaluate(node.args[0] if node.args else node.func.value)
+                if complete and name == 'dirname':
+                    return posixpath.dirname(value), True
+                return value, complete
+        return '', False
+
+
+def _scan_python(path: str, source: str) -> _FileScan:
+    scan = _FileScan(path)
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            tree = ast.parse(source, filename=path)
+    except (SyntaxError, ValueError) as e:
+        print(f"Warning: Could not parse {path} for tree shaking ({e}); including its whole folder.")
+        scan.path_args.append(('', False))
+        return scan
+    scan.visit(tree)
+    return scan
+
+
+def find_reachable(paths: Iterable[str], roots: Iterable[str], read_text: Callable[[str], str],
+                   search_dirs: Iterable[str] = ('',)) -> Tuple[Set[str], List[str]]:
+    """
+    Return the files reachable from `roots` (see the module docstring).
+
+    Parameters
+    ----------
+    paths : Iterable[str]
+        All candidate files, relative to the app root (``/``-separated).
+    roots : Iterable[str]
+        Files that are always bundled. Files under ``pages/`` and
+        ``.streamlit/`` are added to them.
+    read_text : Callable[[str], str]
+        Returns the text of a file (given as in `paths`).
+    search_dirs : Iterable[str], optional
+        Folders that absolute imports are resolved against ('' is the app root).
+
+    Returns
+    -------
+    Tuple[Set[str], List[str]]
+        The reachable files, and the folders fully included because of a
+        dynamic reference (in the order they were found; '' is the app root).
+    """
+    files = set(paths)
+    search_dirs = list(search_dirs)
+    reachable: Set[str] = set()
+    fallbacks: List[str] = []
+    queue: List[str] = []
+
+    def keep(path: str) -> None:
+        if path in files and path not in reachable:
+            reachable.add(path)
+            if path.endswith('.py'):
+                queue.append(path)
+
+    def keep_subtree(folder: str) -> None:
+        if folder in fallbacks:
+            return
+        prefix = folder + '/' if folder else ''
+        fallbacks.append(folder)
+        for f in sorted(files):
+            if f.startswith(prefix):
+                keep(f)
+
+    def keep_module(base: str, parts: List[str]) -> bool:
+        """Keep a module and its packages' __init__ files; return False if it is not bundled."""
+        found = False
+        for i in range(1, len(parts) + 1):
+            package = posixpath.join(base, *parts[:i])
+            for candidate in (package + '/__init__.py', package + '.py') if i == len(parts) else (package + '/__init__.py',):
+                if candidate in files:
+                    keep(candidate)
+                    found = True
+        return found
+
+    def resolve_literal(path: str, file_dir: str, is_path_arg: bool) -> None:
+        if not path or path.startswith(('/', 'http:', 'https:')) or '\n' in path or len(path) > 260:
+            return
+        for base in (file_dir, ''):
+            candidate = posixpath.normpath(posixpath.join(base, path))
+            if candidate.startswith('..'):
+                continue
+            if candidate in files:
+                keep(candidate)
+            elif is_path_arg and any(ch in candidate for ch in '*?['):
+                for f in sorted(files):
+                    if fnmatch.fnmatch(f, candidate) or fnmatch.fnmatch(f, candidate + '/*'):
+                        keep(f)
+            elif is_path_arg and any(f.startswith(candidate + '/') for f in files):
+                for f in sorted(files):
+                    if f.startswith(candidate + '/'):
+                        keep(f)
+
+    for root in roots:
+        keep(root)
+    for f in sorted(files):
+        if f.split('/')[0] in ALWAYS_REACHABLE_DIRS:
+            keep(f)
+
+    while queue:
+        path = queue.pop(0)
+        file_dir = posixpath.dirname(path)
+        scan = _scan_python(path, read_text(path))
+        for level, module, names in scan.imports:
+            parts = [part for part in module.split('.') if part]
+            if level:
+                base = file_dir
+                for _ in range(level - 1):
+                    base = posixpath.dirname(base)
+                bases = [base]
+            else:
+                bases = search_dirs
+            for base in bases:
+                if parts and not keep_module(base, parts):
+                    continue
+                for name in names:
+                    if name != '*':
+                        keep_module(base, parts + [name])
+                    elif posixpath.join(base, *parts, '__init__.py') in files:
+                        # A star import of a package can load any submodule listed in its __all__.
+                        keep_subtree(posixpath.join(base, *parts))
+        for string in scan.strings:
+            resolve_literal(string, file_dir, False)
+        for value, complete in scan.path_args:
+            if complete:
+                resolve_literal(value, file_dir, True)
+                continue
+            # A computed path: include the folder of its literal prefix, or else the calling file's folder.
+            prefix = posixpath.dirname(value)
+            folder = file_dir
+            if prefix:
+                for candidate in (posixpath.normpath(prefix), posixpath.normpath(posixpath.join(file_dir, prefix))):
+                    if any(f.startswith(candidate + '/') for f in files):
+                        folder = candidate
+                        break
+            keep_subtree(folder)
+        if scan.dynamic_import:
+            keep_subtree(file_dir)
+    return reachable, fallbacks
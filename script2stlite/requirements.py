@@ -0,0 +1,399 @@
+"""
+Parsing and matching of pip-style requirement strings.
+
+script2stlite passes APP_REQUIREMENTS to micropip in the browser, which does
+the real resolution. At build time we only need a small, dependency-free
+subset of PEP 508 / PEP 440 to reason about them: the distribution name
+(normalized as in PEP 503), extras, the version specifier and any environment
+marker, plus ordering versions and checking them against a specifier.
+"""
+import re
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+NAME_PATTERN = re.compile(r'^\s*([A-Za-z0-9](?:[A-Za-z0-9._-]*[A-Za-z0-9])?)\s*(\[[^\]]*\])?\s*(.*)$', re.DOTALL)
+VERSION_PATTERN = re.compile(
+    r'^\s*v?(?:(\d+)!)?(\d+(?:\.\d+)*)'                       # epoch, release
+    r'(?:[-_.]?(a|b|c|rc|alpha|beta|pre|preview)[-_.]?(\d*))?'  # pre-release
+    r'(?:-(\d+)|[-_.]?(?:post|rev|r)[-_.]?(\d*))?'              # post-release
+    r'(?:[-_.]?dev[-_.]?(\d*))?'                                # development release
+    r'(?:\+[a-z0-9]+(?:[-_.][a-z0-9]+)*)?\s*$',                 # local version label
+    re.IGNORECASE,
+)
+SPECIFIER_OPERATORS = ('===', '~=', '==', '!=', '<=', '>=', '<', '>')
+# Installed by stlite itself: listing them again only makes micropip resolve them in the browser.
+STLITE_PROVIDED = ('streamlit',)
+_PRE_RELEASE_RANK = {'a': 0, 'alpha': 0, 'b': 1, 'beta': 1, 'c': 2, 'rc': 2, 'pre': 2, 'preview': 2}
+
+
+class Requirement(NamedTuple):
+    """
+    A parsed requirement line.
+
+    Attributes
+    ----------
+    name : str
+        The distribution name as written.
+    extras : str
+        The extras, including brackets (e.g. ``'[plot]'``), or ''.
+    specifier : str
+        The version specifier (e.g. ``'>=1.2,<2'``), or ''.
+    marker : str
+        The environment marker after ``;``, or ''.
+    """
+    name: str
+    extras: str
+    specifier: str
+    marker: str
+
+    @property
+    def key(self) -> str:
+        """The normalized distribution name (see `normalize_name`)."""
+        return normalize_name(self.name)
+
+
+def normalize_name(name: str) -> str:
+    """
+    Normalize a distribution name as in PEP 503 (``Foo_Bar.baz`` -> ``foo-bar-baz``).
+
+    Parameters
+    ----------
+    name : str
+        The distribution name.
+
+    Returns
+    -------
+    str
+        The normalized name.
+    """
+    return re.sub(r'[-_.]+', '-', name).lower()
+
+
+def parse_requirement(line: str) -> Optional[Requirement]:
+    """
+    Parse a requirement such as ``'pandas[excel]>=2.0; python_version >= "3.10"'``.
+
+    Parameters
+    ----------
+    line : str
+        One requirement.
+
+    Returns
+    -------
+    Optional[Requirement]
+        The parsed requirement, or None if the line is not a plain named
+        requirement (e.g. a URL, a local path, an ``emfs:`` wheel or a pip
+        option), which is left to micropip as is.
+    """
+    line = line.strip()
+    if not line or line.startswith('-') or '://' in line or line.startswith(('emfs:', '.', '/')):
+        return None
+    requirement, _, marker = line.partition(';')
+    match = NAME_PATTERN.match(requirement)
+    if match is None:
+        return None
+    name, extras, specifier = match.group(1), match.group(2) or '', match.group(3).strip()
+    if specifier.startswith('@'):
+        return None  # direct reference: 'name @ url'
+    if specifier.startswith('(') and specifier.endswith(')'):
+        specifier = specifier[1:-1].strip()
+    if specifier and not specifier.startswith(SPECIFIER_OPERATORS):
+        return None
+    return Requirement(name, extras.replace(' ', ''), specifier.replace(' ', ''), marker.strip())
+
+
+def version_key(version: str) -> Tuple:
+    """
+    Return a sort key that orders versions as PEP 440 does.
+
+    Parameters
+    ----------
+    version : str
+        A version string (e.g. ``'1.0'``, ``'2.1rc1'``, ``'1.0.post2'``).
+
+    Returns
+    -------
+    Tuple
+        A key for comparing versions (``1.0 == 1.0.0``).
+
+    Raises
+    ------
+    ValueError
+        If the version is not a valid PEP 440 version.
+    """
+    match = VERSION_PATTERN.match(version)
+    if match is None:
+        raise ValueError(f"Invalid version: {version}")
+    epoch, release, pre_label, pre_number, post_implicit, post_number, dev_number = match.groups()
+    release_parts = [int(part) for part in release.split('.')]
+    while len(release_parts) > 1 and release_parts[-1] == 0:
+        release_parts.pop()
+    is_post = post_implicit is not None or post_number is not None
+    is_dev = dev_number is not None
+    if pre_label is not None:
+        pre = (0, _PRE_RELEASE_RANK[pre_label.lower()], int(pre_number or 0))
+    elif is_dev and not is_post:
+        pre = (-1,)  # 1.0.dev1 sorts before 1.0a1
+    else:
+        pre = (1,)
+    post = (int(post_implicit or post_number or 0),) if is_post else (-1,)
+    dev = (0, int(dev_number or 0)) if is_dev else (1,)
+    return (int(epoch or 0), tuple(release_parts), pre, post, dev)
+
+
+def is_prerelease(version: str) -> bool:
+    """
+    Return True if `version` is a pre-release or development release (``2.0rc1``, ``1.0.dev3``).
+
+    Parameters
+    ----------
+    version : str
+        A version string.
+
+    Returns
+    -------
+    bool
+        Whether the version is a pre- or dev-release.
+
+    Raises
+    ------
+    ValueError
+        If the version is not a valid PEP 440 version.
+    """
+    key = version_key(version)
+    return key[2] != (1,) or key[4] != (1,)
+
+
+def _release(version: str) -> Tuple[int, ...]:
+    match = VERSION_PATTERN.match(version)
+    if match is None:
+        raise ValueError(f"Invalid version: {version}")
+    return tuple(int(part) for part in match.group(2).split('.'))
+
+
+def _matches_clause(version: str, operator: str, target: str) -> bool:
+    if operator == '===':
+        return version.strip().lower() == target.lower()
+    if target.endswith('.*'):
+        if operator not in ('==', '!='):
+            raise ValueError(f"Wildcards are only allowed with == and !=: {operator}{target}")
+        prefix = _release(target[:-2])
+        release = _release(version) + (0,) * len(prefix)
+        matched = release[:len(prefix)] == prefix
+        return matched if operator == '==' else not matched
+    key, target_key = version_key(version), version_key(target)
+    if operator == '==':
+        return key == target_key
+    if operator == '!=':
+        return key != target_key
+    if operator == '>=':
+        return key >= target_key
+    if operator == '<=':
+        return key <= target_key
+    if operator == '>':
+        return key > target_key
+    if operator == '<':
+        return key < target_key
+    # '~=': at least `target`, and the same release up to its last-but-one part.
+    prefix = _release(target)[:-1]
+    if not prefix:
+        raise ValueError(f"~= needs at least two release parts: {target}")
+    return key >= target_key and (_release(version) + (0,) * len(prefix))[:len(prefix)] == prefix
+
+
+def split_specifier(specifier: str) -> List[Tuple[str, str]]:
+    """
+    Split a specifier such as ``'>=1.2,<2'`` into ``(operator, version)`` clauses.
+
+    Parameters
+    ----------
+    specifier : str
+        The version specifier ('' for none).
+
+    Returns
+    -------
+    List[Tuple[str, str]]
+        The clauses, in order.
+
+    Raises
+    ------
+    ValueError
+        If a clause has no valid operator.
+    """
+    clauses = []
+    for clause in specifier.replace(' ', '').split(','):
+        if not clause:
+            continue
+        operator = next((op for op in SPECIFIER_OPERATORS if clause.startswith(op)), None)
+        if operator is None or not clause[len(operator):]:
+            raise ValueError(f"Invalid version specifier: {clause}")
+        clauses.append((operator, clause[len(operator):]))
+    return clauses
+
+
+def version_matches(version: str, specifier: str) -> bool:
+    """
+    Return True if `version` satisfies every clause of `specifier`.
+
+    Parameters
+    ----------
+    version : str
+        A version string.
+    specifier : str
+        A version specifier such as ``'>=1.2,<2'`` or ``'==1.4.*'`` ('' matches any version).
+
+    Returns
+    -------
+    bool
+        Whether the version is allowed.
+
+    Raises
+    ------
+    ValueError
+        If the version or specifier is invalid.
+    """
+    return all(_matches_clause(version, operator, target) for operator, target in split_specifier(specifier))
+
+
+def allows_prereleases(specifier: str) -> bool:
+    """
+    Return True if a specifier explicitly asks for a pre-release (e.g. ``'>=2.0rc1'``).
+
+    Parameters
+    ----------
+    specifier : str
+        A version specifier.
+
+    Returns
+    -------
+    bool
+        Whether any inclusive clause names a pre- or dev-release (PEP 440).
+
+    Raises
+    ------
+    ValueError
+        If the specifier is invalid.
+    """
+    for operator, target in split_specifier(specifier):
+        if operator == '!=' or target.endswith('.*'):
+            continue
+        if operator == '===' or is_prerelease(target):
+            return True
+    return False
+
+
+def merge_requirements(requirements: Iterable[str], drop: Iterable[str] = ()) -> List[str]:
+    """
+    Merge requirements that name the same distribution.
+
+    Names are compared after PEP 503 normalization, so ``Pillow`` and
+    ``pillow`` are one requirement, and ``pandas`` plus ``pandas>=2`` becomes
+    ``pandas>=2``. Extras and specifier clauses of merged requirements are
+    combined (the first spelling of the name is kept); requirements with
+    different environment markers are kept apart. A requirement that appears
+    only once is returned as written. Lines that are not plain named
+    requirements (URLs, ``emfs:`` paths...) are only de-duplicated.
+
+    Parameters
+    ----------
+    requirements : Iterable[str]
+        The requirements, in order of precedence.
+    drop : Iterable[str], optional
+        Distribution names to remove (e.g. `STLITE_PROVIDED`).
+
+    Returns
+    -------
+    List[str]
+        The merged requirements, in order of first appearance.
+    """
+    dropped = {normalize_name(name) for name in drop}
+    groups: Dict[Tuple[str, str], List] = {}
+    for line in requirements:
+        line = line.strip()
+        if not line:
+            continue
+        parsed = parse_requirement(line)
+        if parsed is None:
+            groups.setdefault((line, ''), [line, None, [], []])
+            continue
+        if parsed.key in dropped:
+            continue
+        group = groups.setdefault((parsed.key, parsed.marker), [line, parsed, [], []])
+        group[2].append(line)
+        for extra in parsed.extras.strip('[]').split(','):
+            if extra and extra.lower() not in group[3]:
+                group[3].append(extra.lower())
+    merged = []
+    for (_, marker), (first, parsed, lines, extras) in groups.items():
+        if parsed is None or len(lines) == 1:
+            merged.append(first)
+            continue
+        clauses: List[str] = []
+        try:
+            for line in lines:
+                for operator, version in split_specifier(parse_requirement(line).specifier):
+                    if operator + version not in clauses:
+                        clauses.append(operator + version)
+        except ValueError:
+            merged.extend(dict.fromkeys(lines))  # an invalid specifier is left for micropip to report
+            continue
+        requirement = parsed.name + (f"[{','.join(extras)}]" if extras else '') + ','.join(clauses)
+        merged.append(requirement + (f'; {marker}' if marker else ''))
+    return merged
+
+
+def unsatisfiable(specifier: str) -> bool:
+    """
+    Return True if no version can satisfy every clause of a specifier.
+
+    The ``==``, ``>=``, ``>``, ``<=``, ``<`` and ``~=`` clauses are intersected
+    as a range of versions (``<2,>=2`` is empty), and a ``==`` pin must also
+    pass the other clauses (``==1.0,!=1.0``). Wildcard and ``===`` clauses are
+    not checked.
+
+    Parameters
+    ----------
+    specifier : str
+        A version specifier, e.g. from `merge_requirements`.
+
+    Returns
+    -------
+    bool
+        True if the specifier can match no version. An invalid specifier
+        returns False (it is left for micropip to report).
+    """
+    lower: Optional[Tuple[Tuple, bool]] = None  # (version key, inclusive)
+    upper: Optional[Tuple[Tuple, bool]] = None
+    try:
+        clauses = split_specifier(specifier)
+        for operator, version in clauses:
+            if operator == '===' or operator == '!=' or version.endswith('.*'):
+                continue
+            key = version_key(version)
+            bounds = []
+            if operator in ('==', '>=', '~='):
+                bounds.append(('lower', (key, True)))
+            if operator in ('==', '<='):
+                bounds.append(('upper', (key, True)))
+            if operator == '>':
+                bounds.append(('lower', (key, False)))
+            if operator == '<':
+                bounds.append(('upper', (key, False)))
+            if operator == '~=':
+                prefix = list(_release(version)[:-1])
+                if not prefix:
+                    raise ValueError(f"~= needs at least two release parts: {version}")
+                prefix[-1] += 1
+                bounds.append(('upper', (version_key('.'.join(map(str, prefix)) + '.dev0'), False)))
+            for side, bound in bounds:
+                if side == 'lower':
+                    if lower is None or bound[0] > lower[0] or (bound[0] == lower[0] and not bound[1]):
+                        lower = bound
+                elif upper is None or bound[0] < upper[0] or (bound[0] == upper[0] and not bound[1]):
+                    upper = bound
+        if lower is not None and upper is not None:
+            if lower[0] > upper[0] or (lower[0] == upper[0] and not (lower[1] and upper[1])):
+                return True
+        pins = [version for operator, version in clauses if operator == '==' and not version.endswith('.*')]
+        return any(not version_matches(version, specifier) for version in pins)
+    except ValueError:
+        return False
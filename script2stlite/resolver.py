@@ -0,0 +1,202 @@
+"""
+Build-time resolution of APP_REQUIREMENTS against a Pyodide lock file.
+
+Unresolved requirements such as ``streamlit-echarts>=0.4.0`` make micropip
+search for matching versions in the browser on every page load. With a
+``pyodide-lock.json`` for the selected Pyodide version (and optionally a local
+folder of wheels acting as a package index), each requirement is pinned here
+to the exact version that will be installed, and requirements that Pyodide
+cannot provide are reported at build time instead of failing in the browser.
+No network access is needed.
+"""
+import json
+import os
+import re
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from .requirements import STLITE_PROVIDED, normalize_name, parse_requirement, version_matches
+from .wheels import Wheel, match_wheel
+
+LOCK_FILENAME = 'pyodide-lock.json'
+RESOLVE_ACTIONS = ('warn', 'fail')
+_PYODIDE_URL_VERSION = re.compile(r'/pyodide/v?(\d+(?:\.\d+)*(?:[a-z]+\d*)?)/')
+
+
+class LockedPackage(NamedTuple):
+    """
+    A package in a Pyodide lock file.
+
+    Attributes
+    ----------
+    name : str
+        The package name as written in the lock file.
+    version : str
+        The version shipped with that Pyodide release.
+    imports : Tuple[str, ...]
+        The top-level modules the package provides.
+    """
+    name: str
+    version: str
+    imports: Tuple[str, ...] = ()
+
+
+def pyodide_version_number(pyodide_setting: Optional[str]) -> Optional[str]:
+    """
+    Extract the Pyodide version from the |PYODIDE_VERSION| setting.
+
+    Parameters
+    ----------
+    pyodide_setting : Optional[str]
+        The |PYODIDE_VERSION| value, e.g.
+        ``'pyodideUrl: "https://cdn.jsdelivr.net/pyodide/v0.27.4/full/pyodide.js",'``.
+
+    Returns
+    -------
+    Optional[str]
+        The version (e.g. ``'0.27.4'``), or None if it cannot be determined
+        (e.g. when stlite's default Pyodide is used).
+    """
+    if not pyodide_setting:
+        return None
+    match = _PYODIDE_URL_VERSION.search(pyodide_setting)
+    return match.group(1) if match else None
+
+
+def find_pyodide_lock(location: str, pyodide_version: Optional[str]) -> str:
+    """
+    Find the lock file for a Pyodide version.
+
+    Parameters
+    ----------
+    location : str
+        A ``pyodide-lock.json`` file, or a directory holding lock files as
+        ``<version>/pyodide-lock.json``, ``pyodide-lock-<version>.json`` or a
+        single ``pyodide-lock.json``.
+    pyodide_version : Optional[str]
+        The selected Pyodide version, if known.
+
+    Returns
+    -------
+    str
+        The path of the lock file.
+
+    Raises
+    ------
+    ValueError
+        If no lock file is found.
+    """
+    if os.path.isfile(location):
+        return location
+    if not os.path.isdir(location):
+        raise ValueError(f"PYODIDE_LOCK not found: {location}")
+    candidates = []
+    if pyodide_version is not None:
+        candidates += [os.path.join(location, pyodide_version, LOCK_FILENAME),
+                       os.path.join(location, f'pyodide-lock-{pyodide_version}.json')]
+    candidates.append(os.path.join(location, LOCK_FILENAME))
+    for path in candidates:
+        if os.path.isfile(path):
+            return path
+    raise ValueError(f"No {LOCK_FILENAME} for Pyodide {pyodide_version or '(unknown version)'} found in {location}.")
+
+
+def load_pyodide_lock(path: str) -> Tuple[Optional[str], Dict[str, LockedPackage]]:
+    """
+    Read a ``pyodide-lock.json`` file.
+
+    Parameters
+    ----------
+    path : str
+        Path of the lock file.
+
+    Returns
+    -------
+    Tuple[Optional[str], Dict[str, LockedPackage]]
+        The Pyodide version the lock file belongs to (if recorded), and its
+        packages keyed by normalized name.
+
+    Raises
+    ------
+    ValueError
+        If the file is not a valid lock file.
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            lock = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        raise ValueError(f"Failed to read Pyodide lock file {path}: {e}")
+    if not isinstance(lock, dict) or not isinstance(lock.get('packages'), dict):
+        raise ValueError(f"{path} is not a Pyodide lock file (no 'packages' mapping).")
+    packages = {}
+    for key, entry in lock['packages'].items():
+        if not isinstance(entry, dict) or not entry.get('version'):
+            continue
+        name = entry.get('name') or key
+        imports = entry.get('imports')
+        imports = tuple(str(module) for module in imports) if isinstance(imports, list) else ()
+        packages[normalize_name(name)] = LockedPackage(name, str(entry['version']), imports)
+    info = lock.get('info')
+    version = info.get('version') if isinstance(info, dict) else None
+    return version, packages
+
+
+def resolve_requirements(requirements: List[str], locked: Dict[str, LockedPackage],
+                         index: Optional[List[Wheel]] = None,
+                         pyodide_version: Optional[str] = None) -> Tuple[List[str], List[str]]:
+    """
+    Pin requirements to the versions in a Pyodide lock file or local package index.
+
+    A requirement is pinned to the lock file's version if that version satisfies
+    it, otherwise to the newest satisfying wheel in `index`. Extras and
+    environment markers are kept. Requirements that are not plain named
+    requirements (``emfs:`` paths, URLs...) and packages provided by stlite are
+    left unchanged.
+
+    Parameters
+    ----------
+    requirements : List[str]
+        The APP_REQUIREMENTS.
+    locked : Dict[str, LockedPackage]
+        The lock file's packages (see `load_pyodide_lock`).
+    index : Optional[List[Wheel]]
+        Wheels of a local package index (see `wheels.find_wheels`).
+    pyodide_version : Optional[str]
+        The Pyodide version, used in messages.
+
+    Returns
+    -------
+    Tuple[List[str], List[str]]
+        The requirements with pins applied (same order), and a message for each
+        requirement that could not be resolved (left unchanged), including
+        requirements with an invalid specifier or whose locked version is not a
+        valid PEP 440 version.
+    """
+    release = f"Pyodide {pyodide_version}" if pyodide_version else "the selected Pyodide"
+    resolved, problems = [], []
+    for requirement in requirements:
+        parsed = parse_requirement(requirement)
+        if parsed is None or parsed.key in STLITE_PROVIDED:
+            resolved.append(requirement)
+            continue
+        marker = f'; {parsed.marker}' if parsed.marker else ''
+        package = locked.get(parsed.key)
+        error = None
+        try:
+            if package is not None and version_matches(package.version, parsed.specifier):
+                resolved.append(f'{parsed.name}{parsed.extras}=={package.version}{marker}')
+                continue
+        except ValueError as e:
+            error = e
+        wheel = match_wheel(f'{parsed.name}{parsed.specifier}', index) if index else None
+        if wheel is not None:
+            resolved.append(f'{parsed.name}{parsed.extras}=={wheel.version}{marker}')
+            continue
+        resolved.append(requirement)
+        if error is not None:
+            problems.append(f"{requirement}: cannot be checked against {release} ({error})")
+        elif package is not None:
+            problems.append(f"{requirement}: {release} ships {package.name} {package.version}, "
+                            f"which does not match {parsed.specifier}")
+        else:
+            problems.append(f"{requirement}: not available in {release} or the local package index")
+    return resolved, problems
@@ -1,8 +1,22 @@
-from .functions import load_all_versions,folder_exists,get_current_directory,create_directory,copy_file_from_subfolder,file_exists, load_yaml_from_file,create_html,write_text_file, parse_requirements
-from .discovery import discover_all_files
+from .functions import load_all_versions,folder_exists,get_current_directory,create_directory,copy_file_from_subfolder,file_exists, load_yaml_from_file,write_html, parse_requirements, parse_requirements_text, write_bundle_hash
+from .build_cache import BuildCache
+from .size_report import (INCLUDED_BY_APP_FILES, INCLUDED_BY_ENTRYPOINT, INCLUDED_BY_WHEELHOUSE, SIZE_REPORT_SUFFIX, SizeRecorder,
+                          build_size_report, check_size_budget, validate_size_budget, write_size_report)
+from .build_result import BuildResult, BuildTimer, StageCallback
+from .discovery import prune_external_assets, scan_tree, update_build_manifest
+from .sources import AppSource, DirectorySource, OverlaySource, is_archive, open_source
+from .wheels import embed_wheels, find_wheels
+from .reachability import DISCOVERY_MODES, find_reachable
+from .imports import check_requirements, find_imports, local_module_names
+from .requirements import STLITE_PROVIDED, merge_requirements, parse_requirement, unsatisfiable
+from .resolver import (RESOLVE_ACTIONS, find_pyodide_lock, load_pyodide_lock, pyodide_version_number,
+                       resolve_requirements)
+from .watch import watch as _watch, DEFAULT_POLL_INTERVAL, DEFAULT_DEBOUNCE
 import os
+import yaml
 from pathlib import Path
-from typing import Union, Optional, Dict, Any
+from typing import Union, Optional, Dict, Any, Iterable, List, NamedTuple, Set, Tuple
+import threading
 
 def s2s_prepare_folder(directory: Optional[str] = None) -> None:
     """
@@ -51,31 +65,28 @@ def s2s_prepare_folder(directory: Optional[str] = None) -> None:
     print(f"* Folder structure successfully created: {directory}. \n")
 
 
-def _s2s_convert_core(
-    settings: Dict[str, Any],
-    directory: str,
-    stlite_version: Optional[str] = None,
-    pyodide_version: Optional[str] = None,
-    packages: Optional[Dict[str, str]] = None
-) -> None:
+def _apply_versions(settings: Dict[str, Any], versions: Tuple[Any, ...], stlite_version: Optional[str] = None,
+                    pyodide_version: Optional[str] = None) -> None:
     """
-    Core logic for converting a Streamlit application to stlite HTML.
+    Put the stlite CSS/JS and Pyodide versions to build with into `settings`.
 
     Parameters
     ----------
     settings : Dict[str, Any]
-        The application settings.
-    directory : str
-        The root directory of the application.
+        The application settings (updated in place).
+    versions : Tuple[Any, ...]
+        Result of `load_all_versions()`.
     stlite_version : Optional[str]
-        Specific stlite version to use.
+        Specific stlite version to use. Defaults to the latest.
     pyodide_version : Optional[str]
-        Specific Pyodide version to use.
-    packages : Optional[Dict[str, str]]
-        Package version overrides.
+        Specific Pyodide version to use (with `stlite_version`).
+
+    Raises
+    ------
+    ValueError
+        If the stlite version is not supported.
     """
-    #1. load versions
-    stylesheet_versions, stylesheet_top_version, js_versions, js_top_version, pyodide_versions, pyodide_top_version = load_all_versions()
+    stylesheet_versions, stylesheet_top_version, js_versions, js_top_version, pyodide_versions, pyodide_top_version = versions
     
     if stlite_version is None:
         stylesheet = stylesheet_top_version
@@ -94,85 +105,501 @@ Valid versions include: {list(stylesheet_versions.keys())}''')
     settings.update({"|STLITE_JS|":js})
     settings.update({"|PYODIDE_VERSION|":pyodide})
 
+
+def _merge_requirements(settings: Dict[str, Any], file_reqs: List[str]) -> None:
+    """
+    Add requirements read from requirements.txt to APP_REQUIREMENTS and merge duplicates.
+
+    Requirements naming the same package (after PEP 503 normalization) are
+    merged into one, and packages stlite provides itself (streamlit) are
+    dropped, so micropip only resolves what the app needs
+    (see `requirements.merge_requirements`). A warning is printed for any
+    requirement whose specifiers can match no version.
+    """
+    current_reqs = settings.get('APP_REQUIREMENTS')
+    if current_reqs is None:
+        current_reqs = []
+
+    for r in file_reqs:
+        if r not in current_reqs:
+            current_reqs.append(r)
+            print(f"  - Added requirement from file: {r}")
+
+    merged = merge_requirements(current_reqs, drop=STLITE_PROVIDED)
+    parsed_reqs = [(r, parse_requirement(r)) for r in current_reqs]
+    for r, parsed in parsed_reqs:
+        if parsed is not None and parsed.key in STLITE_PROVIDED:
+            print(f"  - Dropped requirement provided by stlite: {r}")
+    for r in merged:
+        parsed = parse_requirement(r)
+        if parsed is None:
+            continue
+        duplicates = [c for c, p in parsed_reqs if p is not None and (p.key, p.marker) == (parsed.key, parsed.marker)]
+        if len(duplicates) > 1:
+            print(f"  - Merged duplicate requirements {duplicates} into: {r}")
+        if unsatisfiable(parsed.specifier):
+            print(f"Warning: Requirement {r} can match no version, so micropip will fail to install it.")
+
+    settings['APP_REQUIREMENTS'] = merged
+
+
+def _s2s_convert_core(
+    settings: Dict[str, Any],
+    directory: str,
+    stlite_version: Optional[str] = None,
+    pyodide_version: Optional[str] = None,
+    packages: Optional[Dict[str, str]] = None,
+    versions: Optional[Tuple[Any, ...]] = None,
+    output_dir: Optional[str] = None,
+    on_stage: Optional[StageCallback] = None
+) -> BuildResult:
+    """
+    Core logic for converting a Streamlit application to stlite HTML.
+
+    Parameters
+    ----------
+    settings : Dict[str, Any]
+        The application settings.
+    directory : str
+        The root directory of the application, or a zip or tar archive holding
+        it. Archives are read without being extracted (see `sources`).
+    stlite_version : Optional[str]
+        Specific stlite version to use.
+    pyodide_version : Optional[str]
+        Specific Pyodide version to use.
+    packages : Optional[Dict[str, str]]
+        Package version overrides.
+    versions : Optional[Tuple[Any, ...]]
+        Pre-loaded result of `load_all_versions()`, e.g. shared across a batch of
+        conversions. If None, the version indices are loaded here.
+    output_dir : Optional[str]
+        Directory to write the HTML file to. Defaults to `directory` (for an
+        archive, the directory containing it).
+    on_stage : Optional[StageCallback]
+        Function called with the `StageTiming` of each build stage as soon as it
+        finishes (see `build_result`). Stages are also logged to the
+        ``script2stlite.build`` logger.
+
+    Returns
+    -------
+    BuildResult
+        The path of the generated HTML file, per-stage timings, sizes and cache statistics.
+    """
+    timer = BuildTimer(on_stage)
+    #1. load versions
+    with timer.stage('versions'):
+        if versions is None:
+            versions = load_all_versions()
+    _apply_versions(settings, versions, stlite_version, pyodide_version)
+
+    source = open_source(directory) if is_archive(directory) else DirectorySource(directory)
+    try:
+        return _convert_project(settings, source, directory, packages, output_dir, timer)
+    finally:
+        source.close()
+
+
+def _embed_wheelhouse(settings: Dict[str, Any], base_dir: str) -> Dict[str, str]:
+    """
+    Embed the WHEELHOUSE wheels that satisfy APP_REQUIREMENTS (see `wheels.embed_wheels`).
+
+    Rewrites settings['APP_REQUIREMENTS'] in place. A relative WHEELHOUSE is
+    resolved against `base_dir`. Returns the embedded wheels (bundle path -> file
+    on disk), or an empty mapping if no WHEELHOUSE is set.
+    """
+    wheelhouse = settings.get('WHEELHOUSE')
+    if not wheelhouse:
+        return {}
+    if not isinstance(wheelhouse, str):
+        raise ValueError(f"WHEELHOUSE must be a directory path, got {wheelhouse!r}.")
+    wheelhouse = os.path.join(base_dir, wheelhouse)
+    print(f"* Matching APP_REQUIREMENTS against the wheels in {wheelhouse}...")
+    requirements, embedded = embed_wheels(settings.get('APP_REQUIREMENTS') or [], wheelhouse)
+    settings['APP_REQUIREMENTS'] = requirements
+    if embedded:
+        print(f"* Embedded {len(embedded)} wheel(s) from {wheelhouse}.")
+    return embedded
+
+
+def _resolve_requirements(settings: Dict[str, Any], base_dir: str) -> Optional[str]:
+    """
+    Pin APP_REQUIREMENTS against the PYODIDE_LOCK lock file and PACKAGE_INDEX wheels (see `resolver`).
+
+    Rewrites settings['APP_REQUIREMENTS'] in place and returns the path of the
+    lock file used, or None (doing nothing) if no PYODIDE_LOCK is set. Relative
+    paths are resolved against `base_dir`.
+
+    Raises
+    ------
+    ValueError
+        If RESOLVE_ACTION is invalid, the lock file cannot be read, or a
+        requirement cannot be resolved and RESOLVE_ACTION is 'fail'.
+    """
+    lock_location = settings.get('PYODIDE_LOCK')
+    if not lock_location:
+        return None
+    action = settings.get('RESOLVE_ACTION')
+    if action is not None and action not in RESOLVE_ACTIONS:
+        raise ValueError(f"RESOLVE_ACTION must be one of {list(RESOLVE_ACTIONS)}: {action}")
+    pyodide_version = pyodide_version_number(settings.get('|PYODIDE_VERSION|'))
+    lock_path = find_pyodide_lock(os.path.join(base_dir, lock_location), pyodide_version)
+    lock_version, locked = load_pyodide_lock(lock_path)
+    if pyodide_version and lock_version and lock_version != pyodide_version:
+        print(f"Warning: {lock_path} is for Pyodide {lock_version}, but Pyodide {pyodide_version} is selected.")
+    index = find_wheels(os.path.join(base_dir, settings['PACKAGE_INDEX'])) if settings.get('PACKAGE_INDEX') else None
+
+    print(f"* Resolving APP_REQUIREMENTS against {lock_path}...")
+    requirements = settings.get('APP_REQUIREMENTS') or []
+    resolved, problems = resolve_requirements(requirements, locked, index, pyodide_version or lock_version)
+    for before, after in zip(requirements, resolved):
+        if before != after:
+            print(f"  - Pinned requirement: {before} -> {after}")
+    settings['APP_REQUIREMENTS'] = resolved
+    for problem in problems:
+        print(f"Warning: Unresolved requirement {problem}.")
+    if problems and action == 'fail':
+        raise ValueError(f"{len(problems)} requirement(s) could not be resolved: " + '; '.join(problems))
+    return lock_path
+
+
+def _check_imports(settings: Dict[str, Any], source: AppSource, app_files: List[str],
+                   lock_path: Optional[str] = None) -> None:
+    """
+    Compare APP_REQUIREMENTS with the imports of the bundled Python files (see `imports`).
+
+    Warns about requirements that no file imports, and about third-party
+    imports that no requirement provides. With PRUNE_REQUIREMENTS set to true,
+    the unused requirements are removed from settings['APP_REQUIREMENTS'].
+    The modules each package of the Pyodide lock file at `lock_path` provides
+    are taken into account. Skipped if IMPORT_CHECK is false.
+    """
+    if settings.get('IMPORT_CHECK') is False:
+        return
+    entrypoint = settings.get('APP_ENTRYPOINT')
+    bundled = ([entrypoint] if entrypoint and source.exists(entrypoint) else []) + app_files
+    imports = {f.replace(os.sep, '/'): find_imports(source.read_text(f), f) for f in bundled if f.endswith('.py')}
+    provided_imports = None
+    if lock_path is not None:
+        provided_imports = {key: package.imports for key, package in load_pyodide_lock(lock_path)[1].items()}
+    unused, missing = check_requirements(settings.get('APP_REQUIREMENTS') or [], imports, local_module_names(bundled),
+                                         provided_imports)
+    prune = settings.get('PRUNE_REQUIREMENTS') is True
+    for r in unused:
+        if prune:
+            print(f"  - Pruned requirement not imported by any bundled file: {r}")
+        else:
+            print(f"Warning: Requirement {r} is not imported by any bundled .py file "
+                  f"(set PRUNE_REQUIREMENTS: true to drop it).")
+    if prune and unused:
+        settings['APP_REQUIREMENTS'] = [r for r in settings['APP_REQUIREMENTS'] if r not in unused]
+    for module, paths in missing.items():
+        print(f"Warning: Module '{module}' is imported by {', '.join(paths)} but no requirement provides it.")
+
+
+def _shake_tree(settings: Dict[str, Any], source: AppSource, discovered_files: List[str],
+                listed_files: Iterable[str]) -> Tuple[List[str], Optional[Dict[str, Any]]]:
+    """
+    Keep only the discovered files reachable from the app (DISCOVERY_MODE: reachable, see `reachability`).
+
+    Returns the files to bundle and a summary of what was left out (None in
+    the default 'all' mode, where every discovered file is kept).
+
+    Raises
+    ------
+    ValueError
+        If DISCOVERY_MODE is not one of `reachability.DISCOVERY_MODES`.
+    """
+    mode = settings.get('DISCOVERY_MODE') or 'all'
+    if mode not in DISCOVERY_MODES:
+        raise ValueError(f"DISCOVERY_MODE must be one of {list(DISCOVERY_MODES)}: {mode}")
+    if mode == 'all':
+        return discovered_files, None
+
+    entrypoint = settings.get('APP_ENTRYPOINT')
+    config = settings.get('CONFIG')
+    roots = [entrypoint] + list(listed_files) + ([config] if isinstance(config, str) else [])
+    native = {f.replace(os.sep, '/'): f for f in list(discovered_files) + roots if source.exists(f)}
+    reachable, fallbacks = find_reachable(native, [f.replace(os.sep, '/') for f in roots],
+                                          lambda f: source.read_text(native[f]),
+                                          search_dirs=dict.fromkeys([os.path.dirname(entrypoint).replace(os.sep, '/'), '']))
+    kept = [f for f in discovered_files if f.replace(os.sep, '/') in reachable]
+    removed = sorted(f.replace(os.sep, '/') for f in discovered_files if f.replace(os.sep, '/') not in reachable)
+    removed_bytes = sum(source.size(native[f]) for f in removed)
+    for folder in fallbacks:
+        print(f"  - Dynamic file reference: including everything under {folder + '/' if folder else 'the app root'}")
+    print(f"* Tree shaking: kept {len(kept)} of {len(discovered_files)} discovered file(s); "
+          f"{len(removed)} unreachable file(s) left out ({removed_bytes:,} bytes).")
+    return kept, {'removed_files': removed, 'removed_bytes': removed_bytes, 'dynamic_folders': fallbacks}
+
+
+def _drop_build_inputs(files: List[str], settings: Dict[str, Any], root: str,
+                       lock_path: Optional[str] = None) -> List[str]:
+    """
+    Remove the build-time inputs inside `root` from discovered files.
+
+    These are the wheels in WHEELHOUSE and PACKAGE_INDEX (used through the
+    requirements, not as app files) and the Pyodide lock file.
+    """
+    root = os.path.abspath(root)
+    wheel_prefixes = []
+    for key in ('WHEELHOUSE', 'PACKAGE_INDEX'):
+        if settings.get(key):
+            wheel_dir = os.path.relpath(os.path.abspath(os.path.join(root, settings[key])), root)
+            if not wheel_dir.startswith(os.pardir):
+                wheel_prefixes.append('' if wheel_dir == os.curdir else wheel_dir + os.sep)
+    lock_file = os.path.relpath(os.path.abspath(lock_path), root) if lock_path else None
+    return [f for f in files
+            if f != lock_file and not (f.endswith('.whl') and any(f.startswith(prefix) for prefix in wheel_prefixes))]
+
+
+class _CollectedFiles(NamedTuple):
+    """The app files of a build, as found by `_collect_app_files`."""
+    source: AppSource                 # the app source, overlaid with any embedded wheels
+    app_files: List[str]              # bundle paths (without the entrypoint), wheels included
+    listed_files: Set[str]            # the paths listed in APP_FILES
+    stats: Dict[str, os.stat_result]  # discovery stat results (directory sources only)
+    wheels: Dict[str, str]            # bundle path -> local path of each embedded wheel
+    tree_shaking: Optional[Dict[str, Any]]
+
+
+def _collect_app_files(settings: Dict[str, Any], source: AppSource, base_dir: str, label: str,
+                       timer: BuildTimer) -> _CollectedFiles:
+    """
+    Merge requirements.txt, embed local wheels and discover the app files to bundle.
+
+    File-based and in-memory conversion both go through here, so the same project
+    produces the same bytes either way. Sets APP_REQUIREMENTS and APP_FILES in
+    `settings`.
+
+    Parameters
+    ----------
+    settings : Dict[str, Any]
+        The build settings, with versions applied.
+    source : AppSource
+        The app source.
+    base_dir : str
+        Directory that a relative WHEELHOUSE, PACKAGE_INDEX or PYODIDE_LOCK is relative to.
+    label : str
+        Where the app files are, for messages.
+    timer : BuildTimer
+        Timer for the 'requirements' and 'discovery' stages.
+
+    Returns
+    -------
+    _CollectedFiles
+        The (possibly overlaid) source, the app files and what was found on the way.
+
+    Raises
+    ------
+    ValueError
+        If a listed app file does not exist.
+    """
+    is_directory = isinstance(source, DirectorySource)
+
     # --- Auto Discovery: requirements.txt ---
-    req_file = os.path.join(directory, 'requirements.txt')
-    if os.path.isfile(req_file):
-        print(f"* Found requirements.txt in {directory}. Parsing...")
-        file_reqs = parse_requirements(req_file)
-
-        current_reqs = settings.get('APP_REQUIREMENTS')
-        if current_reqs is None:
-            current_reqs = []
-
-        # Merge requirements, avoiding exact duplicates
-        for r in file_reqs:
-            if r not in current_reqs:
-                current_reqs.append(r)
-                print(f"  - Added requirement from file: {r}")
-
-        settings['APP_REQUIREMENTS'] = current_reqs
-    
+    with timer.stage('requirements') as stage:
+        file_reqs = []
+        if source.exists('requirements.txt'):
+            print(f"* Found requirements.txt in {label}. Parsing...")
+            if is_directory:
+                file_reqs = parse_requirements(os.path.join(source.root, 'requirements.txt'))
+            else:
+                file_reqs = parse_requirements_text(source.read_text('requirements.txt'))
+            stage.bytes = source.size('requirements.txt')
+        _merge_requirements(settings, file_reqs)
+        # Local wheels: installed by micropip from the bundle instead of the network.
+        wheels = _embed_wheelhouse(settings, base_dir)
+        lock_path = _resolve_requirements(settings, base_dir)
+        stage.bytes += sum(os.path.getsize(path) for path in wheels.values())
+
     #if app entrypoint in app files, remove it! It will be used to replace |APP_HOME| in the html template.
-    app_files = settings.get('APP_FILES', [])
-    if app_files is None:
-        app_files = []
+    app_files = list(settings.get('APP_FILES') or [])
+    listed_files = set(app_files)
 
     # --- Auto Discovery ---
-    # We now discover ALL files in the directory (respecting default ignores)
-    print(f"* Starting discovery of all files in {directory}...")
-    discovered_files = discover_all_files(directory)
+    # We now discover ALL files in the directory (respecting default ignores),
+    # except the outputs of previous builds, which would otherwise be embedded in the new bundle.
+    output_filename = f'{settings.get("APP_NAME").replace(" ","_")}.html'
+    build_outputs = source.recorded_outputs() | {output_filename, f'{output_filename}.sha256',
+                                                 f'{output_filename}{SIZE_REPORT_SUFFIX}'}
+    previous_outputs = [f for f in build_outputs if f not in app_files and source.exists(f)]
+    if previous_outputs:
+        saved_bytes = sum(source.size(f) for f in previous_outputs)
+        print(f"* Excluded {len(previous_outputs)} previous build output(s) from discovery ({saved_bytes:,} bytes not re-embedded).")
+
+    print(f"* Starting discovery of all files in {label}...")
+    # The stat results gathered during discovery are reused by the build cache.
+    # Archives are discovered from their index, without extracting anything.
+    use_gitignore = settings.get('USE_GITIGNORE') is True
+    follow_symlinks = settings.get('FOLLOW_SYMLINKS') is True
+    with timer.stage('discovery') as stage:
+        if is_directory:
+            discovered_stats = scan_tree(source.root, exclude_paths=build_outputs, use_gitignore=use_gitignore,
+                                         follow_symlinks=follow_symlinks)
+            stage.bytes = sum(stat.st_size for stat in discovered_stats.values())
+            discovered_files = list(discovered_stats)
+        else:
+            discovered_stats = {}
+            discovered_files = source.discover(exclude_paths=build_outputs, use_gitignore=use_gitignore,
+                                               follow_symlinks=follow_symlinks)
+            stage.bytes = sum(source.size(f) for f in discovered_files)
+
+    if source.root is not None:
+        discovered_files = _drop_build_inputs(discovered_files, settings, source.root, lock_path)
+    discovered_files, tree_shaking = _shake_tree(settings, source, discovered_files, listed_files)
 
     for f in discovered_files:
         if f not in app_files:
             app_files.append(f)
             # print(f"  - Discovered file: {f}") # Can be verbose
 
+    # Sort (by bundle path) so the same project always produces the same bytes,
+    # whatever the discovery order, interpreter or OS.
+    app_files.sort(key=lambda f: f.replace(os.sep, '/'))
+
     # Update settings with discovered files so create_html uses them
     settings['APP_FILES'] = app_files
 
     if settings.get('APP_ENTRYPOINT') in app_files:
         app_files.remove(settings.get('APP_ENTRYPOINT'))
-    
-    # 3. Check that all files exist.
+
+    # Check that all files exist.
     for file_j in app_files:
-        if not file_exists(os.path.join(directory,file_j)): raise ValueError(f"* File {file_j} not found in {directory}.")
-        
-    # 4. generate html
-    html = create_html(directory,settings,packages=packages)
-    write_text_file(os.path.join(directory,f'{settings.get("APP_NAME").replace(" ","_")}.html'), html)
+        if not source.exists(file_j): raise ValueError(f"* File {file_j} not found in {label}.")
+
+    _check_imports(settings, source, app_files, lock_path)
+
+    if wheels:
+        app_files.extend(wheels)
+        app_files.sort(key=lambda f: f.replace(os.sep, '/'))
+        source = OverlaySource(source, wheels)
+    return _CollectedFiles(source, app_files, listed_files, discovered_stats, wheels, tree_shaking)
+
+
+def _convert_project(settings: Dict[str, Any], source: AppSource, directory: str,
+                     packages: Optional[Dict[str, str]], output_dir: Optional[str], timer: BuildTimer) -> BuildResult:
+    """Discover, render and finalize a bundle once versions are set (see `_s2s_convert_core`)."""
+    is_directory = isinstance(source, DirectorySource)
+    budget_total = settings.get('SIZE_BUDGET_TOTAL')
+    budget_per_file = settings.get('SIZE_BUDGET_PER_FILE')
+    budget_action = settings.get('SIZE_BUDGET_ACTION')
+    validate_size_budget(budget_total, budget_per_file, budget_action)
+
+    # An archive's wheelhouse and lock file are found next to the archive.
+    project_dir = directory if is_directory else os.path.dirname(os.path.abspath(directory))
+    source, app_files, listed_files, discovered_stats, wheels, tree_shaking = _collect_app_files(
+        settings, source, project_dir, directory, timer)
+
+    # 4. generate html, streaming it straight to the output file.
+    # Encoded assets are reused from the build cache unless BUILD_CACHE is set to false.
+    # An archive's bundle is written next to the archive; the build cache only serves project directories.
+    if output_dir is None:
+        output_dir = directory if is_directory else os.path.dirname(os.path.abspath(directory))
+    output_path = os.path.join(output_dir, f'{settings.get("APP_NAME").replace(" ","_")}.html')
+    use_cache = is_directory and settings.get('BUILD_CACHE', True) is not False
+    cache = BuildCache(directory, stats=discovered_stats) if use_cache else None
+    if cache is not None:
+        for rel_path, path in wheels.items():
+            cache.add_file(rel_path, path)
+    recorder = SizeRecorder()
+    external_paths = write_html(output_path, source, settings, packages=packages, cache=cache, recorder=recorder,
+                                timer=timer)
+    asset_paths = list(external_paths)
+    result = BuildResult(output_path=output_path, stages=timer.stages)
+
+    with timer.stage('finalize'):
+        # Size report: output bytes per file, checked against the size budgets.
+        violations = []
+        if os.path.isfile(output_path):
+            entrypoint = settings.get('APP_ENTRYPOINT')
+            included_by = {f: INCLUDED_BY_APP_FILES for f in listed_files}
+            included_by[entrypoint] = INCLUDED_BY_ENTRYPOINT
+            included_by.update({f: INCLUDED_BY_WHEELHOUSE for f in wheels})
+            report = build_size_report(source, output_path, entrypoint, app_files, recorder, included_by,
+                                       external_paths=external_paths)
+            if tree_shaking is not None:
+                report['tree_shaking'] = tree_shaking
+            largest = max(report['files'], key=lambda entry: entry['encoded_bytes'])
+            print(f"* Bundle size: {report['total_bytes']:,} bytes ({len(report['files'])} file(s); "
+                  f"largest: {largest['path']}, {largest['encoded_bytes']:,} bytes).")
+            violations = check_size_budget(report, total=budget_total, per_file=budget_per_file, action=budget_action)
+            if settings.get('SIZE_REPORT') is True:
+                write_size_report(f'{output_path}{SIZE_REPORT_SUFFIX}', report)
+                print(f"* Size report written to {output_path}{SIZE_REPORT_SUFFIX}")
+                external_paths = external_paths + [f'{output_path}{SIZE_REPORT_SUFFIX}']
+            result.size_report = report
+            result.html_bytes = report['html_bytes']
+            result.total_bytes = report['total_bytes']
+            result.file_count = len(report['files'])
+
+        if settings.get('BUNDLE_HASH') is True:
+            print(f"* Bundle SHA-256: {write_bundle_hash(output_path)}")
+            external_paths = external_paths + [f'{output_path}.sha256']
+        # Record the HTML, its hash file, size report and any split-output assets so later builds never embed them.
+        # (An archive is never written to, so it has no manifest.)
+        def project_path(path: str) -> Optional[str]:
+            rel_path = os.path.relpath(os.path.abspath(path), os.path.abspath(directory))
+            return rel_path if is_directory and not rel_path.startswith(os.pardir) else None
+
+        outputs = [p for p in map(project_path, [output_path] + external_paths) if p is not None]
+        if outputs:
+            # Split-output assets written by an earlier build of this HTML that no build refers to any more are deleted.
+            if project_path(output_path) is not None:
+                assets = [p for p in map(project_path, asset_paths) if p is not None]
+                for asset in prune_external_assets(directory, project_path(output_path), assets):
+                    print(f"  - Deleted unused asset: {asset}")
+            update_build_manifest(directory, outputs)
+        if cache is not None:
+            cache.save()
+            print(f"* Asset cache: {cache.summary()}.")
+            result.cache_hits, result.cache_misses = cache.hits, cache.misses
+        result.external_paths = external_paths
+    if violations and budget_action == 'fail':
+        raise RuntimeError(f"Bundle size budget exceeded ({len(violations)} violation(s)): " + '; '.join(violations))
+    return result
 
 
 def s2s_convert(
     stlite_version: Optional[str] = None,
     pyodide_version: Optional[str] = None,
     directory: Optional[str] = None,
-    packages: Optional[Dict[str, str]] = None
-) -> None:
+    packages: Optional[Dict[str, str]] = None,
+    on_stage: Optional[StageCallback] = None
+) -> BuildResult:
     """
     Converts a Streamlit application project into a single HTML file using stlite.
 
     See `_s2s_convert_core` for details on the conversion process.
     This function primarily handles loading settings from `settings.yaml`.
+    It returns the `BuildResult` of the conversion; `on_stage` is called with
+    the timing of each build stage as it finishes.
     """
     #0. read/set directory
     if directory is not None: #directory is provided
         #check provided directory is valid
-        if not folder_exists(directory): raise ValueError(f'''* {directory} does not exist on this system.''')
+        if not folder_exists(directory) and not is_archive(directory): raise ValueError(f'''* {directory} does not exist on this system.''')
     else:  #nodirectory provided, use cd
         directory = get_current_directory()
         print(f"* No user directory provided. Creating new s2stlite project in current directory ({directory}). \n")
 
-    #1. read settings yaml
-    if not file_exists(os.path.join(directory,'settings.yaml')): raise ValueError(f"* No settings file found in {directory}. Please run s2s_prepare_folder().")
-    settings = load_yaml_from_file(os.path.join(directory,'settings.yaml'))
+    #1. read settings yaml (from inside the archive when converting one)
+    if is_archive(directory):
+        with open_source(directory) as source:
+            if not source.exists('settings.yaml'): raise ValueError(f"* No settings file found in {directory}.")
+            settings = yaml.safe_load(source.read_text('settings.yaml'))
+        if not isinstance(settings, dict): raise ValueError("YAML content is not a dictionary (mapping type)")
+    else:
+        if not file_exists(os.path.join(directory,'settings.yaml')): raise ValueError(f"* No settings file found in {directory}. Please run s2s_prepare_folder().")
+        settings = load_yaml_from_file(os.path.join(directory,'settings.yaml'))
 
     #2. Call core conversion
-    _s2s_convert_core(
+    return _s2s_convert_core(
         settings=settings,
         directory=directory,
         stlite_version=stlite_version,
         pyodide_version=pyodide_version,
-        packages=packages
+        packages=packages,
+        on_stage=on_stage
     )
 
 
@@ -188,11 +615,14 @@ class Script2StliteConverter:
         ----------
         directory : Optional[str], optional
             The target directory for operations. If None, defaults to the
-            current working directory.
+            current working directory. May also be a zip or tar archive of the
+            project, which is converted without being extracted.
         """
         if directory is None:
             self.directory = get_current_directory()
             print(f"* No directory provided. Using current directory ({self.directory}). \n")
+        elif is_archive(directory):
+            self.directory = directory
         else:
             if not folder_exists(directory):
                 # Attempt to create it if it doesn't exist, or let s2s_prepare_folder handle it.
@@ -217,8 +647,9 @@ class Script2StliteConverter:
         self,
         stlite_version: Optional[str] = None,
         pyodide_version: Optional[str] = None,
-        packages: Optional[Dict[str, str]] = None
-    ) -> None:
+        packages: Optional[Dict[str, str]] = None,
+        on_stage: Optional[StageCallback] = None
+    ) -> BuildResult:
         """
         Converts a Streamlit application project into a single HTML file using stlite,
         operating on the directory specified during class initialization.
@@ -231,12 +662,20 @@ class Script2StliteConverter:
             The specific version of Pyodide to use. If None, latest is used.
         packages : Optional[Dict[str, str]], optional
             A dictionary to override package versions.
+        on_stage : Optional[StageCallback], optional
+            Function called with the `StageTiming` of each build stage as it finishes.
+
+        Returns
+        -------
+        BuildResult
+            The output path, per-stage timings, sizes and cache statistics.
         """
-        s2s_convert(
+        return s2s_convert(
             stlite_version=stlite_version,
             pyodide_version=pyodide_version,
             directory=self.directory,
-            packages=packages
+            packages=packages,
+            on_stage=on_stage
         )
 
     def convert_from_entrypoint(
@@ -249,8 +688,25 @@ class Script2StliteConverter:
         extra_files: Optional[list] = None,
         stlite_version: Optional[str] = None,
         pyodide_version: Optional[str] = None,
-        packages: Optional[Dict[str, str]] = None
-    ) -> None:
+        packages: Optional[Dict[str, str]] = None,
+        compress_assets: bool = False,
+        external_asset_threshold: Optional[int] = None,
+        embed_mode: str = 'inline',
+        bundle_hash: bool = False,
+        use_gitignore: bool = False,
+        follow_symlinks: bool = False,
+        size_report: bool = False,
+        size_budget_total: Optional[int] = None,
+        size_budget_per_file: Optional[int] = None,
+        size_budget_action: str = 'warn',
+        wheelhouse: Optional[str] = None,
+        pyodide_lock: Optional[str] = None,
+        package_index: Optional[str] = None,
+        resolve_action: str = 'warn',
+        prune_requirements: bool = False,
+        discovery_mode: str = 'all',
+        on_stage: Optional[StageCallback] = None
+    ) -> BuildResult:
         """
         Converts a Streamlit application using parameters directly, skipping settings.yaml.
 
@@ -274,6 +730,58 @@ class Script2StliteConverter:
             The specific version of Pyodide to use.
         packages : Optional[Dict[str, str]], optional
             Package version overrides.
+        compress_assets : bool, optional
+            Whether to deflate non-Python assets and inflate them in the browser. Default False.
+        external_asset_threshold : Optional[int], optional
+            If set, non-Python assets of at least this many bytes are written next to the
+            HTML under content-hashed names and fetched by URL. Default None (embed everything).
+        embed_mode : str, optional
+            'inline' (default) embeds file payloads in the module script; 'blocks' embeds them
+            in non-executable <script> blocks that are read when the app is mounted.
+        bundle_hash : bool, optional
+            Whether to write the SHA-256 of the HTML to ``<app name>.html.sha256``. Default False.
+        use_gitignore : bool, optional
+            Whether auto-discovery also skips files matched by ``.gitignore`` files
+            (``.s2signore`` files are always applied). Default False.
+        follow_symlinks : bool, optional
+            Whether auto-discovery descends into symlinked directories. Symlinks that
+            loop back to a parent directory are skipped. Default False.
+        size_report : bool, optional
+            Whether to write a JSON size report to ``<app name>.html.size.json``. Default False.
+        size_budget_total : Optional[int], optional
+            Budget in bytes for the HTML plus any external assets. Default None (no limit).
+        size_budget_per_file : Optional[int], optional
+            Budget in bytes for the output of any single file. Default None (no limit).
+        size_budget_action : str, optional
+            'warn' (default) prints a warning when a budget is exceeded; 'fail' raises a
+            RuntimeError once the HTML and size report have been written.
+        wheelhouse : Optional[str], optional
+            Directory of local wheels (relative to the project directory). Requirements a
+            pure-Python wheel there satisfies are embedded and installed from the bundle
+            instead of downloaded; their own dependencies are still resolved by micropip.
+            Default None.
+        pyodide_lock : Optional[str], optional
+            A ``pyodide-lock.json`` file, or a directory of them per Pyodide version (relative
+            to the project directory). If set, requirements are pinned at build time to the
+            versions it lists. Default None (requirements are resolved in the browser).
+        package_index : Optional[str], optional
+            Directory of wheels used to pin requirements the lock file does not provide. Default None.
+        resolve_action : str, optional
+            'warn' (default) prints a warning for requirements that cannot be resolved; 'fail'
+            raises a ValueError.
+        prune_requirements : bool, optional
+            Whether to drop requirements that no bundled .py file imports (they are only
+            reported by default). Default False.
+        discovery_mode : str, optional
+            'all' (default) bundles every discovered file; 'reachable' bundles only the files
+            reachable from the entrypoint and pages through imports and literal file paths.
+        on_stage : Optional[StageCallback], optional
+            Function called with the `StageTiming` of each build stage as it finishes.
+
+        Returns
+        -------
+        BuildResult
+            The output path, per-stage timings, sizes and cache statistics.
         """
         if idbfs_mountpoints is None:
             idbfs_mountpoints = ['/mnt']
@@ -289,22 +797,122 @@ class Script2StliteConverter:
             'SHARED_WORKER': shared_worker,
             'IDBFS_MOUNTPOINTS': idbfs_mountpoints,
             'APP_FILES': extra_files,
-            'APP_REQUIREMENTS': [] # Will be populated by requirements.txt scan in core
+            'APP_REQUIREMENTS': [], # Will be populated by requirements.txt scan in core
+            'COMPRESS_ASSETS': compress_assets,
+            'EXTERNAL_ASSET_THRESHOLD': external_asset_threshold,
+            'EMBED_MODE': embed_mode,
+            'BUNDLE_HASH': bundle_hash,
+            'USE_GITIGNORE': use_gitignore,
+            'FOLLOW_SYMLINKS': follow_symlinks,
+            'SIZE_REPORT': size_report,
+            'SIZE_BUDGET_TOTAL': size_budget_total,
+            'SIZE_BUDGET_PER_FILE': size_budget_per_file,
+            'SIZE_BUDGET_ACTION': size_budget_action,
+            'WHEELHOUSE': wheelhouse,
+            'PYODIDE_LOCK': pyodide_lock,
+            'PACKAGE_INDEX': package_index,
+            'RESOLVE_ACTION': resolve_action,
+            'PRUNE_REQUIREMENTS': prune_requirements,
+            'DISCOVERY_MODE': discovery_mode
         }
 
         # Check entrypoint existence here to fail fast?
         # _s2s_convert_core checks discovery, but checking here is good practice.
-        if not os.path.isfile(os.path.join(self.directory, entrypoint)):
+        if is_archive(self.directory):
+            with open_source(self.directory) as source:
+                entrypoint_found = source.exists(entrypoint)
+        else:
+            entrypoint_found = os.path.isfile(os.path.join(self.directory, entrypoint))
+        if not entrypoint_found:
             raise ValueError(f"Entrypoint file '{entrypoint}' not found in {self.directory}")
 
         print(f"* Converting from entrypoint '{entrypoint}' in {self.directory}...")
 
-        _s2s_convert_core(
+        return _s2s_convert_core(
             settings=settings,
             directory=self.directory,
             stlite_version=stlite_version,
             pyodide_version=pyodide_version,
-            packages=packages
+            packages=packages,
+            on_stage=on_stage
+        )
+
+    def watch(
+        self,
+        app_name: Optional[str] = None,
+        entrypoint: Optional[str] = None,
+        serve: bool = True,
+        port: int = 8000,
+        open_browser: bool = True,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        debounce: float = DEFAULT_DEBOUNCE,
+        stop_event: Optional[threading.Event] = None,
+        **convert_kwargs: Any
+    ) -> None:
+        """
+        Convert the app, then rebuild it every time a project file changes.
+
+        The project tree is monitored with the same ignore rules and symlink handling
+        as auto-discovery (including `use_gitignore` and `follow_symlinks`),
+        bursts of saves are debounced into one rebuild, and unchanged assets are
+        reused from the build cache. While `serve` is True, the app is served from
+        a local dev server and open browser tabs reload after every rebuild.
+
+        Parameters
+        ----------
+        app_name : Optional[str], optional
+            The name of the application. If given together with `entrypoint`, the app is
+            built with `convert_from_entrypoint`; otherwise `settings.yaml` is used.
+        entrypoint : Optional[str], optional
+            The entrypoint script filename (see `app_name`).
+        serve : bool, optional
+            If True (default), serve the app with live reload.
+        port : int, optional
+            The port for the dev server (default is 8000).
+        open_browser : bool, optional
+            If True (default), open the app in the default web browser.
+        poll_interval : float, optional
+            Seconds between scans of the project tree.
+        debounce : float, optional
+            Seconds without further changes before a rebuild starts.
+        stop_event : Optional[threading.Event], optional
+            Event that stops watching when set. Otherwise watch until Ctrl+C.
+        **convert_kwargs : Any
+            Further arguments for `convert_from_entrypoint` (or `convert`).
+        """
+        if (app_name is None) != (entrypoint is None):
+            raise ValueError("app_name and entrypoint must be given together (or both omitted to use settings.yaml).")
+        if is_archive(self.directory):
+            raise ValueError("Watch mode needs a project directory, not an archive.")
+
+        def build() -> str:
+            if entrypoint is not None:
+                self.convert_from_entrypoint(app_name=app_name, entrypoint=entrypoint, **convert_kwargs)
+                name = app_name
+            else:
+                self.convert(**convert_kwargs)
+                name = load_yaml_from_file(os.path.join(self.directory, 'settings.yaml')).get('APP_NAME')
+            return f'{name.replace(" ","_")}.html'
+
+        def scan_options() -> Dict[str, bool]:
+            # Watch the tree with the same ignore and symlink settings the build discovers it with.
+            if entrypoint is not None:
+                options = convert_kwargs
+            else:
+                options = load_yaml_from_file(os.path.join(self.directory, 'settings.yaml')) or {}
+                options = {'use_gitignore': options.get('USE_GITIGNORE'), 'follow_symlinks': options.get('FOLLOW_SYMLINKS')}
+            return {key: options.get(key) is True for key in ('use_gitignore', 'follow_symlinks')}
+
+        _watch(
+            self.directory,
+            build,
+            serve=serve,
+            port=port,
+            open_browser=open_browser,
+            poll_interval=poll_interval,
+            debounce=debounce,
+            stop_event=stop_event,
+            scan_options=scan_options
         )
 
 def convert_app(
@@ -317,15 +925,33 @@ def convert_app(
     extra_files: Optional[list] = None,
     stlite_version: Optional[str] = None,
     pyodide_version: Optional[str] = None,
-    packages: Optional[Dict[str, str]] = None
-) -> None:
+    packages: Optional[Dict[str, str]] = None,
+    compress_assets: bool = False,
+    external_asset_threshold: Optional[int] = None,
+    embed_mode: str = 'inline',
+    bundle_hash: bool = False,
+    use_gitignore: bool = False,
+    follow_symlinks: bool = False,
+    size_report: bool = False,
+    size_budget_total: Optional[int] = None,
+    size_budget_per_file: Optional[int] = None,
+    size_budget_action: str = 'warn',
+    wheelhouse: Optional[str] = None,
+    pyodide_lock: Optional[str] = None,
+    package_index: Optional[str] = None,
+    resolve_action: str = 'warn',
+    prune_requirements: bool = False,
+    discovery_mode: str = 'all',
+    on_stage: Optional[StageCallback] = None
+) -> BuildResult:
     """
     Shortcut function to convert a Streamlit app in one step.
 
     Parameters
     ----------
     directory : str
-        The root directory of the Streamlit application.
+        The root directory of the Streamlit application, or a zip or tar archive
+        of it (read without extracting; the HTML is written next to the archive).
     app_name : str
         The name of the application.
     entrypoint : str
@@ -344,9 +970,61 @@ def convert_app(
         The specific version of Pyodide to use.
     packages : Optional[Dict[str, str]], optional
         Package version overrides.
+    compress_assets : bool, optional
+        Whether to deflate non-Python assets and inflate them in the browser. Default False.
+    external_asset_threshold : Optional[int], optional
+        If set, non-Python assets of at least this many bytes are written next to the
+        HTML under content-hashed names and fetched by URL. Default None (embed everything).
+    embed_mode : str, optional
+        'inline' (default) embeds file payloads in the module script; 'blocks' embeds them
+        in non-executable <script> blocks that are read when the app is mounted.
+    bundle_hash : bool, optional
+        Whether to write the SHA-256 of the HTML to ``<app name>.html.sha256``. Default False.
+    use_gitignore : bool, optional
+        Whether auto-discovery also skips files matched by ``.gitignore`` files
+        (``.s2signore`` files are always applied). Default False.
+    follow_symlinks : bool, optional
+        Whether auto-discovery descends into symlinked directories. Symlinks that
+        loop back to a parent directory are skipped. Default False.
+    size_report : bool, optional
+        Whether to write a JSON size report to ``<app name>.html.size.json``. Default False.
+    size_budget_total : Optional[int], optional
+        Budget in bytes for the HTML plus any external assets. Default None (no limit).
+    size_budget_per_file : Optional[int], optional
+        Budget in bytes for the output of any single file. Default None (no limit).
+    size_budget_action : str, optional
+        'warn' (default) prints a warning when a budget is exceeded; 'fail' raises a
+        RuntimeError once the HTML and size report have been written.
+    wheelhouse : Optional[str], optional
+        Directory of local wheels (relative to the project directory). Requirements a
+        pure-Python wheel there satisfies are embedded and installed from the bundle
+        instead of downloaded; their own dependencies are still resolved by micropip.
+        Default None.
+    pyodide_lock : Optional[str], optional
+        A ``pyodide-lock.json`` file, or a directory of them per Pyodide version (relative
+        to the project directory). If set, requirements are pinned at build time to the
+        versions it lists. Default None (requirements are resolved in the browser).
+    package_index : Optional[str], optional
+        Directory of wheels used to pin requirements the lock file does not provide. Default None.
+    resolve_action : str, optional
+        'warn' (default) prints a warning for requirements that cannot be resolved; 'fail'
+        raises a ValueError.
+    prune_requirements : bool, optional
+        Whether to drop requirements that no bundled .py file imports (they are only
+        reported by default). Default False.
+    discovery_mode : str, optional
+        'all' (default) bundles every discovered file; 'reachable' bundles only the files
+        reachable from the entrypoint and pages through imports and literal file paths.
+    on_stage : Optional[StageCallback], optional
+        Function called with the `StageTiming` of each build stage as it finishes.
+
+    Returns
+    -------
+    BuildResult
+        The output path, per-stage timings, sizes and cache statistics.
     """
     converter = Script2StliteConverter(directory=directory)
-    converter.convert_from_entrypoint(
+    return converter.convert_from_entrypoint(
         app_name=app_name,
         entrypoint=entrypoint,
         config=config,
@@ -355,5 +1033,22 @@ def convert_app(
         extra_files=extra_files,
         stlite_version=stlite_version,
         pyodide_version=pyodide_version,
-        packages=packages
+        packages=packages,
+        compress_assets=compress_assets,
+        external_asset_threshold=external_asset_threshold,
+        embed_mode=embed_mode,
+        bundle_hash=bundle_hash,
+        use_gitignore=use_gitignore,
+        follow_symlinks=follow_symlinks,
+        size_report=size_report,
+        size_budget_total=size_budget_total,
+        size_budget_per_file=size_budget_per_file,
+        size_budget_action=size_budget_action,
+        wheelhouse=wheelhouse,
+        pyodide_lock=pyodide_lock,
+        package_index=package_index,
+        resolve_action=resolve_action,
+        prune_requirements=prune_requirements,
+        discovery_mode=discovery_mode,
+        on_stage=on_stage
     )
\ No newline at end of file
@@ -0,0 +1,240 @@
+"""
+Bundle size report and size budgets.
+
+While the HTML is generated, a `SizeRecorder` counts the output bytes produced
+for every app file. After the build, `build_size_report` combines these counts
+with the source file sizes into a JSON-serializable report: bytes per file
+before and after encoding, each file's share of the total download, how the
+file got into the bundle (entrypoint, APP_FILES or auto-discovery) and how it
+is shipped (inline, in a ``<script>`` block, as an external asset, or shared
+with an identical file). `check_size_budget` compares the report with total and
+per-file budgets; the build warns or fails when one is exceeded.
+"""
+import json
+import os
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Union
+
+from .sources import AppSource, as_app_source
+
+SIZE_REPORT_SUFFIX = '.size.json'
+SIZE_REPORT_VERSION = 1
+BUDGET_ACTIONS = ('warn', 'fail')
+
+# How a file was included in the bundle.
+INCLUDED_BY_ENTRYPOINT = 'APP_ENTRYPOINT'
+INCLUDED_BY_APP_FILES = 'APP_FILES'
+INCLUDED_BY_DISCOVERY = 'auto-discovery'
+INCLUDED_BY_WHEELHOUSE = 'WHEELHOUSE'
+
+
+def utf8_length(text: str) -> int:
+    """Return the number of bytes `text` takes up in UTF-8."""
+    return len(text) if text.isascii() else len(text.encode('utf-8'))
+
+
+class SizeRecorder:
+    """
+    Collects, while the HTML is generated, how the app files end up in the output.
+
+    Attributes
+    ----------
+    encoded : Dict[str, int]
+        Output bytes written to the HTML for each file (its entry in ``files``,
+        and its payload, block or blob table entry).
+    duplicates : Dict[str, str]
+        Files sharing the payload of an identical file, mapped to that file.
+    external : Dict[str, str]
+        Files written next to the HTML (split-output mode), mapped to their URL.
+    embed_mode : str
+        The EMBED_MODE used for the build.
+    encode_seconds, encode_cpu_seconds : float
+        Wall and CPU time spent producing the counted chunks (reading and
+        encoding files), excluding the time the consumer spends writing them.
+    """
+    def __init__(self):
+        self.encoded: Dict[str, int] = {}
+        self.duplicates: Dict[str, str] = {}
+        self.external: Dict[str, str] = {}
+        self.embed_mode = 'inline'
+        self.encode_seconds = 0.0
+        self.encode_cpu_seconds = 0.0
+
+    def count(self, file_j: str, chunks: Iterable[str]) -> Iterator[str]:
+        """
+        Yield `chunks` unchanged, adding their UTF-8 size to the output bytes of `file_j`.
+
+        Parameters
+        ----------
+        file_j : str
+            The app file (relative path) the chunks belong to.
+        chunks : Iterable[str]
+            Output chunks.
+
+        Yields
+        ------
+        str
+            The chunks.
+        """
+        total = 0
+        wall, cpu = time.perf_counter(), time.process_time()
+        for chunk in chunks:
+            self.encode_seconds += time.perf_counter() - wall
+            self.encode_cpu_seconds += time.process_time() - cpu
+            total += utf8_length(chunk)
+            yield chunk
+            wall, cpu = time.perf_counter(), time.process_time()
+        self.encode_seconds += time.perf_counter() - wall
+        self.encode_cpu_seconds += time.process_time() - cpu
+        self.encoded[file_j] = self.encoded.get(file_j, 0) + total
+
+
+def validate_size_budget(total: Optional[int], per_file: Optional[int], action: Optional[str]) -> None:
+    """
+    Check the size budget settings.
+
+    Parameters
+    ----------
+    total : Optional[int]
+        Budget for the total download (HTML plus external assets), in bytes.
+    per_file : Optional[int]
+        Budget for the output bytes of any single file, in bytes.
+    action : Optional[str]
+        'warn' or 'fail' (None means 'warn').
+
+    Raises
+    ------
+    ValueError
+        If a budget is not a non-negative number of bytes, or the action is unknown.
+    """
+    for name, value in (('SIZE_BUDGET_TOTAL', total), ('SIZE_BUDGET_PER_FILE', per_file)):
+        if value is not None and (isinstance(value, bool) or not isinstance(value, int) or value < 0):
+            raise ValueError(f"{name} must be a non-negative number of bytes: {value}")
+    if action is not None and action not in BUDGET_ACTIONS:
+        raise ValueError(f"SIZE_BUDGET_ACTION must be one of {list(BUDGET_ACTIONS)}: {action}")
+
+
+def build_size_report(directory: Union[str, AppSource], html_path: str, entrypoint: str, app_files: List[str],
+                      recorder: SizeRecorder, included_by: Mapping[str, str],
+                      external_paths: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    Build the size report of a finished bundle.
+
+    Parameters
+    ----------
+    directory : Union[str, AppSource]
+        The root directory of the application, or the `AppSource` the files were read from.
+    html_path : str
+        The generated HTML file.
+    entrypoint : str
+        The app entrypoint (relative path).
+    app_files : List[str]
+        The other bundled files (relative paths).
+    recorder : SizeRecorder
+        The recorder passed to `write_html` for this build.
+    included_by : Mapping[str, str]
+        How each file was included (see the ``INCLUDED_BY_*`` constants).
+        Files not listed are reported as auto-discovered.
+    external_paths : Optional[List[str]], optional
+        The external asset files written next to the HTML.
+
+    Returns
+    -------
+    Dict[str, Any]
+        The report. ``files`` is sorted by path; ``share`` is the fraction of
+        ``total_bytes`` (HTML plus external assets) attributable to the file.
+    """
+    html_bytes = os.path.getsize(html_path)
+    external_bytes = sum(os.path.getsize(p) for p in external_paths or [])
+    total_bytes = html_bytes + external_bytes
+
+    source = as_app_source(directory)
+    files = []
+    for file_j in [entrypoint] + list(app_files):
+        source_bytes = source.size(file_j)
+        encoded_bytes = recorder.encoded.get(file_j, 0)
+        if file_j in recorder.external:
+            embedding = 'external'
+            encoded_bytes += source_bytes  # the asset file is copied as is
+        elif file_j in recorder.duplicates:
+            embedding = 'shared'
+        else:
+            embedding = recorder.embed_mode
+        entry: Dict[str, Any] = {
+            'path': file_j.replace(os.sep, '/'),
+            'source_bytes': source_bytes,
+            'encoded_bytes': encoded_bytes,
+            'share': round(encoded_bytes / total_bytes, 6) if total_bytes else 0.0,
+            'included_by': included_by.get(file_j, INCLUDED_BY_DISCOVERY),
+            'embedding': embedding,
+        }
+        if file_j in recorder.duplicates:
+            entry['duplicate_of'] = recorder.duplicates[file_j].replace(os.sep, '/')
+        files.append(entry)
+    files.sort(key=lambda entry: entry['path'])
+
+    embedded_bytes = sum(recorder.encoded.values())
+    return {
+        'version': SIZE_REPORT_VERSION,
+        'html': os.path.basename(html_path),
+        'html_bytes': html_bytes,
+        'external_bytes': external_bytes,
+        'total_bytes': total_bytes,
+        'source_bytes': sum(entry['source_bytes'] for entry in files),
+        'template_bytes': html_bytes - embedded_bytes,
+        'dedup_saved_bytes': sum(entry['source_bytes'] for entry in files if 'duplicate_of' in entry),
+        'files': files,
+    }
+
+
+def check_size_budget(report: Dict[str, Any], total: Optional[int] = None, per_file: Optional[int] = None,
+                      action: Optional[str] = None) -> List[str]:
+    """
+    Compare a size report with the budgets, and record the outcome in the report.
+
+    Parameters
+    ----------
+    report : Dict[str, Any]
+        A report from `build_size_report`. A ``budget`` section is added to it.
+    total : Optional[int], optional
+        Budget for ``total_bytes``. None means no limit.
+    per_file : Optional[int], optional
+        Budget for the ``encoded_bytes`` of each file. None means no limit.
+    action : Optional[str], optional
+        'warn' (default) or 'fail'. Only recorded in the report: a warning is
+        printed for each exceeded budget either way, and failing the build is
+        left to the caller (so the report can be written first).
+
+    Returns
+    -------
+    List[str]
+        A description of each exceeded budget.
+    """
+    violations = []
+    if total is not None and report['total_bytes'] > total:
+        violations.append(f"total size {report['total_bytes']:,} bytes exceeds the budget of {total:,} bytes")
+    if per_file is not None:
+        for entry in report['files']:
+            if entry['encoded_bytes'] > per_file:
+                violations.append(f"{entry['path']} takes {entry['encoded_bytes']:,} bytes, "
+                                  f"over the per-file budget of {per_file:,} bytes")
+    report['budget'] = {'total': total, 'per_file': per_file, 'action': action or 'warn', 'violations': violations}
+    for violation in violations:
+        print(f"Warning: size budget exceeded: {violation}")
+    return violations
+
+
+def write_size_report(path: str, report: Dict[str, Any]) -> None:
+    """
+    Write a size report as JSON (sorted keys, so reports of unchanged apps are identical).
+
+    Parameters
+    ----------
+    path : str
+        The JSON file to write.
+    report : Dict[str, Any]
+        The report.
+    """
+    with open(path, 'w', encoding='utf-8', newline='\n') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+        f.write('\n')
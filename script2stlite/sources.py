@@ -0,0 +1,490 @@
+"""
+Read-only access to an app's files, wherever they are stored.
+
+The HTML generator reads app files through an `AppSource`:
+
+* `DirectorySource` - a project directory on disk (what the file-based API uses).
+* `MappingSource`   - an in-memory mapping of relative path to bytes (or text).
+* `ZipSource`       - a zip archive, given as a path, bytes or a binary file object.
+* `TarSource`       - a tar archive (optionally gzip, bzip2 or xz compressed), given the same way.
+
+Archives are never extracted: discovery runs against the archive index, and
+members are decompressed on demand through `AppSource.open`, so large files are
+streamed into the encoders rather than loaded as a whole or written to disk.
+Paths are relative to the app root and use ``os.sep`` as separator, like the
+paths returned by discovery. `open_source` picks the right source for a
+directory, archive or mapping.
+"""
+import hashlib
+import io
+import json
+import os
+import tarfile
+import zipfile
+from typing import Any, BinaryIO, Dict, List, Mapping, Optional, Set, Union
+
+from .build_cache import HASH_READ_SIZE, file_sha256
+from .discovery import MANIFEST_FILENAME, filter_paths, load_build_manifest, scan_tree
+
+# Anything `open_source` accepts.
+SourceLike = Union[str, os.PathLike, bytes, BinaryIO, Mapping[str, Union[bytes, str]], 'AppSource']
+
+
+def normalize_member_path(path: str) -> str:
+    """
+    Turn a '/'- or os.sep-separated member name into a safe relative path using os.sep.
+
+    Parameters
+    ----------
+    path : str
+        The member name (e.g. ``'pages/1_plot.py'`` or ``'./data.csv'``).
+
+    Returns
+    -------
+    str
+        The normalized relative path.
+
+    Raises
+    ------
+    ValueError
+        If the path is empty, absolute or escapes the app root (``..``).
+    """
+    posix = path.replace('\\', '/').replace(os.sep, '/')
+    if posix.startswith('/') or (len(posix) > 1 and posix[1] == ':'):
+        raise ValueError(f"App file paths must be relative: {path}")
+    parts = [part for part in posix.split('/') if part not in ('', '.')]
+    if not parts or '..' in parts:
+        raise ValueError(f"Invalid app file path: {path}")
+    return os.sep.join(parts)
+
+
+def _strip_common_folder(members: Dict[str, Any]) -> Dict[str, Any]:
+    """If every member lives under one top-level folder, make the paths relative to that folder."""
+    prefixes = {path.split(os.sep, 1)[0] for path in members}
+    if len(prefixes) == 1 and all(os.sep in path for path in members):
+        strip = len(prefixes.pop()) + 1
+        return {path[strip:]: member for path, member in members.items()}
+    return members
+
+
+class AppSource:
+    """
+    Base class for the places app files are read from.
+
+    Subclasses implement `paths`, `size` and `open`; everything else is derived.
+    """
+    # Directory on disk holding the files, if any (enables memory-mapped reads,
+    # split output and the build cache).
+    root: Optional[str] = None
+
+    def __enter__(self) -> 'AppSource':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Release any resources held by the source (e.g. an open archive)."""
+
+    def paths(self) -> List[str]:
+        """Return every file in the source (relative paths), before ignore rules."""
+        raise NotImplementedError
+
+    def size(self, rel_path: str) -> int:
+        """Return the size in bytes of a file."""
+        raise NotImplementedError
+
+    def open(self, rel_path: str) -> BinaryIO:
+        """Open a file for binary reading. Raises FileNotFoundError if it does not exist."""
+        raise NotImplementedError
+
+    def exists(self, rel_path: str) -> bool:
+        """Return True if `rel_path` is a file in the source."""
+        try:
+            self.size(rel_path)
+        except (FileNotFoundError, ValueError):
+            return False
+        return True
+
+    def local_path(self, rel_path: str) -> Optional[str]:
+        """Return the path of the file on disk, or None if it is not stored on disk."""
+        return None
+
+    def read_bytes(self, rel_path: str) -> bytes:
+        """Return the content of a file."""
+        with self.open(rel_path) as f:
+            return f.read()
+
+    def read_text(self, rel_path: str) -> str:
+        """Return the content of a UTF-8 text file, with line endings normalized to ``\\n``."""
+        text = self.read_bytes(rel_path).decode('utf-8')
+        return text.replace('\r\n', '\n').replace('\r', '\n')
+
+    def sha256(self, rel_path: str) -> str:
+        """Return the hex SHA-256 of a file's content, read in blocks."""
+        digest = hashlib.sha256()
+        with self.open(rel_path) as f:
+            for block in iter(lambda: f.read(HASH_READ_SIZE), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def discover(self, exclude_paths: Optional[Set[str]] = None, use_gitignore: bool = False,
+                 follow_symlinks: bool = False) -> List[str]:
+        """
+        Return the files auto-discovery would bundle, applying the default ignore
+        lists and ``.s2signore`` (optionally ``.gitignore``) patterns.
+
+        Parameters
+        ----------
+        exclude_paths : Optional[Set[str]], optional
+            Relative paths to leave out.
+        use_gitignore : bool, optional
+            Whether to also apply ``.gitignore`` files. Default False.
+        follow_symlinks : bool, optional
+            Whether to descend into symlinked directories (only directory sources
+            have any). Default False.
+
+        Returns
+        -------
+        List[str]
+            Relative file paths, sorted.
+        """
+        return sorted(filter_paths(self.paths(), self.read_text, exclude_paths=exclude_paths,
+                                   use_gitignore=use_gitignore))
+
+    def recorded_outputs(self) -> Set[str]:
+        """Return the build outputs listed in the app's build manifest (see `discovery.load_build_manifest`)."""
+        if not self.exists(MANIFEST_FILENAME):
+            return set()
+        try:
+            return {str(o) for o in json.loads(self.read_text(MANIFEST_FILENAME)).get('outputs', [])}
+        except (ValueError, AttributeError):
+            return set()
+
+
+class DirectorySource(AppSource):
+    """
+    App files in a directory on disk.
+
+    Parameters
+    ----------
+    root : str
+        The root directory of the application.
+    """
+    def __init__(self, root: str):
+        self.root = root
+
+    def paths(self) -> List[str]:
+        return sorted(scan_tree(self.root, ignore_dirs=set(), ignore_files=set()))
+
+    def size(self, rel_path: str) -> int:
+        path = os.path.join(self.root, rel_path)
+        if not os.path.isfile(path):
+            raise FileNotFoundError(f"File not found: {path}")
+        return os.path.getsize(path)
+
+    def open(self, rel_path: str) -> BinaryIO:
+        return open(os.path.join(self.root, rel_path), 'rb')
+
+    def exists(self, rel_path: str) -> bool:
+        return os.path.isfile(os.path.join(self.root, rel_path))
+
+    def local_path(self, rel_path: str) -> Optional[str]:
+        return os.path.join(self.root, rel_path)
+
+    def read_text(self, rel_path: str) -> str:
+        with open(os.path.join(self.root, rel_path), 'r', encoding='utf-8') as f:
+            return f.read()
+
+    def sha256(self, rel_path: str) -> str:
+        return file_sha256(os.path.join(self.root, rel_path))
+
+    def discover(self, exclude_paths: Optional[Set[str]] = None, use_gitignore: bool = False,
+                 follow_symlinks: bool = False) -> List[str]:
+        return sorted(scan_tree(self.root, exclude_paths=exclude_paths, use_gitignore=use_gitignore,
+                                follow_symlinks=follow_symlinks))
+
+    def recorded_outputs(self) -> Set[str]:
+        return load_build_manifest(self.root)
+
+
+class MappingSource(AppSource):
+    """
+    App files held in memory.
+
+    Parameters
+    ----------
+    files : Mapping[str, Union[bytes, str]]
+        Mapping of relative path ('/' or os.sep separated) to file content.
+        Text content is encoded as UTF-8.
+
+    Raises
+    ------
+    ValueError
+        If a path is absolute or escapes the app root.
+    """
+    def __init__(self, files: Mapping[str, Union[bytes, str]]):
+        self._files: Dict[str, bytes] = {}
+        for path, content in files.items():
+            self._files[normalize_member_path(path)] = content.encode('utf-8') if isinstance(content, str) else bytes(content)
+
+    def paths(self) -> List[str]:
+        return sorted(self._files)
+
+    def size(self, rel_path: str) -> int:
+        return len(self._content(rel_path))
+
+    def open(self, rel_path: str) -> BinaryIO:
+        return io.BytesIO(self._content(rel_path))
+
+    def read_bytes(self, rel_path: str) -> bytes:
+        return self._content(rel_path)
+
+    def _content(self, rel_path: str) -> bytes:
+        try:
+            return self._files[normalize_member_path(rel_path)]
+        except KeyError:
+            raise FileNotFoundError(f"File not found in app files: {rel_path}") from None
+
+
+class ZipSource(AppSource):
+    """
+    App files in a zip archive, decompressed on demand.
+
+    If every member lives under a single top-level folder (as in archives
+    downloaded from code hosting sites), that folder is treated as the app root.
+
+    Parameters
+    ----------
+    archive : Union[str, os.PathLike, bytes, BinaryIO]
+        Path of the archive, its content, or a seekable binary file object.
+
+    Raises
+    ------
+    ValueError
+        If the archive is not a valid zip file or contains unsafe member paths.
+    """
+    def __init__(self, archive: Union[str, os.PathLike, bytes, BinaryIO]):
+        if isinstance(archive, (bytes, bytearray, memoryview)):
+            archive = io.BytesIO(bytes(archive))
+        try:
+            self._zip = zipfile.ZipFile(archive)
+        except zipfile.BadZipFile as e:
+            raise ValueError(f"Not a valid zip archive: {e}") from e
+        members = {normalize_member_path(info.filename): info for info in self._zip.infolist() if not info.is_dir()}
+        self._members: Dict[str, zipfile.ZipInfo] = _strip_common_folder(members)
+
+    def close(self) -> None:
+        """Close the archive."""
+        self._zip.close()
+
+    def paths(self) -> List[str]:
+        return sorted(self._members)
+
+    def size(self, rel_path: str) -> int:
+        return self._member(rel_path).file_size
+
+    def open(self, rel_path: str) -> BinaryIO:
+        return self._zip.open(self._member(rel_path))
+
+    def _member(self, rel_path: str) -> zipfile.ZipInfo:
+        try:
+            return self._members[normalize_member_path(rel_path)]
+        except KeyError:
+            raise FileNotFoundError(f"File not found in archive: {rel_path}") from None
+
+
+class TarSource(AppSource):
+    """
+    App files in a tar archive (plain, gzip, bzip2 or xz), decompressed on demand.
+
+    Only regular files are used; links and special files are skipped. As for
+    `ZipSource`, a single top-level folder is treated as the app root. Reading
+    a member of a compressed archive may decompress the archive up to that
+    member, so tar archives are best kept uncompressed or small; zip archives
+    allow direct access to every member.
+
+    Parameters
+    ----------
+    archive : Union[str, os.PathLike, bytes, BinaryIO]
+        Path of the archive, its content, or a seekable binary file object.
+
+    Raises
+    ------
+    ValueError
+        If the archive is not a valid tar file or contains unsafe member paths.
+    """
+    def __init__(self, archive: Union[str, os.PathLike, bytes, BinaryIO]):
+        if isinstance(archive, (bytes, bytearray, memoryview)):
+            archive = io.BytesIO(bytes(archive))
+        try:
+            if isinstance(archive, (str, os.PathLike)):
+                self._tar = tarfile.open(name=os.fspath(archive), mode='r:*')
+            else:
+                self._tar = tarfile.open(fileobj=archive, mode='r:*')
+        except tarfile.TarError as e:
+            raise ValueError(f"Not a valid tar archive: {e}") from e
+        members = {normalize_member_path(member.name): member for member in self._tar.getmembers() if member.isfile()}
+        self._members: Dict[str, tarfile.TarInfo] = _strip_common_folder(members)
+
+    def close(self) -> None:
+        """Close the archive."""
+        self._tar.close()
+
+    def paths(self) -> List[str]:
+        return sorted(self._members)
+
+    def size(self, rel_path: str) -> int:
+        return self._member(rel_path).size
+
+    def open(self, rel_path: str) -> BinaryIO:
+        return self._tar.extractfile(self._member(rel_path))
+
+    def _member(self, rel_path: str) -> tarfile.TarInfo:
+        try:
+            return self._members[normalize_member_path(rel_path)]
+        except KeyError:
+            raise FileNotFoundError(f"File not found in archive: {rel_path}") from None
+
+
+def as_app_source(directory: Union[str, AppSource]) -> AppSource:
+    """Return `directory` as an `AppSource` (a plain string is a directory on disk)."""
+    return directory if isinstance(directory, AppSource) else DirectorySource(directory)
+
+
+class OverlaySource(AppSource):
+    """
+    An `AppSource` plus extra files from disk (e.g. embedded wheels), placed at given bundle paths.
+
+    The extra files are not returned by `discover`; the caller adds them to the
+    bundle explicitly.
+
+    Parameters
+    ----------
+    base : AppSource
+        The app's own files.
+    extra : Mapping[str, str]
+        Mapping of relative path in the bundle to the file on disk.
+    """
+    def __init__(self, base: AppSource, extra: Mapping[str, str]):
+        self.base = base
+        self.root = base.root
+        self.extra = {normalize_member_path(rel_path): path for rel_path, path in extra.items()}
+
+    def close(self) -> None:
+        self.base.close()
+
+    def paths(self) -> List[str]:
+        return sorted(set(self.base.paths()) | set(self.extra))
+
+    def size(self, rel_path: str) -> int:
+        path = self._extra_path(rel_path)
+        return os.path.getsize(path) if path is not None else self.base.size(rel_path)
+
+    def open(self, rel_path: str) -> BinaryIO:
+        path = self._extra_path(rel_path)
+        return open(path, 'rb') if path is not None else self.base.open(rel_path)
+
+    def exists(self, rel_path: str) -> bool:
+        return self._extra_path(rel_path) is not None or self.base.exists(rel_path)
+
+    def local_path(self, rel_path: str) -> Optional[str]:
+        path = self._extra_path(rel_path)
+        return path if path is not None else self.base.local_path(rel_path)
+
+    def read_text(self, rel_path: str) -> str:
+        return super().read_text(rel_path) if self._extra_path(rel_path) is not None else self.base.read_text(rel_path)
+
+    def sha256(self, rel_path: str) -> str:
+        path = self._extra_path(rel_path)
+        return file_sha256(path) if path is not None else self.base.sha256(rel_path)
+
+    def discover(self, exclude_paths: Optional[Set[str]] = None, use_gitignore: bool = False,
+                 follow_symlinks: bool = False) -> List[str]:
+        return self.base.discover(exclude_paths=exclude_paths, use_gitignore=use_gitignore,
+                                  follow_symlinks=follow_symlinks)
+
+    def recorded_outputs(self) -> Set[str]:
+        return self.base.recorded_outputs()
+
+    def _extra_path(self, rel_path: str) -> Optional[str]:
+        try:
+            return self.extra.get(normalize_member_path(rel_path))
+        except ValueError:
+            return None
+
+
+def is_archive(path: Union[str, os.PathLike]) -> bool:
+    """Return True if `path` is a zip or tar archive file."""
+    return os.path.isfile(path) and (zipfile.is_zipfile(path) or tarfile.is_tarfile(path))
+
+
+def open_archive(archive: Union[str, os.PathLike, bytes, BinaryIO]) -> AppSource:
+    """
+    Return a `ZipSource` or `TarSource` for an archive, detected from its content.
+
+    Parameters
+    ----------
+    archive : Union[str, os.PathLike, bytes, BinaryIO]
+        Path of the archive, its content, or a seekable binary file object.
+
+    Returns
+    -------
+    AppSource
+        The archive source.
+
+    Raises
+    ------
+    ValueError
+        If `archive` is neither a zip nor a tar archive.
+    """
+    if isinstance(archive, (bytes, bytearray, memoryview)):
+        archive = io.BytesIO(bytes(archive))
+    if zipfile.is_zipfile(archive):
+        return ZipSource(archive)
+    if isinstance(archive, (str, os.PathLike)):
+        if tarfile.is_tarfile(archive):
+            return TarSource(archive)
+    else:
+        archive.seek(0)
+        if tarfile.is_tarfile(archive):
+            archive.seek(0)
+            return TarSource(archive)
+    raise ValueError("Not a valid zip or tar archive.")
+
+
+def open_source(source: SourceLike) -> AppSource:
+    """
+    Return an `AppSource` for a directory, a zip archive or a mapping of files.
+
+    Parameters
+    ----------
+    source : SourceLike
+        A directory path, the path of a zip or tar archive, the bytes of an
+        archive, a seekable binary file object holding one, a mapping of
+        relative path to content, or an `AppSource`.
+
+    Returns
+    -------
+    AppSource
+        The matching source.
+
+    Raises
+    ------
+    ValueError
+        If `source` is none of the above.
+    """
+    if isinstance(source, AppSource):
+        return source
+    if isinstance(source, Mapping):
+        return MappingSource(source)
+    if isinstance(source, (bytes, bytearray, memoryview)) or hasattr(source, 'read'):
+        return open_archive(source)
+    if isinstance(source, (str, os.PathLike)):
+        path = os.fspath(source)
+        if os.path.isdir(path):
+            return DirectorySource(path)
+        if is_archive(path):
+            return open_archive(path)
+        raise ValueError(f"* {path} is neither a directory nor a zip or tar archive.")
+    raise ValueError(f"Unsupported app source: {type(source).__name__}")
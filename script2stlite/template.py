@@ -0,0 +1,172 @@
+"""
+Single-pass renderer for the stlite HTML template.
+
+The template is split once into literal text and ``|PLACEHOLDER|`` segments.
+Rendering walks the segments a single time and joins the literals with the
+substituted values, so substituted content (user code, base64 assets) is never
+scanned again. This makes rendering linear in the output size and guarantees
+that placeholder-like text inside user files (e.g. ``|CONFIG|``) is left alone.
+
+Values may be plain strings or iterables of string chunks. Iterables are
+consumed lazily, which lets `render_template_to` stream large bundles straight
+to a file without holding the whole document in memory.
+"""
+import re
+from functools import lru_cache
+from typing import IO, Iterable, Iterator, Mapping, Tuple, Union
+
+PLACEHOLDER_PATTERN = re.compile(r'\|[A-Z][A-Z0-9_]*\|')
+
+# A parsed template is a tuple of (text, is_placeholder) pairs.
+Segments = Tuple[Tuple[str, bool], ...]
+# A placeholder value is either text or an iterable yielding text chunks (consumed once).
+TemplateValue = Union[str, Iterable[str]]
+
+
+@lru_cache(maxsize=16)
+def parse_template(text: str) -> Segments:
+    """
+    Split template text into literal and placeholder segments.
+
+    Results are cached, so repeated conversions parse the template only once.
+
+    Parameters
+    ----------
+    text : str
+        The template text, containing placeholders such as ``|APP_NAME|``.
+
+    Returns
+    -------
+    Segments
+        A tuple of ``(text, is_placeholder)`` pairs. For placeholders, ``text``
+        is the full token including the surrounding ``|`` characters.
+    """
+    segments = []
+    position = 0
+    for match in PLACEHOLDER_PATTERN.finditer(text):
+        if match.start() > position:
+            segments.append((text[position:match.start()], False))
+        segments.append((match.group(0), True))
+        position = match.end()
+    if position < len(text):
+        segments.append((text[position:], False))
+    return tuple(segments)
+
+
+def template_placeholders(segments: Segments) -> Tuple[str, ...]:
+    """
+    Return the distinct placeholders used by a parsed template, in order of first use.
+
+    Parameters
+    ----------
+    segments : Segments
+        A template parsed with `parse_template`.
+
+    Returns
+    -------
+    Tuple[str, ...]
+        The placeholder tokens (e.g. ``'|APP_NAME|'``).
+    """
+    seen = []
+    for text, is_placeholder in segments:
+        if is_placeholder and text not in seen:
+            seen.append(text)
+    return tuple(seen)
+
+
+def iter_rendered(segments: Segments, values: Mapping[str, TemplateValue]) -> Iterator[str]:
+    """
+    Yield the rendered template as a sequence of text chunks.
+
+    All placeholders are checked for a value before the first chunk is yielded,
+    so a missing value never results in partially written output.
+
+    Parameters
+    ----------
+    segments : Segments
+        A template parsed with `parse_template`.
+    values : Mapping[str, TemplateValue]
+        Replacement for each placeholder token (e.g. ``{'|APP_NAME|': 'My App'}``).
+        Iterable values are consumed lazily, chunk by chunk. Values for
+        placeholders that do not appear in the template are ignored.
+
+    Yields
+    ------
+    str
+        Consecutive chunks of the rendered text.
+
+    Raises
+    ------
+    ValueError
+        If the template uses a placeholder with no value in `values`.
+    """
+    for text in template_placeholders(segments):
+        if text not in values:
+            raise ValueError(f"No value provided for template placeholder {text}")
+
+    for text, is_placeholder in segments:
+        if not is_placeholder:
+            yield text
+            continue
+        value = values[text]
+        if isinstance(value, str):
+            yield value
+        else:
+            yield from value
+
+
+def render_template(segments: Segments, values: Mapping[str, TemplateValue]) -> str:
+    """
+    Render a parsed template in one pass.
+
+    Parameters
+    ----------
+    segments : Segments
+        A template parsed with `parse_template`.
+    values : Mapping[str, TemplateValue]
+        Replacement for each placeholder token. See `iter_rendered`.
+
+    Returns
+    -------
+    str
+        The rendered text.
+
+    Raises
+    ------
+    ValueError
+        If the template uses a placeholder with no value in `values`.
+    """
+    return ''.join(iter_rendered(segments, values))
+
+
+def render_template_to(segments: Segments, values: Mapping[str, TemplateValue], stream: IO[str]) -> int:
+    """
+    Render a parsed template directly into a text stream.
+
+    Chunks are written as they are produced, so memory use is bounded by the
+    largest chunk rather than by the size of the rendered document.
+
+    Parameters
+    ----------
+    segments : Segments
+        A template parsed with `parse_template`.
+    values : Mapping[str, TemplateValue]
+        Replacement for each placeholder token. See `iter_rendered`.
+    stream : IO[str]
+        An open text stream (e.g. a file opened with ``'w'``).
+
+    Returns
+    -------
+    int
+        The number of characters written.
+
+    Raises
+    ------
+    ValueError
+        If the template uses a placeholder with no value in `values`.
+    """
+    written = 0
+    for chunk in iter_rendered(segments, values):
+        stream.write(chunk)
+        written += len(chunk)
+    return written
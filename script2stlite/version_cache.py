@@ -0,0 +1,251 @@
+"""
+Persistent on-disk cache for the stlite / Pyodide version indices.
+
+The version indices (``stylesheet.yaml``, ``js.yaml`` and ``pyodide.yaml``) are
+published on GitHub and change only when a new stlite or Pyodide release is
+added. Rather than downloading them on every conversion, they are stored in a
+user cache directory and revalidated with ``ETag`` / ``If-Modified-Since`` once
+the cached copy is older than the configured TTL. If the network is down or
+slow, the stale cached copy (or the snapshot shipped inside the package) is
+used instead, so a conversion never fails just because GitHub is unreachable.
+"""
+import hashlib
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import requests
+import yaml
+
+DEFAULT_VERSION_CACHE_TTL = 24 * 60 * 60  # seconds a cached index is trusted without revalidation
+FAILED_FETCH_RETRY_AFTER = 5 * 60  # seconds to wait before retrying the network after a failed fetch
+SNAPSHOT_SUBFOLDER = 'stlite_versions'
+
+
+def get_cache_dir() -> str:
+    """
+    Return the root directory used by script2stlite for persistent caches.
+
+    The location can be overridden with the ``S2S_CACHE_DIR`` environment
+    variable. Otherwise the platform's user cache directory is used
+    (``%LOCALAPPDATA%`` on Windows, ``~/Library/Caches`` on macOS and
+    ``$XDG_CACHE_HOME`` or ``~/.cache`` elsewhere).
+
+    Returns
+    -------
+    str
+        The absolute path to the script2stlite cache directory (it may not exist yet).
+    """
+    override = os.environ.get('S2S_CACHE_DIR')
+    if override:
+        return os.path.abspath(override)
+
+    if sys.platform.startswith('win'):
+        base = os.environ.get('LOCALAPPDATA') or os.path.expanduser('~')
+    elif sys.platform == 'darwin':
+        base = os.path.expanduser('~/Library/Caches')
+    else:
+        base = os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache')
+    return os.path.join(base, 'script2stlite')
+
+
+def _default_ttl() -> float:
+    """Return the version cache TTL, honouring the ``S2S_VERSION_CACHE_TTL`` environment variable."""
+    value = os.environ.get('S2S_VERSION_CACHE_TTL')
+    if value is None:
+        return DEFAULT_VERSION_CACHE_TTL
+    try:
+        return float(value)
+    except ValueError:
+        print(f"Warning: Ignoring invalid S2S_VERSION_CACHE_TTL value: {value}")
+        return DEFAULT_VERSION_CACHE_TTL
+
+
+def _is_offline() -> bool:
+    """Return True if the ``S2S_OFFLINE`` environment variable disables network access."""
+    return os.environ.get('S2S_OFFLINE', '').strip().lower() in ('1', 'true', 'yes')
+
+
+def _cache_paths(url: str, cache_dir: str) -> Tuple[str, str]:
+    """Return the (body, metadata) cache file paths for a version index URL."""
+    name = os.path.basename(url.rstrip('/')) or 'index.yaml'
+    digest = hashlib.sha1(url.encode('utf-8')).hexdigest()[:12]
+    base = os.path.join(cache_dir, 'versions', f'{digest}-{name}')
+    return base, base + '.meta.json'
+
+
+def _parse_index(text: str, source: str) -> Dict[str, Any]:
+    """Parse the text of a version index, raising the same errors as ``load_yaml_from_url``."""
+    try:
+        data: Any = yaml.safe_load(text)
+    except yaml.YAMLError as e:
+        raise RuntimeError(f"Failed to parse YAML content from {source}: {e}") from e
+
+    if not isinstance(data, dict):
+        raise ValueError("YAML content is not a dictionary (mapping type)")
+
+    return data
+
+
+def _read_cache(body_path: str, meta_path: str) -> Tuple[Optional[str], Dict[str, Any]]:
+    """Return the cached body (or None) and its metadata (or an empty dict)."""
+    body = None
+    meta: Dict[str, Any] = {}
+    try:
+        with open(body_path, 'r', encoding='utf-8') as f:
+            body = f.read()
+    except OSError:
+        pass
+    try:
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        pass
+    return body, meta
+
+
+def _write_atomic(path: str, content: str) -> None:
+    """Write text to ``path`` via a temporary file so readers never see a partial file."""
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+def _write_cache(body_path: str, meta_path: str, body: Optional[str], meta: Dict[str, Any]) -> None:
+    """Persist a cache entry. Failures are reported but never abort a conversion."""
+    try:
+        os.makedirs(os.path.dirname(body_path), exist_ok=True)
+        if body is not None:
+            _write_atomic(body_path, body)
+        _write_atomic(meta_path, json.dumps(meta))
+    except OSError as e:
+        print(f"Warning: Could not write version cache {body_path}: {e}")
+
+
+def load_snapshot(url: str) -> Optional[Dict[str, Any]]:
+    """
+    Load the version index snapshot shipped with the package for the given URL.
+
+    Parameters
+    ----------
+    url : str
+        The URL of the version index. Its file name (e.g. ``js.yaml``) selects the snapshot.
+
+    Returns
+    -------
+    Optional[Dict[str, Any]]
+        The parsed snapshot, or None if no snapshot with that name is shipped.
+    """
+    name = os.path.basename(url.rstrip('/'))
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), SNAPSHOT_SUBFOLDER, name)
+    if not name or not os.path.isfile(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return _parse_index(f.read(), path)
+
+
+def load_versions_yaml(
+    url: str,
+    timeout: float = 10,
+    ttl: Optional[float] = None,
+    cache_dir: Optional[str] = None,
+    session: Optional[requests.Session] = None
+) -> Dict[str, Any]:
+    """
+    Load a version index YAML file, using the persistent cache where possible.
+
+    Resolution order:
+
+    1. A cached copy younger than ``ttl`` is returned without any network call.
+    2. Otherwise the URL is fetched, sending ``If-None-Match`` / ``If-Modified-Since``
+       when a cached copy exists. A ``304 Not Modified`` response refreshes the
+       cached copy's age; a ``200`` response replaces it.
+    3. If the request fails (offline, DNS failure, timeout, bad content), the stale
+       cached copy is used, then the snapshot shipped with the package. Further
+       network attempts are skipped for a few minutes after a failure.
+
+    Setting the ``S2S_OFFLINE`` environment variable to ``1`` skips step 2 entirely.
+
+    Parameters
+    ----------
+    url : str
+        The URL pointing to the raw YAML version file.
+    timeout : float, optional
+        Timeout in seconds for the HTTP request (default is 10).
+    ttl : Optional[float], optional
+        Seconds a cached copy is used without revalidation. Defaults to the
+        ``S2S_VERSION_CACHE_TTL`` environment variable, or 24 hours.
+    cache_dir : Optional[str], optional
+        Root cache directory. Defaults to ``get_cache_dir()``.
+    session : Optional[requests.Session], optional
+        Session to issue the request with. If None, ``requests.get`` is used.
+
+    Returns
+    -------
+    Dict[str, Any]
+        The parsed contents of the YAML file.
+
+    Raises
+    ------
+    RuntimeError
+        If the index cannot be fetched and neither a cached copy nor a snapshot is available.
+    """
+    if ttl is None:
+        ttl = _default_ttl()
+    if cache_dir is None:
+        cache_dir = get_cache_dir()
+
+    body_path, meta_path = _cache_paths(url, cache_dir)
+    cached_body, meta = _read_cache(body_path, meta_path)
+    now = time.time()
+
+    if cached_body is not None and now - meta.get('fetched_at', 0) < ttl:
+        try:
+            return _parse_index(cached_body, body_path)
+        except (RuntimeError, ValueError):
+            cached_body = None  # corrupt cache entry, fall through to a fresh fetch
+
+    recently_failed = now - meta.get('failed_at', 0) < FAILED_FETCH_RETRY_AFTER
+    error: Optional[Exception] = None
+    if not _is_offline() and not recently_failed:
+        headers = {}
+        if cached_body is not None:
+            if meta.get('etag'):
+                headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                headers['If-Modified-Since'] = meta['last_modified']
+        try:
+            get = session.get if session is not None else requests.get
+            response = get(url, timeout=timeout, headers=headers)
+            if response.status_code == 304 and cached_body is not None:
+                meta['fetched_at'] = now
+                meta.pop('failed_at', None)
+                _write_cache(body_path, meta_path, None, meta)
+                return _parse_index(cached_body, body_path)
+            response.raise_for_status()
+            data = _parse_index(response.text, url)
+            _write_cache(body_path, meta_path, response.text, {
+                'url': url,
+                'fetched_at': now,
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+            })
+            return data
+        except (requests.exceptions.RequestException, RuntimeError, ValueError) as e:
+            error = e
+            meta['failed_at'] = now
+            _write_cache(body_path, meta_path, None, meta)
+
+    # Network unavailable (or skipped): fall back to stale cache, then the packaged snapshot.
+    if cached_body is not None:
+        try:
+            return _parse_index(cached_body, body_path)
+        except (RuntimeError, ValueError):
+            pass
+    snapshot = load_snapshot(url)
+    if snapshot is not None:
+        return snapshot
+    raise RuntimeError(f"Failed to fetch YAML file from {url} and no cached copy is available: {error}")
@@ -0,0 +1,281 @@
+"""
+Watch mode: rebuild an app when its files change and live-reload the browser.
+
+The project tree is polled with `scan_tree`, using the same ignore rules and
+symlink handling as the build's discovery (USE_GITIGNORE, FOLLOW_SYMLINKS).
+Bursts of saves are debounced into a single rebuild, and rebuilds reuse the
+version and asset caches, so only changed files are re-encoded. A small local
+HTTP server serves the generated HTML with a live-reload snippet injected; the
+page listens on a Server-Sent Events stream and reloads after every rebuild.
+"""
+import os
+import threading
+import time
+import webbrowser
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
+
+from .discovery import DEFAULT_IGNORE_FILES, load_build_manifest, scan_tree
+from .ignore import GITIGNORE_FILENAME, S2SIGNORE_FILENAME
+
+DEFAULT_POLL_INTERVAL = 0.2  # seconds between scans of the project tree
+DEFAULT_DEBOUNCE = 0.2       # seconds without further changes before a rebuild starts
+EVENTS_PATH = '/__s2s_events'
+RELOAD_SNIPPET = (
+    '<script>new EventSource("' + EVENTS_PATH + '").onmessage = () => location.reload();</script>'
+)
+
+# A snapshot maps relative file paths to (size, mtime_ns).
+Snapshot = Dict[str, Tuple[int, int]]
+
+
+def snapshot_tree(directory: str, use_gitignore: bool = False, follow_symlinks: bool = False) -> Snapshot:
+    """
+    Return the size and modification time of every file that would be bundled.
+
+    Build outputs recorded in the project's manifest are excluded, so writing
+    the bundle never triggers another rebuild. ``requirements.txt`` and the
+    ignore files in effect (``.s2signore``, and ``.gitignore`` with
+    `use_gitignore`) at any depth are not bundled but are included, since they
+    change the build.
+
+    Parameters
+    ----------
+    directory : str
+        The root directory of the application.
+    use_gitignore : bool, optional
+        Whether discovery applies ``.gitignore`` files (USE_GITIGNORE). Default False.
+    follow_symlinks : bool, optional
+        Whether discovery descends into symlinked directories (FOLLOW_SYMLINKS). Default False.
+
+    Returns
+    -------
+    Snapshot
+        Mapping of relative path to (size, mtime_ns).
+    """
+    ignore_filenames = {GITIGNORE_FILENAME, S2SIGNORE_FILENAME} if use_gitignore else {S2SIGNORE_FILENAME}
+    stats = scan_tree(directory, ignore_files=DEFAULT_IGNORE_FILES - ignore_filenames,
+                      exclude_paths=load_build_manifest(directory), use_gitignore=use_gitignore,
+                      follow_symlinks=follow_symlinks)
+    for rel_path in ('requirements.txt', S2SIGNORE_FILENAME):
+        try:
+            stats[rel_path] = os.stat(os.path.join(directory, rel_path))
+        except OSError:
+            continue  # not present
+    return {rel_path: (stat.st_size, stat.st_mtime_ns) for rel_path, stat in stats.items()}
+
+
+class _LiveReloadHandler(SimpleHTTPRequestHandler):
+    """Serves the project directory, injecting the live-reload snippet into HTML pages."""
+
+    def __init__(self, *args, server_state: 'LiveReloadServer', **kwargs):
+        self.server_state = server_state
+        super().__init__(*args, **kwargs)
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path == EVENTS_PATH:
+            self._stream_events()
+            return
+        if self.path in ('/', '/index.html') and self.server_state.page:
+            self.path = '/' + self.server_state.page
+        if self.path.split('?', 1)[0].endswith('.html'):
+            self._serve_html()
+            return
+        super().do_GET()
+
+    def _serve_html(self):
+        path = self.translate_path(self.path.split('?', 1)[0])
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                html = f.read()
+        except OSError:
+            self.send_error(404, "File not found")
+            return
+        if '</body>' in html:
+            html = html.replace('</body>', RELOAD_SNIPPET + '</body>', 1)
+        else:
+            html += RELOAD_SNIPPET
+        payload = html.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(payload)))
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _stream_events(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+        state = self.server_state
+        generation = state.generation
+        try:
+            self.wfile.write(b': connected\n\n')
+            self.wfile.flush()
+            while not state.stopped:
+                with state.condition:
+                    state.condition.wait_for(lambda: state.generation != generation or state.stopped, timeout=15)
+                if state.stopped:
+                    break
+                if state.generation != generation:
+                    generation = state.generation
+                    self.wfile.write(b'data: reload\n\n')
+                else:
+                    self.wfile.write(b': keep-alive\n\n')
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+class LiveReloadServer:
+    """
+    Local development server that serves a project directory with live reload.
+
+    Parameters
+    ----------
+    directory : str
+        The directory to serve (the app's project directory).
+    page : Optional[str], optional
+        The HTML file (relative to `directory`) served at ``/``.
+    host : str, optional
+        The interface to bind to (default is '127.0.0.1').
+    port : int, optional
+        The port to listen on. 0 picks a free port.
+    """
+    def __init__(self, directory: str, page: Optional[str] = None, host: str = '127.0.0.1', port: int = 8000):
+        self.page = page
+        self.generation = 0
+        self.stopped = False
+        self.condition = threading.Condition()
+        handler = partial(_LiveReloadHandler, directory=directory, server_state=self)
+        self._httpd = ThreadingHTTPServer((host, port), handler)
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """The base URL of the server."""
+        host, port = self._httpd.server_address[:2]
+        return f'http://{host}:{port}/'
+
+    def start(self) -> None:
+        """Start serving in a background thread."""
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+
+    def notify_reload(self) -> None:
+        """Tell every connected browser tab to reload."""
+        with self.condition:
+            self.generation += 1
+            self.condition.notify_all()
+
+    def stop(self) -> None:
+        """Stop the server and close open event streams."""
+        with self.condition:
+            self.stopped = True
+            self.condition.notify_all()
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+def watch(
+    directory: str,
+    build: Callable[[], str],
+    serve: bool = True,
+    host: str = '127.0.0.1',
+    port: int = 8000,
+    open_browser: bool = False,
+    poll_interval: float = DEFAULT_POLL_INTERVAL,
+    debounce: float = DEFAULT_DEBOUNCE,
+    stop_event: Optional[threading.Event] = None,
+    scan_options: Optional[Callable[[], Mapping[str, Any]]] = None
+) -> None:
+    """
+    Build an app, then rebuild it whenever its files change.
+
+    Parameters
+    ----------
+    directory : str
+        The root directory of the application.
+    build : Callable[[], str]
+        Function that converts the app and returns the output HTML file name
+        (relative to `directory`).
+    serve : bool, optional
+        If True (default), serve the app with live reload.
+    host : str, optional
+        The interface the dev server binds to (default is '127.0.0.1').
+    port : int, optional
+        The port the dev server listens on (default is 8000; 0 picks a free port).
+    open_browser : bool, optional
+        If True, open the served app in the default web browser.
+    poll_interval : float, optional
+        Seconds between scans of the project tree.
+    debounce : float, optional
+        Seconds without further changes before a rebuild starts.
+    stop_event : Optional[threading.Event], optional
+        Event that ends the watch loop when set. Without it, the loop runs
+        until interrupted (Ctrl+C).
+    scan_options : Optional[Callable[[], Mapping[str, Any]]], optional
+        Function returning the keyword arguments for `snapshot_tree`
+        (``use_gitignore``, ``follow_symlinks``) that match the build's
+        settings. It is called again after every rebuild.
+
+    Returns
+    -------
+    None
+    """
+    if stop_event is None:
+        stop_event = threading.Event()
+
+    def snapshot() -> Snapshot:
+        return snapshot_tree(directory, **options)
+
+    page = build()
+    options = dict(scan_options()) if scan_options is not None else {}
+    baseline = snapshot()
+
+    server = None
+    if serve:
+        server = LiveReloadServer(directory, page=page, host=host, port=port)
+        server.start()
+        print(f"* Serving {page} with live reload at {server.url}")
+        if open_browser:
+            webbrowser.open(server.url)
+    print(f"* Watching {directory} for changes. Press Ctrl+C to stop.")
+
+    last_change = None
+    try:
+        while not stop_event.wait(poll_interval):
+            current = snapshot()
+            if current != baseline:
+                baseline = current
+                last_change = time.monotonic()
+                continue
+            if last_change is None or time.monotonic() - last_change < debounce:
+                continue
+
+            last_change = None
+            started = time.perf_counter()
+            try:
+                page = build()
+            except Exception as e:
+                print(f"* Rebuild failed: {e}")
+                continue
+            print(f"* Rebuilt {page} in {time.perf_counter() - started:.2f}s.")
+            if scan_options is not None and dict(scan_options()) != options:
+                options = dict(scan_options())
+                baseline = snapshot()
+            if server is not None:
+                server.page = page
+                server.notify_reload()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if server is not None:
+            server.stop()
+        print("* Stopped watching.")
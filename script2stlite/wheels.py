@@ -0,0 +1,199 @@
+"""
+Embedding local wheels so micropip installs them from the bundle.
+
+With a WHEELHOUSE directory configured, every requirement that a pure-Python
+wheel in that directory satisfies is embedded in the bundle under
+``s2s_wheels/`` and rewritten to an ``emfs:`` path. stlite writes the app files
+to the in-browser file system before installing requirements, so micropip
+then installs the wheel from there instead of resolving and downloading it.
+The wheel's own dependencies are still resolved by micropip, from the network
+unless they are embedded or provided by Pyodide too. Requirements without a
+matching wheel, and requirements with extras (an ``emfs:`` path cannot carry
+them), are left for micropip as usual.
+"""
+import os
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from .requirements import allows_prereleases, is_prerelease, normalize_name, parse_requirement, version_key, version_matches
+
+WHEELS_BUNDLE_DIR = 's2s_wheels'
+# stlite's working directory: relative app file paths are written below it.
+STLITE_HOME = '/home/pyodide'
+
+
+class Wheel(NamedTuple):
+    """
+    A wheel file, with the fields of its name (PEP 427).
+
+    Attributes
+    ----------
+    path : str
+        Path of the wheel file.
+    name : str
+        The normalized distribution name (see `requirements.normalize_name`).
+    version : str
+        The version.
+    python_tag, abi_tag, platform_tag : str
+        The compatibility tags (e.g. ``'py3'``, ``'none'``, ``'any'``).
+    """
+    path: str
+    name: str
+    version: str
+    python_tag: str
+    abi_tag: str
+    platform_tag: str
+
+    @property
+    def filename(self) -> str:
+        """The wheel's file name."""
+        return os.path.basename(self.path)
+
+    @property
+    def is_pure_python(self) -> bool:
+        """True if the wheel runs on any platform (``none-any``), as micropip needs for non-Pyodide wheels."""
+        return self.abi_tag == 'none' and self.platform_tag == 'any' and 'py3' in self.python_tag.split('.')
+
+
+def parse_wheel_filename(path: str) -> Optional[Wheel]:
+    """
+    Parse a wheel file name such as ``my_pkg-1.0-py3-none-any.whl``.
+
+    Parameters
+    ----------
+    path : str
+        Path (or name) of the file.
+
+    Returns
+    -------
+    Optional[Wheel]
+        The parsed wheel, or None if the name is not a valid wheel file name.
+    """
+    filename = os.path.basename(path)
+    if not filename.endswith('.whl'):
+        return None
+    parts = filename[:-len('.whl')].split('-')
+    if len(parts) not in (5, 6):
+        return None  # name-version[-build]-python-abi-platform
+    try:
+        version_key(parts[1])
+    except ValueError:
+        return None
+    return Wheel(path, normalize_name(parts[0]), parts[1], parts[-3], parts[-2], parts[-1])
+
+
+def find_wheels(wheelhouse: str) -> List[Wheel]:
+    """
+    List the pure-Python wheels in a wheelhouse directory (not recursive).
+
+    Platform-specific wheels are skipped with a warning.
+
+    Parameters
+    ----------
+    wheelhouse : str
+        The directory holding the wheels.
+
+    Returns
+    -------
+    List[Wheel]
+        The wheels, sorted by file name.
+
+    Raises
+    ------
+    ValueError
+        If the directory does not exist.
+    """
+    if not os.path.isdir(wheelhouse):
+        raise ValueError(f"WHEELHOUSE directory not found: {wheelhouse}")
+    wheels = []
+    for filename in sorted(os.listdir(wheelhouse)):
+        wheel = parse_wheel_filename(os.path.join(wheelhouse, filename))
+        if wheel is None:
+            continue
+        if not wheel.is_pure_python:
+            print(f"Warning: Skipping platform-specific wheel {filename} (only pure-Python wheels are embedded).")
+            continue
+        wheels.append(wheel)
+    return wheels
+
+
+def match_wheel(requirement: str, wheels: List[Wheel]) -> Optional[Wheel]:
+    """
+    Return the newest wheel satisfying a requirement.
+
+    Parameters
+    ----------
+    requirement : str
+        A requirement line (e.g. ``'my-pkg>=1.0'``).
+    wheels : List[Wheel]
+        Candidate wheels.
+
+    Returns
+    -------
+    Optional[Wheel]
+        The wheel with the highest matching version, or None if none matches,
+        the requirement has an environment marker, or it is not a plain named
+        requirement. As with pip and micropip, pre- and dev-releases are only
+        chosen if the specifier names one or no final release matches.
+    """
+    parsed = parse_requirement(requirement)
+    if parsed is None or parsed.marker:
+        return None
+    candidates = []
+    for wheel in wheels:
+        if wheel.name != parsed.key:
+            continue
+        try:
+            if version_matches(wheel.version, parsed.specifier):
+                candidates.append(wheel)
+        except ValueError:
+            continue
+    if not candidates:
+        return None
+    try:
+        prereleases = allows_prereleases(parsed.specifier)
+    except ValueError:
+        prereleases = False
+    if not prereleases:
+        candidates = [wheel for wheel in candidates if not is_prerelease(wheel.version)] or candidates
+    return max(candidates, key=lambda wheel: (version_key(wheel.version), wheel.filename))
+
+
+def embed_wheels(requirements: List[str], wheelhouse: str) -> Tuple[List[str], Dict[str, str]]:
+    """
+    Rewrite the requirements that a local wheel satisfies to install that wheel from the bundle.
+
+    Parameters
+    ----------
+    requirements : List[str]
+        The APP_REQUIREMENTS.
+    wheelhouse : str
+        The directory holding the wheels.
+
+    Returns
+    -------
+    Tuple[List[str], Dict[str, str]]
+        The rewritten requirements (``emfs:`` paths for embedded wheels, the
+        others unchanged, in the same order), and a mapping of each embedded
+        wheel's path in the bundle to its file on disk. Requirements with
+        extras are never rewritten, as the extras would be lost.
+    """
+    wheels = find_wheels(wheelhouse)
+    rewritten = []
+    embedded: Dict[str, str] = {}
+    for requirement in requirements:
+        wheel = match_wheel(requirement, wheels)
+        if wheel is None:
+            rewritten.append(requirement)
+            continue
+        if parse_requirement(requirement).extras:
+            print(f"Warning: Not embedding {wheel.filename} for requirement {requirement}: an embedded wheel "
+                  f"cannot install extras, so micropip will download it instead.")
+            rewritten.append(requirement)
+            continue
+        bundle_path = f'{WHEELS_BUNDLE_DIR}/{wheel.filename}'
+        emfs_path = f'emfs:{STLITE_HOME}/{bundle_path}'
+        if emfs_path not in rewritten:
+            rewritten.append(emfs_path)
+        embedded[bundle_path.replace('/', os.sep)] = wheel.path
+        print(f"  - Embedding wheel {wheel.filename} for requirement: {requirement}")
+    return rewritten, embedded
@@ -0,0 +1,46 @@
+import os
+import pytest
+
+
+@pytest.fixture(autouse=True, scope="session")
+def isolated_cache_dir(tmp_path_factory):
+    """Keep the persistent script2stlite caches out of the user's home directory during tests."""
+    previous = os.environ.get("S2S_CACHE_DIR")
+    os.environ["S2S_CACHE_DIR"] = str(tmp_path_factory.mktemp("s2s_cache"))
+    yield os.environ["S2S_CACHE_DIR"]
+    if previous is None:
+        os.environ.pop("S2S_CACHE_DIR", None)
+    else:
+        os.environ["S2S_CACHE_DIR"] = previous
+
+
+@pytest.fixture
+def write_tree():
+    """
+    Return a function that writes a mapping of relative path to content under a root directory.
+
+    Paths use ``/`` separators; content is ``str`` (written as UTF-8, line endings
+    untouched) or ``bytes``. Missing directories, including the root, are created.
+    """
+    def write(root, files):
+        for rel_path, content in files.items():
+            path = os.path.join(str(root), *rel_path.split("/"))
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as f:
+                f.write(content.encode("utf-8") if isinstance(content, str) else content)
+    return write
+
+
+@pytest.fixture
+def offline_versions(mocker):
+    """
+    Serve fixed stlite/Pyodide version lists instead of fetching them (opt-in).
+
+    Both conversion entry points share one mock, which is returned so a test
+    can set a different ``return_value``.
+    """
+    load_all_versions = mocker.MagicMock(
+        return_value=({"1": "css"}, "css", {"1": "js"}, "js", {"1": "pyodide"}, "pyodide"))
+    mocker.patch("script2stlite.script2stlite.load_all_versions", new=load_all_versions)
+    mocker.patch("script2stlite.in_memory.load_all_versions", new=load_all_versions)
+    return load_all_versions
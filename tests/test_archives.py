@@ -0,0 +1,128 @@
+import io
+import os
+import tarfile
+import zipfile
+
+import pytest
+
+from script2stlite import Script2StliteConverter, convert_app
+from script2stlite.script2stlite import s2s_convert
+from script2stlite.sources import TarSource, ZipSource, is_archive, open_source
+
+pytestmark = pytest.mark.usefixtures("offline_versions")
+
+APP_FILES = {
+    "app.py": "import streamlit as st\nst.write('archived')\n",
+    "pages/1_page.py": "import streamlit as st\n",
+    "data/table.csv": "a,b\n" + "1,2\n" * 5000,
+    "data/copy.csv": "a,b\n" + "1,2\n" * 5000,
+    "requirements.txt": "pandas\n",
+    ".s2signore": "*.log\n",
+    "debug.log": "ignored",
+}
+
+
+@pytest.fixture(autouse=True)
+def no_extraction(mocker):
+    for target in ("zipfile.ZipFile.extract", "zipfile.ZipFile.extractall",
+                   "tarfile.TarFile.extract", "tarfile.TarFile.extractall"):
+        mocker.patch(target, side_effect=AssertionError("archives must not be extracted"))
+
+
+def write_zip(path, files, prefix=""):
+    with zipfile.ZipFile(str(path), "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for rel_path, content in files.items():
+            archive.writestr(prefix + rel_path, content)
+
+
+def write_tar(path, files, mode="w:gz", prefix=""):
+    with tarfile.open(str(path), mode) as archive:
+        for rel_path, content in files.items():
+            data = content.encode("utf-8")
+            info = tarfile.TarInfo(prefix + rel_path)
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+
+
+def expected_html(tmp_path, write_tree, **kwargs):
+    project = tmp_path / "project"
+    write_tree(project, APP_FILES)
+    with open(convert_app(str(project), "Archived", "app.py", **kwargs).output_path, "rb") as f:
+        return f.read()
+
+
+@pytest.mark.parametrize("kind", ["zip", "tar", "tar.gz", "tar.xz"])
+def test_convert_app_from_archive_matches_directory(tmp_path, kind, write_tree):
+    expected = expected_html(tmp_path, write_tree, compress_assets=True)
+    archive = tmp_path / "artifacts" / f"app.{kind}"
+    archive.parent.mkdir()
+    if kind == "zip":
+        write_zip(archive, APP_FILES, prefix="app-1.0/")
+    else:
+        write_tar(archive, APP_FILES, mode="w" if kind == "tar" else f"w:{kind.split('.')[1]}", prefix="./")
+    assert is_archive(str(archive))
+
+    result = convert_app(str(archive), "Archived", "app.py", compress_assets=True, size_report=True)
+    assert result.output_path == os.path.join(str(archive.parent), "Archived.html")
+    with open(result.output_path, "rb") as f:
+        assert f.read() == expected
+    assert result.file_count == 4  # app.py, page, two csv files; debug.log ignored
+    assert result.cache_hits == result.cache_misses == 0
+    assert sorted(os.listdir(str(archive.parent))) == sorted([f"app.{kind}", "Archived.html", "Archived.html.size.json"])
+
+
+def test_archive_external_assets_are_streamed_next_to_archive(tmp_path):
+    archive = tmp_path / "app.zip"
+    write_zip(archive, APP_FILES)
+    converter = Script2StliteConverter(str(archive))
+    result = converter.convert_from_entrypoint("Archived", "app.py", external_asset_threshold=1000)
+    assert result.output_path == os.path.join(str(tmp_path), "Archived.html")
+    assets = sorted(os.listdir(str(tmp_path / "s2s_assets")))
+    assert [name.split(".")[0] for name in assets] == ["copy", "table"]
+    with open(os.path.join(str(tmp_path), "s2s_assets", assets[1]), encoding="utf-8") as f:
+        assert f.read() == APP_FILES["data/table.csv"]
+
+
+def test_s2s_convert_reads_settings_from_archive(tmp_path):
+    files = dict(APP_FILES)
+    files["settings.yaml"] = "APP_NAME: From Archive\nAPP_ENTRYPOINT: app.py\n"
+    archive = tmp_path / "app.tar"
+    write_tar(archive, files, mode="w")
+    result = s2s_convert(directory=str(archive))
+    with open(result.output_path, encoding="utf-8") as f:
+        html = f.read()
+    assert "<title>From Archive</title>" in html
+    assert "'pandas'" in html
+
+
+def test_archive_errors(tmp_path):
+    archive = tmp_path / "app.zip"
+    write_zip(archive, APP_FILES)
+    with pytest.raises(ValueError, match="Entrypoint file 'missing.py' not found"):
+        convert_app(str(archive), "Archived", "missing.py")
+    with pytest.raises(ValueError, match="No settings file"):
+        s2s_convert(directory=str(archive))
+    with pytest.raises(ValueError, match="Watch mode"):
+        Script2StliteConverter(str(archive)).watch(stop_event=None)
+
+
+def test_tar_source_skips_links_and_rejects_unsafe_paths(tmp_path):
+    archive = tmp_path / "app.tar"
+    with tarfile.open(str(archive), "w") as tar:
+        data = b"x = 1\n"
+        info = tarfile.TarInfo("app.py")
+        info.size = len(data)
+        tar.addfile(info, io.BytesIO(data))
+        link = tarfile.TarInfo("secret.py")
+        link.type = tarfile.SYMTYPE
+        link.linkname = "/etc/passwd"
+        tar.addfile(link)
+    with open_source(str(archive)) as source:
+        assert isinstance(source, TarSource)
+        assert source.paths() == ["app.py"]
+        assert source.read_text("app.py") == "x = 1\n"
+
+    unsafe = tmp_path / "unsafe.zip"
+    write_zip(unsafe, {"../evil.py": "x"})
+    with pytest.raises(ValueError):
+        ZipSource(str(unsafe))
@@ -0,0 +1,74 @@
+import base64
+import re
+import zlib
+
+import pytest
+
+from script2stlite.functions import create_html, escape_block_text
+
+SETTINGS = {
+    "|STLITE_CSS|": "css", "|STLITE_JS|": "js", "|PYODIDE_VERSION|": "pyodide",
+    "APP_NAME": "Blocks", "APP_ENTRYPOINT": "app.py", "EMBED_MODE": "blocks",
+}
+TRICKY_PY = 's = "</script><!-- %3C %25 ` ${x} \\\\ <p>"\nprint(s)\n'
+
+
+def make_app(tmp_path):
+    (tmp_path / "app.py").write_text("import streamlit as st", encoding="utf-8")
+    (tmp_path / "tricky.py").write_text(TRICKY_PY, encoding="utf-8")
+    (tmp_path / "data.csv").write_text("a,b\n" + "1,2\n" * 1000, encoding="utf-8")
+    (tmp_path / "logo.png").write_bytes(bytes(range(256)))
+    return tmp_path
+
+
+def unescape_block_text(text):
+    """Python equivalent of Bs() in the HTML template."""
+    return re.sub(r"%(25|3C)", lambda m: "%" if m.group(1) == "25" else "<", text)
+
+
+def block(html, block_id):
+    return re.search(rf'<script type="application/octet-stream" id="{block_id}">(.*?)</script>', html, re.S).group(1)
+
+
+def entry(html, name):
+    return re.search(rf'"{re.escape(name)}": (\w+)\((?:Bt\()?"([^"]+)"\)', html).groups()
+
+
+def test_escape_block_text_round_trip():
+    escaped = escape_block_text(TRICKY_PY)
+    assert "<" not in escaped
+    assert unescape_block_text(escaped) == TRICKY_PY
+
+
+def test_create_html_blocks(tmp_path):
+    """Payloads live in <script> blocks ahead of the module script; `files` only refers to them."""
+    html = create_html(str(make_app(tmp_path)), dict(SETTINGS, APP_FILES=["tricky.py", "data.csv", "logo.png"]))
+    module = html[html.index('<script type="module">'):]
+    assert '<script type="application/octet-stream"' not in module
+    assert TRICKY_PY not in module
+
+    decoder, block_id = entry(html, "tricky.py")
+    assert decoder == "Bs"
+    assert unescape_block_text(block(html, block_id)) == TRICKY_PY
+
+    decoder, block_id = entry(html, "logo.png")
+    assert decoder == "Ou"
+    assert base64.b64decode(block(html, block_id)) == bytes(range(256))
+
+
+def test_create_html_blocks_compressed(tmp_path):
+    html = create_html(str(make_app(tmp_path)), dict(SETTINGS, APP_FILES=["data.csv"], COMPRESS_ASSETS=True))
+    decoder, block_id = entry(html, "data.csv")
+    assert decoder == "Oz"
+    assert zlib.decompress(base64.b64decode(block(html, block_id))) == (tmp_path / "data.csv").read_bytes()
+
+
+def test_inline_mode_has_no_blocks(tmp_path):
+    html = create_html(str(make_app(tmp_path)), dict(SETTINGS, APP_FILES=["logo.png"], EMBED_MODE=None))
+    assert '<script type="application/octet-stream"' not in html
+    assert '"logo.png": Ou("' in html
+
+
+def test_invalid_embed_mode(tmp_path):
+    with pytest.raises(ValueError, match="EMBED_MODE"):
+        create_html(str(make_app(tmp_path)), dict(SETTINGS, APP_FILES=[], EMBED_MODE="template"))
@@ -0,0 +1,78 @@
+import json
+
+import pytest
+from unittest.mock import patch
+from script2stlite import convert_many
+from script2stlite.batch import expand_app_directories
+from script2stlite.cli import main
+
+MOCK_VERSIONS = (
+    {"0.1.0": "css_url"}, "css_url",
+    {"0.1.0": "js_url"}, "js_url",
+    {"0.1.0": "pyodide_url"}, "pyodide_url",
+)
+
+
+def make_apps(root, count):
+    for i in range(count):
+        app = root / f"app_{i}"
+        app.mkdir(parents=True)
+        (app / "app.py").write_text(f"import streamlit as st\nst.write({i})", encoding="utf-8")
+        (app / "data.csv").write_text(f"x\n{i}\n", encoding="utf-8")
+    return root
+
+
+def test_expand_app_directories(tmp_path):
+    make_apps(tmp_path / "apps", 3)
+    (tmp_path / "apps" / "not_a_dir.txt").write_text("x", encoding="utf-8")
+    found = expand_app_directories([str(tmp_path / "apps" / "*"), str(tmp_path / "apps" / "app_0")])
+    assert [p.rsplit("/", 1)[-1] for p in found] == ["app_0", "app_1", "app_2"]
+
+    with pytest.raises(ValueError, match="does not exist"):
+        expand_app_directories(str(tmp_path / "missing"))
+
+
+def test_convert_many_to_output_dir(tmp_path):
+    """Apps are converted in parallel to per-app destinations, with versions loaded once."""
+    make_apps(tmp_path / "apps", 3)
+    with patch("script2stlite.batch.load_all_versions", return_value=MOCK_VERSIONS) as mock_load:
+        report = convert_many(str(tmp_path / "apps" / "*"), output_dir=str(tmp_path / "dist"),
+                              entrypoint="app.py", workers=2, report_path=str(tmp_path / "report.json"))
+    mock_load.assert_called_once()
+
+    assert report["succeeded"] == 3 and report["failed"] == 0
+    for i, app in enumerate(report["apps"]):
+        output = tmp_path / "dist" / f"app_{i}" / f"app_{i}.html"
+        assert app["output"] == str(output)
+        assert app["bytes"] == output.stat().st_size
+        assert f"st.write({i})" in output.read_text(encoding="utf-8")
+    assert report["total_bytes"] == sum(a["bytes"] for a in report["apps"])
+    assert json.loads((tmp_path / "report.json").read_text())["succeeded"] == 3
+
+
+def test_convert_many_reports_failures(tmp_path):
+    """A failing app is reported without stopping the rest of the batch."""
+    make_apps(tmp_path / "apps", 2)
+    (tmp_path / "apps" / "app_1" / "app.py").unlink()
+    with patch("script2stlite.batch.load_all_versions", return_value=MOCK_VERSIONS):
+        report = convert_many(str(tmp_path / "apps" / "*"), entrypoint="app.py", workers=2)
+    assert report["succeeded"] == 1 and report["failed"] == 1
+    failed = [a for a in report["apps"] if a["status"] == "failed"][0]
+    assert failed["directory"].endswith("app_1")
+    assert failed["error"]
+
+
+def test_convert_many_rejects_colliding_destinations(tmp_path):
+    make_apps(tmp_path / "a", 1)
+    make_apps(tmp_path / "b", 1)
+    with pytest.raises(ValueError, match="would both be written"):
+        convert_many([str(tmp_path / "a" / "app_0"), str(tmp_path / "b" / "app_0")], output_dir=str(tmp_path / "dist"))
+
+
+def test_cli_batch(tmp_path):
+    make_apps(tmp_path / "apps", 2)
+    with patch("script2stlite.batch.load_all_versions", return_value=MOCK_VERSIONS):
+        code = main(["batch", str(tmp_path / "apps" / "*"), "--entrypoint", "app.py", "--workers", "2",
+                     "--output-dir", str(tmp_path / "dist")])
+    assert code == 0
+    assert (tmp_path / "dist" / "app_1" / "app_1.html").is_file()
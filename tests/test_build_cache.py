@@ -0,0 +1,142 @@
+import os
+import time
+
+from script2stlite import Script2StliteConverter
+from script2stlite.build_cache import BuildCache, clear_build_cache, prune_build_cache
+from script2stlite.cli import main
+from script2stlite.functions import create_html, iter_base64_chunks
+
+SETTINGS = {
+    "|STLITE_CSS|": "css", "|STLITE_JS|": "js", "|PYODIDE_VERSION|": "pyodide",
+    "APP_NAME": "Cached", "APP_ENTRYPOINT": "app.py",
+}
+
+
+def make_app(tmp_path):
+    app_dir = tmp_path / "cached_app"
+    app_dir.mkdir()
+    (app_dir / "app.py").write_text("import streamlit as st", encoding="utf-8")
+    (app_dir / "data.csv").write_text(f"a,b\n1,{os.urandom(8).hex()}\n", encoding="utf-8")
+    (app_dir / "logo.png").write_bytes(os.urandom(2048))
+    return app_dir
+
+
+def build(app_dir, cache_dir):
+    cache = BuildCache(str(app_dir), cache_dir=str(cache_dir))
+    html = create_html(str(app_dir), dict(SETTINGS, APP_FILES=["data.csv", "logo.png"]), cache=cache)
+    cache.save()
+    return html, cache
+
+
+def test_unchanged_files_are_cache_hits(tmp_path):
+    """A second build reuses every encoded asset and renders identical output."""
+    app_dir = make_app(tmp_path)
+    uncached = create_html(str(app_dir), dict(SETTINGS, APP_FILES=["data.csv", "logo.png"]))
+
+    first, cache = build(app_dir, tmp_path / "cache")
+    assert (cache.hits, cache.misses) == (0, 2)
+
+    second, cache = build(app_dir, tmp_path / "cache")
+    assert (cache.hits, cache.misses) == (2, 0)
+    assert first == second == uncached
+
+
+def test_changed_file_is_re_encoded(tmp_path):
+    """Only the file whose content changed is encoded again."""
+    app_dir = make_app(tmp_path)
+    build(app_dir, tmp_path / "cache")
+
+    (app_dir / "data.csv").write_text("a,b\n3,4\n", encoding="utf-8")
+    html, cache = build(app_dir, tmp_path / "cache")
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert html == create_html(str(app_dir), dict(SETTINGS, APP_FILES=["data.csv", "logo.png"]))
+
+
+def test_touched_file_with_same_content_is_a_hit(tmp_path):
+    """A new mtime alone does not trigger re-encoding: fragments are content-addressed."""
+    app_dir = make_app(tmp_path)
+    build(app_dir, tmp_path / "cache")
+
+    later = time.time() + 10
+    os.utime(app_dir / "logo.png", (later, later))
+    _, cache = build(app_dir, tmp_path / "cache")
+    assert (cache.hits, cache.misses) == (2, 0)
+
+
+def test_fragment_kinds_are_stored_separately(tmp_path):
+    """The same content cached under a different encoding kind is a miss."""
+    app_dir = make_app(tmp_path)
+    cache = BuildCache(str(app_dir), cache_dir=str(tmp_path / "cache"))
+    plain = "".join(cache.fragment("data.csv", "b64", iter_base64_chunks))
+    upper = "".join(cache.fragment("data.csv", "upper", lambda f: iter([f.read().decode().upper()])))
+    assert plain != upper
+    assert (cache.hits, cache.misses) == (0, 2)
+
+
+def test_converter_prints_cache_summary(tmp_path, capsys, offline_versions):
+    """Conversions report the asset cache hit/miss counts."""
+    app_dir = make_app(tmp_path)
+    converter = Script2StliteConverter(directory=str(app_dir))
+    converter.convert_from_entrypoint(app_name="Cached App", entrypoint="app.py")
+    converter.convert_from_entrypoint(app_name="Cached App", entrypoint="app.py")
+    out = capsys.readouterr().out
+    assert "* Asset cache: 0 hit(s), 2 miss(es)." in out
+    assert "* Asset cache: 2 hit(s), 0 miss(es)." in out
+
+
+def blob_files(cache_dir):
+    root = cache_dir / "build" / "blobs"
+    return sorted(p.name for p in root.rglob("*") if p.is_file()) if root.is_dir() else []
+
+
+def age(path, seconds):
+    then = time.time() - seconds
+    os.utime(path, (then, then))
+
+
+def test_unreferenced_fragments_are_pruned(tmp_path):
+    """Fragments no index refers to any more are deleted once they are past the grace period."""
+    app_dir = make_app(tmp_path)
+    cache_dir = tmp_path / "cache"
+    build(app_dir, cache_dir)
+    old_blobs = blob_files(cache_dir)
+    for path in (cache_dir / "build" / "blobs").rglob("*"):
+        if path.is_file():
+            age(path, 7200)
+
+    (app_dir / "data.csv").write_text("a,b\n3,4\n", encoding="utf-8")
+    build(app_dir, cache_dir)
+    new_blobs = blob_files(cache_dir)
+    assert len(new_blobs) == 2
+    assert len(set(old_blobs) & set(new_blobs)) == 1  # the old data.csv fragment is gone, logo.png is kept
+
+
+def test_size_cap_evicts_least_recently_used(tmp_path):
+    """Past the size cap, the least recently used fragments go first; evicted assets are just re-encoded."""
+    app_dir = make_app(tmp_path)
+    cache_dir = tmp_path / "cache"
+    _, cache = build(app_dir, cache_dir)
+    logo = cache._blob_path(cache.content_hash("logo.png"), "b64")
+    data = cache._blob_path(cache.content_hash("data.csv"), "b64")
+    age(logo, 100)
+    logo_size = os.path.getsize(logo)
+    assert prune_build_cache(str(cache_dir), max_bytes=os.path.getsize(data)) == (1, logo_size)
+    assert not os.path.exists(logo) and os.path.exists(data)
+
+    _, cache = build(app_dir, cache_dir)
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_clear_build_cache(tmp_path, capsys, monkeypatch):
+    app_dir = make_app(tmp_path)
+    cache_dir = tmp_path / "cache"
+    build(app_dir, cache_dir)
+    assert clear_build_cache(str(cache_dir)) > 0
+    assert not (cache_dir / "build").exists()
+    assert clear_build_cache(str(cache_dir)) == 0
+
+    build(app_dir, cache_dir)
+    monkeypatch.setenv("S2S_CACHE_DIR", str(cache_dir))
+    assert main(["clear-cache"]) == 0
+    assert "* Cleared the asset cache (" in capsys.readouterr().out
+    assert blob_files(cache_dir) == []
@@ -0,0 +1,68 @@
+import json
+import logging
+import os
+
+import pytest
+
+from script2stlite import BuildResult, Script2StliteConverter, StageTiming, convert_app
+from script2stlite.build_result import BuildTimer
+
+pytestmark = pytest.mark.usefixtures("offline_versions")
+
+STAGES = ["versions", "requirements", "discovery", "prepare", "encode", "render", "finalize"]
+
+
+def make_app(tmp_path):
+    (tmp_path / "app.py").write_text("import streamlit as st", encoding="utf-8")
+    (tmp_path / "requirements.txt").write_text("pandas\n", encoding="utf-8")
+    (tmp_path / "data.bin").write_bytes(os.urandom(50000))
+    return tmp_path
+
+
+def test_convert_app_returns_build_result(tmp_path):
+    app = make_app(tmp_path)
+    result = convert_app(str(app), "Timed", "app.py")
+    assert isinstance(result, BuildResult)
+    assert result.output_path == os.path.join(str(app), "Timed.html")
+    assert [stage.name for stage in result.stages] == STAGES
+    assert all(stage.wall_seconds >= 0 and stage.cpu_seconds >= 0 for stage in result.stages)
+    assert result.wall_seconds == pytest.approx(sum(stage.wall_seconds for stage in result.stages))
+
+    assert result.html_bytes == result.total_bytes == os.path.getsize(result.output_path)
+    assert result.file_count == 2
+    assert result.stage("requirements").bytes == len("pandas\n")
+    assert result.stage("discovery").bytes == 50000 + len("import streamlit as st")
+    assert result.stage("render").bytes == result.html_bytes
+    assert result.stage("encode").bytes == sum(entry["encoded_bytes"] for entry in result.size_report["files"])
+    assert (result.cache_hits, result.cache_misses) == (0, 1)
+
+    second = convert_app(str(app), "Timed", "app.py")
+    assert (second.cache_hits, second.cache_misses) == (1, 0)
+    json.dumps(second.to_dict())
+
+
+def test_stage_callback_and_logging(tmp_path, caplog):
+    app = make_app(tmp_path)
+    seen = []
+    with caplog.at_level(logging.INFO, logger="script2stlite.build"):
+        result = convert_app(str(app), "Timed", "app.py", on_stage=seen.append)
+    assert seen == result.stages
+    assert all(isinstance(stage, StageTiming) for stage in seen)
+    logged = [record.getMessage() for record in caplog.records if record.name == "script2stlite.build"]
+    assert [message.split(":")[0] for message in logged] == [f"stage {name}" for name in STAGES]
+
+
+def test_convert_with_settings_returns_build_result(tmp_path):
+    app = make_app(tmp_path)
+    (app / "settings.yaml").write_text("APP_NAME: Timed\nAPP_ENTRYPOINT: app.py\nAPP_FILES: []\n", encoding="utf-8")
+    result = Script2StliteConverter(str(app)).convert()
+    assert os.path.isfile(result.output_path)
+    assert result.stage("render") is not None
+
+
+def test_failed_stage_is_not_recorded():
+    timer = BuildTimer()
+    with pytest.raises(ValueError):
+        with timer.stage("discovery"):
+            raise ValueError("boom")
+    assert timer.stages == []
@@ -0,0 +1,75 @@
+import base64
+import io
+import json
+import os
+import re
+import zlib
+
+from script2stlite import convert_app
+from script2stlite.functions import create_html, iter_deflate_base64_chunks, should_compress
+
+SETTINGS = {
+    "|STLITE_CSS|": "css", "|STLITE_JS|": "js", "|PYODIDE_VERSION|": "pyodide",
+    "APP_NAME": "Compressed", "APP_ENTRYPOINT": "app.py",
+}
+
+
+def make_app(tmp_path):
+    (tmp_path / "app.py").write_text("import streamlit as st", encoding="utf-8")
+    rows = "\n".join(f"{i},country_{i % 20},{i * 3}" for i in range(5000))
+    (tmp_path / "medals.csv").write_text("id,country,medals\n" + rows, encoding="utf-8")
+    (tmp_path / "logo.png").write_bytes(os.urandom(4096))
+    return tmp_path
+
+
+def payload(html, name, helper):
+    return re.search(rf'"{re.escape(name)}": {helper}\("([^"]*)"\)', html).group(1)
+
+
+def test_iter_deflate_base64_chunks_round_trip():
+    """Chunked deflate+base64 output inflates back to the original bytes."""
+    data = b"abc,def\n" * 50_000
+    encoded = "".join(iter_deflate_base64_chunks(io.BytesIO(data), chunk_size=3 * 1000))
+    assert zlib.decompress(base64.b64decode(encoded)) == data
+    assert len(encoded) < len(data) / 10
+
+
+def test_should_compress_skips_compressed_formats():
+    assert should_compress("data/medallists.csv")
+    assert should_compress("countries.geo.json")
+    assert not should_compress("assets/logo.PNG")
+    assert not should_compress("model.parquet")
+
+
+def test_create_html_compress_assets(tmp_path):
+    """Text assets are embedded with Oz() and shrink; already-compressed assets keep Ou()."""
+    make_app(tmp_path)
+    settings = dict(SETTINGS, APP_FILES=["medals.csv", "logo.png"])
+    plain = create_html(str(tmp_path), dict(settings))
+    compressed = create_html(str(tmp_path), dict(settings, COMPRESS_ASSETS=True))
+
+    csv_bytes = (tmp_path / "medals.csv").read_bytes()
+    assert zlib.decompress(base64.b64decode(payload(compressed, "medals.csv", "Oz"))) == csv_bytes
+    assert payload(compressed, "logo.png", "Ou") == payload(plain, "logo.png", "Ou")
+    assert len(compressed) < len(plain) / 3
+    assert "new DecompressionStream(\"deflate\")" in compressed
+
+
+def test_convert_app_compress_assets_uses_cache(tmp_path, capsys, offline_versions):
+    """Compressed fragments are cached separately from plain ones and reused on rebuild."""
+    make_app(tmp_path)
+    convert_app(str(tmp_path), "Compressed App", "app.py", compress_assets=True)
+    convert_app(str(tmp_path), "Compressed App", "app.py", compress_assets=True)
+    out = capsys.readouterr().out
+    assert "* Asset cache: 2 hit(s), 0 miss(es)." in out
+    html = (tmp_path / "Compressed_App.html").read_text(encoding="utf-8")
+    assert '"medals.csv": Oz("' in html
+
+
+def test_decoder_prefers_native_base64(tmp_path):
+    """Assets are decoded asynchronously, preferring Uint8Array.fromBase64."""
+    html = create_html(str(make_app(tmp_path)), dict(SETTINGS, APP_FILES=["logo.png"]))
+    assert "async function Ou(n){if(Uint8Array.fromBase64)return Uint8Array.fromBase64(n);" in html
+    assert 'fetch("data:application/octet-stream;base64,"+n)' in html
+    assert "await Ou(n)" in html  # Oz() inflates the output of the same decoder
+    assert "files: await resolveFiles({" in html
@@ -0,0 +1,80 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from script2stlite.functions import load_all_versions
+
+LATENCY = 0.4
+
+INDICES = {
+    "/stylesheet.yaml": "0.1.0: https://cdn.example.com/stlite.css\n",
+    "/js.yaml": "0.1.0: https://cdn.example.com/stlite.js\n",
+    "/pyodide.yaml": "0.1.0: 'pyodideUrl: \"https://cdn.example.com/pyodide.js\",'\n",
+}
+
+
+class SlowIndexHandler(BaseHTTPRequestHandler):
+    """Serves the version indices after an artificial delay, with keep-alive."""
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        time.sleep(LATENCY)
+        body = INDICES.get(self.path)
+        if body is None:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        payload = body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/yaml")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def slow_server(tmp_path, monkeypatch):
+    monkeypatch.setenv("S2S_CACHE_DIR", str(tmp_path))
+    monkeypatch.setenv("S2S_VERSION_CACHE_TTL", "0")
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SlowIndexHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def fetch(base_url, concurrent):
+    return load_all_versions(
+        stylesheet_url=f"{base_url}/stylesheet.yaml",
+        js_url=f"{base_url}/js.yaml",
+        pyd_url=f"{base_url}/pyodide.yaml",
+        concurrent=concurrent,
+    )
+
+
+def test_concurrent_fetch_costs_one_round_trip(slow_server):
+    """The three indices are fetched in parallel: total time is close to a single request's latency."""
+    start = time.perf_counter()
+    versions = fetch(slow_server, concurrent=True)
+    elapsed = time.perf_counter() - start
+
+    assert versions[1] == "https://cdn.example.com/stlite.css"
+    assert versions[3] == "https://cdn.example.com/stlite.js"
+    assert "pyodide.js" in versions[5]
+    assert elapsed < 2 * LATENCY
+
+
+def test_sequential_fetch_matches_concurrent(slow_server):
+    """The sequential path returns the same result and pays one round trip per file."""
+    start = time.perf_counter()
+    sequential = fetch(slow_server, concurrent=False)
+    elapsed = time.perf_counter() - start
+
+    assert sequential == fetch(slow_server, concurrent=True)
+    assert elapsed >= 3 * LATENCY
@@ -45,7 +45,7 @@ def test_s2s_convert_core_no_app_files(tmp_path):
     """Test _s2s_convert_core works when APP_FILES is None in settings."""
     # This covers:
     # 1. settings.get('APP_FILES') is None -> app_files = []
-    # 2. discover_all_files returns nothing -> app_files remains []
+    # 2. scan_tree returns nothing -> app_files remains []
     # 3. settings.get('APP_ENTRYPOINT') not in app_files (if entrypoint is separate)
 
     directory = str(tmp_path)
@@ -53,10 +53,9 @@ def test_s2s_convert_core_no_app_files(tmp_path):
     settings = {'APP_NAME': 'Test', 'APP_ENTRYPOINT': 'app.py', 'APP_FILES': None}
 
     with patch('script2stlite.script2stlite.load_all_versions') as mock_load, \
-         patch('script2stlite.script2stlite.discover_all_files', return_value=[]), \
+         patch('script2stlite.script2stlite.scan_tree', return_value={}), \
          patch('script2stlite.script2stlite.file_exists', return_value=True), \
-         patch('script2stlite.script2stlite.create_html', return_value="<html></html>"), \
-         patch('script2stlite.script2stlite.write_text_file'):
+         patch('script2stlite.script2stlite.write_html'):
 
         mock_load.return_value = ({'0.82.0': 'css_url'}, 'css_url', {'0.82.0': 'js_url'}, 'js_url', {'0.27.4': 'py_url'}, 'py_url')
 
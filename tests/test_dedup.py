@@ -0,0 +1,74 @@
+import base64
+import os
+import re
+
+from script2stlite.functions import create_html, find_duplicate_files
+
+SETTINGS = {
+    "|STLITE_CSS|": "css", "|STLITE_JS|": "js", "|PYODIDE_VERSION|": "pyodide",
+    "APP_NAME": "Dedup", "APP_ENTRYPOINT": "app.py",
+}
+FILES = ["assets/logo.png", "pages/assets/logo.png", "data.csv", "pkg/__init__.py", "pkg2/__init__.py"]
+
+
+def make_app(tmp_path):
+    logo = os.urandom(3000)
+    (tmp_path / "app.py").write_text("import streamlit as st", encoding="utf-8")
+    for name, content in [("assets/logo.png", logo), ("pages/assets/logo.png", logo), ("data.csv", os.urandom(3000)),
+                          ("pkg/__init__.py", b""), ("pkg2/__init__.py", b"")]:
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(content)
+    return tmp_path, logo
+
+
+def test_find_duplicate_files(tmp_path):
+    """Only non-empty files with identical content are reported, mapped to their first copy."""
+    app, _ = make_app(tmp_path)
+    assert find_duplicate_files(str(app), FILES) == {"pages/assets/logo.png": "assets/logo.png"}
+    assert find_duplicate_files(str(app), FILES, exclude={"assets/logo.png": "url"}) == {}
+
+
+def test_inline_blob_table(tmp_path, capsys):
+    """Each duplicated payload is embedded once in the blob table and referenced by every path."""
+    app, logo = make_app(tmp_path)
+    html = create_html(str(app), dict(SETTINGS, APP_FILES=FILES))
+    table = re.search(r'const S2S_BLOBS = \[\nOu\("([^"]*)"\),\n\];\nmount\(', html)
+    assert base64.b64decode(table.group(1)) == logo
+    assert '"assets/logo.png": Bd(0),' in html
+    assert '"pages/assets/logo.png": Bd(0),' in html
+    assert html.count(table.group(1)) == 1
+    assert "Deduplicated 1 identical file(s) (3,000 bytes embedded only once)" in capsys.readouterr().out
+
+
+def test_blocks_share_first_copy(tmp_path):
+    app, logo = make_app(tmp_path)
+    html = create_html(str(app), dict(SETTINGS, APP_FILES=FILES, EMBED_MODE="blocks"))
+    assert '"assets/logo.png": Ou(Bt("s2s-asset-0")),' in html
+    assert '"pages/assets/logo.png": Ou(Bt("s2s-asset-0")),' in html
+    assert 'id="s2s-asset-1"' not in html
+    assert "S2S_BLOBS = [" not in html
+
+
+def test_no_blob_table_without_duplicates(tmp_path):
+    app, _ = make_app(tmp_path)
+    html = create_html(str(app), dict(SETTINGS, APP_FILES=["assets/logo.png", "data.csv"]))
+    assert "S2S_BLOBS = [" not in html
+
+
+def test_blocks_only_share_payloads_with_the_same_encoding(tmp_path):
+    """Identical files that are decoded differently in the browser get their own blocks."""
+    text = "x = 1\n" * 200
+    (tmp_path / "app.py").write_text("import streamlit as st", encoding="utf-8")
+    for name in ("a.py", "b.txt", "c.csv", "d.png"):
+        (tmp_path / name).write_text(text, encoding="utf-8")
+    files = ["a.py", "b.txt", "c.csv", "d.png"]
+    assert find_duplicate_files(str(tmp_path), files) == {"c.csv": "b.txt", "d.png": "b.txt"}
+    assert find_duplicate_files(str(tmp_path), files, compress=True) == {"c.csv": "b.txt"}
+
+    html = create_html(str(tmp_path), dict(SETTINGS, APP_FILES=files, EMBED_MODE="blocks", COMPRESS_ASSETS=True))
+    assert '"a.py": Bs("s2s-asset-0"),' in html
+    assert '"b.txt": Oz(Bt("s2s-asset-1")),' in html
+    assert '"c.csv": Oz(Bt("s2s-asset-1")),' in html
+    assert '"d.png": Ou(Bt("s2s-asset-3")),' in html
+    assert 'id="s2s-asset-2"' not in html
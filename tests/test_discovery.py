@@ -1,6 +1,7 @@
 import os
 import pytest
-from script2stlite.discovery import discover_all_files
+from script2stlite.build_cache import BuildCache
+from script2stlite.discovery import discover_all_files, load_build_manifest, scan_tree, update_build_manifest, MANIFEST_FILENAME
 from script2stlite import Script2StliteConverter
 
 def test_discover_all_files(tmp_path):
@@ -64,3 +65,86 @@ APP_FILES: []
 
     content = output_html.read_text(encoding="utf-8")
     assert '"sub.py":' in content
+
+def test_build_outputs_are_not_rediscovered(tmp_path, capsys):
+    """Rebuilding does not embed the previous bundle, so the output size is stable."""
+    app_dir = tmp_path / "rebuild_app"
+    app_dir.mkdir()
+    (app_dir / "main.py").write_text("import streamlit as st", encoding="utf-8")
+    (app_dir / "data.csv").write_text("a,b\n1,2\n", encoding="utf-8")
+
+    converter = Script2StliteConverter(directory=str(app_dir))
+    converter.convert_from_entrypoint(app_name="Rebuild App", entrypoint="main.py")
+    first = (app_dir / "Rebuild_App.html").read_bytes()
+
+    converter.convert_from_entrypoint(app_name="Rebuild App", entrypoint="main.py")
+    second = (app_dir / "Rebuild_App.html").read_bytes()
+
+    assert len(first) == len(second)
+    assert '"Rebuild_App.html"' not in second.decode("utf-8")
+    assert load_build_manifest(str(app_dir)) == {"Rebuild_App.html"}
+    assert MANIFEST_FILENAME not in discover_all_files(str(app_dir))
+    assert f"({len(first):,} bytes not re-embedded)" in capsys.readouterr().out
+
+def test_outputs_under_previous_app_name_stay_excluded(tmp_path):
+    """Outputs recorded in the manifest are excluded even after the app is renamed."""
+    app_dir = tmp_path / "rename_app"
+    app_dir.mkdir()
+    (app_dir / "main.py").write_text("import streamlit as st", encoding="utf-8")
+
+    converter = Script2StliteConverter(directory=str(app_dir))
+    converter.convert_from_entrypoint(app_name="Old Name", entrypoint="main.py")
+    converter.convert_from_entrypoint(app_name="New Name", entrypoint="main.py")
+
+    content = (app_dir / "New_Name.html").read_text(encoding="utf-8")
+    assert '"Old_Name.html"' not in content
+    assert load_build_manifest(str(app_dir)) == {"Old_Name.html", "New_Name.html"}
+
+    (app_dir / "Old_Name.html").unlink()
+    update_build_manifest(str(app_dir), [])
+    assert load_build_manifest(str(app_dir)) == {"New_Name.html"}
+
+def make_tree(root, files):
+    for name in files:
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(name, encoding="utf-8")
+    return root
+
+def test_scan_tree_parallel_matches_serial(tmp_path):
+    """Walking top-level directories in parallel finds the same files, with their stats."""
+    app_dir = make_tree(tmp_path, ["app.py", "a/x.py", "a/b/c/y.txt", "b/z.csv", "b/tmp.log", "c/d/e.bin",
+                                   "node_modules/m.js", "c/__pycache__/x.pyc"])
+    (app_dir / "b" / ".s2signore").write_text("*.log\n", encoding="utf-8")
+    serial = scan_tree(str(app_dir), workers=1)
+    parallel = scan_tree(str(app_dir), workers=4)
+    expected = {os.path.join(*name.split("/")) for name in ["app.py", "a/x.py", "a/b/c/y.txt", "b/z.csv", "c/d/e.bin"]}
+    assert set(serial) == set(parallel) == expected
+    for rel_path, stat in parallel.items():
+        assert stat.st_size == os.path.getsize(app_dir / rel_path)
+        assert stat.st_mtime_ns == os.stat(app_dir / rel_path).st_mtime_ns
+
+@pytest.mark.skipif(not hasattr(os, "symlink"), reason="symlinks not supported")
+def test_symlinked_directories(tmp_path):
+    """Symlinked directories are only walked on request, and loops are cut."""
+    shared = make_tree(tmp_path / "shared", ["lib.py"])
+    app_dir = make_tree(tmp_path / "app", ["app.py", "pkg/mod.py"])
+    try:
+        os.symlink(shared, app_dir / "shared", target_is_directory=True)
+        os.symlink(app_dir / "pkg", app_dir / "pkg" / "loop", target_is_directory=True)
+        os.symlink(app_dir, app_dir / "pkg" / "root", target_is_directory=True)
+        os.symlink(app_dir / "missing.py", app_dir / "broken.py")
+    except OSError:
+        pytest.skip("symlinks not permitted")
+
+    assert discover_all_files(str(app_dir)) == {"app.py", os.path.join("pkg", "mod.py")}
+    assert discover_all_files(str(app_dir), follow_symlinks=True) == {
+        "app.py", os.path.join("pkg", "mod.py"), os.path.join("shared", "lib.py")}
+
+def test_build_cache_reuses_discovery_stats(tmp_path, mocker):
+    app_dir = make_tree(tmp_path, ["app.py", "data.csv"])
+    stats = scan_tree(str(app_dir))
+    cache = BuildCache(str(app_dir), cache_dir=str(tmp_path / "cache"), stats=stats)
+    stat = mocker.patch("script2stlite.build_cache.os.stat", wraps=os.stat)
+    cache.content_hash("data.csv")
+    stat.assert_not_called()
@@ -0,0 +1,126 @@
+import os
+
+import pytest
+
+from script2stlite import convert_app
+from script2stlite.discovery import discover_all_files
+from script2stlite.ignore import IgnoreRules, compile_pattern
+from script2stlite.watch import snapshot_tree
+
+
+def make_tree(tmp_path, files):
+    for name in files:
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(name, encoding="utf-8")
+    return tmp_path
+
+
+@pytest.mark.parametrize("pattern, path, is_dir, expected", [
+    ("*.parquet.bak", "a.parquet.bak", False, True),
+    ("*.parquet.bak", "data/deep/b.parquet.bak", False, True),
+    ("*.parquet.bak", "a.parquet", False, False),
+    ("raw_data/", "raw_data", True, True),
+    ("raw_data/", "raw_data", False, False),
+    ("raw_data/", "sub/raw_data", True, True),
+    ("notebooks/**", "notebooks/a/b.ipynb", False, True),
+    ("notebooks/**", "notebooks", True, False),
+    ("notebooks/**", "sub/notebooks/a.ipynb", False, False),
+    ("/config.py", "config.py", False, True),
+    ("/config.py", "pkg/config.py", False, False),
+    ("docs/*.md", "docs/a.md", False, True),
+    ("docs/*.md", "docs/sub/a.md", False, False),
+    ("**/cache", "a/b/cache", True, True),
+    ("**/cache", "cache", True, True),
+    ("a/**/b", "a/b", False, True),
+    ("a/**/b", "a/x/y/b", False, True),
+    ("file?.txt", "file1.txt", False, True),
+    ("file?.txt", "file10.txt", False, False),
+    ("[ab].py", "a.py", False, True),
+    ("[!ab].py", "a.py", False, False),
+    ("\\#notes", "#notes", False, True),
+])
+def test_pattern_semantics(pattern, path, is_dir, expected):
+    assert IgnoreRules([pattern]).is_ignored(path, is_dir=is_dir) is expected
+
+
+@pytest.mark.parametrize("line", ["", "   ", "# comment", "/"])
+def test_blank_lines_and_comments(line):
+    assert compile_pattern(line) is None
+
+
+def test_last_match_wins():
+    rules = IgnoreRules(["*.csv", "!keep.csv", "keep.csv"])
+    assert rules.is_ignored("keep.csv")
+    rules = IgnoreRules(["*.csv", "!keep.csv"])
+    assert not rules.is_ignored("keep.csv")
+    assert rules.is_ignored("drop.csv")
+
+
+def test_discovery_applies_s2signore(tmp_path):
+    app = make_tree(tmp_path, ["app.py", "a.parquet.bak", "data/b.parquet.bak", "raw_data/big.bin",
+                               "notebooks/x.ipynb", "notebooks/demo.ipynb", "pages/page.py"])
+    (app / ".s2signore").write_text("# comment\n*.parquet.bak\nraw_data/\nnotebooks/*\n!notebooks/demo.ipynb\n",
+                                    encoding="utf-8")
+    assert discover_all_files(str(app)) == {"app.py", os.path.join("notebooks", "demo.ipynb"),
+                                            os.path.join("pages", "page.py")}
+
+
+def test_nested_s2signore_is_relative_to_its_directory(tmp_path):
+    app = make_tree(tmp_path, ["app.py", "tmp.txt", "pages/tmp.txt", "pages/page.py", "pages/local/x.py", "local/y.py"])
+    (app / "pages" / ".s2signore").write_text("tmp.txt\n/local/\n", encoding="utf-8")
+    assert discover_all_files(str(app)) == {"app.py", "tmp.txt", os.path.join("pages", "page.py"),
+                                            os.path.join("local", "y.py")}
+
+
+def test_ignored_directories_are_never_scanned(tmp_path, mocker):
+    app = make_tree(tmp_path, ["app.py", "raw_data/a/b/c.bin", "raw_data/d.bin"])
+    (app / ".s2signore").write_text("raw_data/\n", encoding="utf-8")
+    scandir = mocker.patch("os.scandir", wraps=os.scandir)
+    assert discover_all_files(str(app)) == {"app.py"}
+    scanned = {os.path.normpath(str(call.args[0])) for call in scandir.call_args_list}
+    assert os.path.normpath(str(app)) in scanned
+    assert str(app / "raw_data") not in scanned
+    assert str(app / "raw_data" / "a") not in scanned
+
+
+def test_gitignore_is_opt_in(tmp_path):
+    app = make_tree(tmp_path, ["app.py", "secret.txt"])
+    (app / ".gitignore").write_text("secret.txt\n", encoding="utf-8")
+    assert "secret.txt" in discover_all_files(str(app))
+    assert discover_all_files(str(app), use_gitignore=True) == {"app.py"}
+
+
+def test_convert_app_use_gitignore(tmp_path, offline_versions):
+    app = make_tree(tmp_path, ["app.py", "secret.txt", "scratch.py"])
+    (app / ".gitignore").write_text("secret.txt\n", encoding="utf-8")
+    (app / ".s2signore").write_text("scratch.py\n", encoding="utf-8")
+    convert_app(str(app), "Ignore", "app.py", use_gitignore=True)
+    html = (app / "Ignore.html").read_text(encoding="utf-8")
+    assert '"secret.txt":' not in html
+    assert '"scratch.py":' not in html
+    assert '".s2signore":' not in html
+
+
+def test_watch_tracks_s2signore(tmp_path):
+    app = make_tree(tmp_path, ["app.py"])
+    (app / ".s2signore").write_text("*.bak\n", encoding="utf-8")
+    assert ".s2signore" in snapshot_tree(str(app))
+
+
+def test_watch_snapshot_uses_build_settings(tmp_path):
+    """The watcher sees the same files as discovery, plus the ignore files that shape it."""
+    app = make_tree(tmp_path / "app", ["app.py", "secret.txt", "sub/.s2signore"])
+    (app / ".gitignore").write_text("secret.txt\n", encoding="utf-8")
+    assert "secret.txt" in snapshot_tree(str(app))
+    snapshot = snapshot_tree(str(app), use_gitignore=True)
+    assert "secret.txt" not in snapshot
+    assert {".gitignore", os.path.join("sub", ".s2signore")} <= set(snapshot)
+
+    shared = make_tree(tmp_path / "shared", ["lib.py"])
+    try:
+        os.symlink(shared, app / "shared", target_is_directory=True)
+    except (OSError, NotImplementedError):
+        pytest.skip("symlinks not permitted")
+    assert os.path.join("shared", "lib.py") not in snapshot_tree(str(app))
+    assert os.path.join("shared", "lib.py") in snapshot_tree(str(app), follow_symlinks=True)
@@ -0,0 +1,85 @@
+import json
+import zipfile
+
+import pytest
+
+from script2stlite import convert_app, convert_to_bytes
+from script2stlite.imports import check_requirements, distribution_for_module, find_imports, local_module_names
+
+pytestmark = pytest.mark.usefixtures("offline_versions")
+
+APP_FILES = {
+    "app.py": "import os\nimport streamlit as st\nimport pandas as pd\nfrom PIL import Image\nimport helpers\n",
+    "pages/1_plot.py": "import matplotlib.pyplot as plt\nfrom sklearn.linear_model import LinearRegression\n",
+    "helpers/__init__.py": "from . import io\nfrom helpers.io import load\nimport requests\n",
+    "helpers/io.py": "def load():\n    return '\\d'\n",
+    "requirements.txt": "pandas\nPillow\nscikit-learn\nseaborn\nmatplotlib\n",
+}
+
+
+def test_find_imports():
+    source = "import a.b, c\nfrom d.e import f\nfrom . import g\nfrom .h import i\ndef j():\n    import k\n"
+    assert find_imports(source) == {"a", "c", "d", "k"}
+    assert find_imports("def broken(:\n", "bad.py") == set()
+    assert local_module_names(["app.py", "helpers/io.py", "pages/1_a.py", "data/x.csv"]) == {"app", "helpers", "pages", "data"}
+    assert distribution_for_module("sklearn") == "scikit-learn"
+    assert distribution_for_module("streamlit_echarts") == "streamlit-echarts"
+
+
+def test_check_requirements_reports_unused_and_missing():
+    imports = {"app.py": {"os", "streamlit", "pandas", "PIL", "helpers"}, "pages/1_plot.py": {"sklearn", "bs4"},
+               "helpers/__init__.py": {"helpers", "requests"}}
+    unused, missing = check_requirements(["pandas", "Pillow", "scikit-learn>=1", "seaborn", "emfs:/x.whl"],
+                                         imports, {"app", "helpers", "pages"})
+    assert unused == ["seaborn"]
+    assert missing == {"bs4": ["pages/1_plot.py"], "requests": ["helpers/__init__.py"]}
+
+
+def test_namespace_packages_and_known_imports_count_as_used():
+    imports = {"app.py": {"google", "azure", "skimage2"}}
+    unused, missing = check_requirements(["google-generativeai", "azure-storage-blob", "protobuf", "imgpkg"],
+                                         imports, set())
+    assert unused == ["protobuf", "imgpkg"]
+    assert missing == {"skimage2": ["app.py"]}
+    # A Pyodide lock file's `imports` tell which distribution provides a module.
+    unused, missing = check_requirements(["imgpkg"], imports, set(), {"imgpkg": ["skimage2"]})
+    assert unused == [] and list(missing) == ["azure", "google"]
+    # Embedded wheels count as their distribution.
+    assert check_requirements(["emfs:/home/pyodide/s2s_wheels/my_pkg-1.0-py3-none-any.whl"],
+                              {"app.py": {"my_pkg"}}, set()) == ([], {})
+
+
+def test_conversion_warns_and_prunes(tmp_path, capsys, write_tree):
+    write_tree(tmp_path, APP_FILES)
+    result = convert_app(str(tmp_path), "Imports", "app.py")
+    out = capsys.readouterr().out
+    assert "Warning: Requirement seaborn is not imported by any bundled .py file" in out
+    assert "Warning: Module 'requests' is imported by helpers/__init__.py but no requirement provides it." in out
+    with open(result.output_path, encoding="utf-8") as f:
+        assert "'seaborn'" in f.read()
+
+    settings = {"APP_NAME": "Imports", "APP_ENTRYPOINT": "app.py", "PRUNE_REQUIREMENTS": True}
+    html = convert_to_bytes(str(tmp_path), settings=settings).decode("utf-8")
+    assert "Pruned requirement not imported by any bundled file: seaborn" in capsys.readouterr().out
+    assert "requirements: ['pandas', 'Pillow', 'scikit-learn', 'matplotlib']" in html
+
+    convert_to_bytes(str(tmp_path), settings=dict(settings, IMPORT_CHECK=False))
+    assert "Pruned" not in capsys.readouterr().out
+
+
+def test_pruning_keeps_namespace_and_embedded_requirements(tmp_path, capsys, write_tree):
+    write_tree(tmp_path, {"app.py": "import google.generativeai as genai\nimport my_pkg\nimport skimage2\n",
+                          "requirements.txt": "google-generativeai\nmy-pkg\nimgpkg\nseaborn\n"})
+    (tmp_path / "wheels").mkdir()
+    with zipfile.ZipFile(tmp_path / "wheels" / "my_pkg-1.0-py3-none-any.whl", "w") as wheel:
+        wheel.writestr("my_pkg/__init__.py", "")
+    (tmp_path / "pyodide-lock.json").write_text(json.dumps(
+        {"packages": {"imgpkg": {"name": "imgpkg", "version": "1.0", "imports": ["skimage2"]}}}))
+    settings = {"APP_NAME": "Imports", "APP_ENTRYPOINT": "app.py", "PRUNE_REQUIREMENTS": True,
+                "WHEELHOUSE": "wheels", "PYODIDE_LOCK": "pyodide-lock.json"}
+    html = convert_to_bytes(str(tmp_path), settings=settings).decode("utf-8")
+    out = capsys.readouterr().out
+    assert "Pruned requirement not imported by any bundled file: seaborn" in out
+    assert "no requirement provides it" not in out
+    assert ("requirements: ['google-generativeai', 'emfs:/home/pyodide/s2s_wheels/my_pkg-1.0-py3-none-any.whl', "
+            "'imgpkg==1.0']") in html
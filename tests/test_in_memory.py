@@ -0,0 +1,149 @@
+import io
+import os
+import zipfile
+
+import pytest
+
+from script2stlite import convert_app, convert_to_bytes, convert_to_stream
+from script2stlite.sources import DirectorySource, MappingSource, ZipSource, normalize_member_path, open_source
+
+pytestmark = pytest.mark.usefixtures("offline_versions")
+
+
+APP_FILES = {
+    "app.py": "import streamlit as st\nst.write(`${x}`)\n",
+    "pages/1_page.py": "import streamlit as st\r\nst.title('page')\r\n",
+    "data/logo.bin": bytes(range(256)) * 40,
+    "data/copy.bin": bytes(range(256)) * 40,
+    "requirements.txt": "pandas\n",
+    ".streamlit/config.toml": '[theme]\nbase = "dark"\n',
+    "notes.tmp": "scratch",
+    ".s2signore": "*.tmp\n",
+    "node_modules/x.js": "ignored",
+}
+
+
+def zip_bytes(files, prefix=""):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for rel_path, content in files.items():
+            archive.writestr(prefix + rel_path, content)
+    return buffer.getvalue()
+
+
+def tree_snapshot(root):
+    return sorted((os.path.relpath(os.path.join(d, f), str(root)), os.path.getmtime(os.path.join(d, f)))
+                  for d, _, files in os.walk(str(root)) for f in files)
+
+
+def test_directory_matches_file_conversion_and_writes_nothing(tmp_path, write_tree):
+    write_tree(tmp_path, APP_FILES)
+    before = tree_snapshot(tmp_path)
+    html = convert_to_bytes(str(tmp_path), app_name="Mem App", entrypoint="app.py",
+                            config=".streamlit/config.toml", compress_assets=True)
+    assert tree_snapshot(tmp_path) == before
+
+    result = convert_app(str(tmp_path), "Mem App", "app.py", config=".streamlit/config.toml",
+                         compress_assets=True)
+    with open(result.output_path, "rb") as f:
+        assert html == f.read()
+
+
+@pytest.mark.skipif(not hasattr(os, "symlink"), reason="symlinks not supported")
+def test_followed_symlinks_match_file_conversion(tmp_path, write_tree):
+    app_dir = tmp_path / "app"
+    write_tree(app_dir, {"app.py": "import streamlit as st\n"})
+    write_tree(tmp_path / "shared", {"data.csv": "a,b\n1,2\n"})
+    try:
+        os.symlink(tmp_path / "shared", app_dir / "linked", target_is_directory=True)
+    except OSError:
+        pytest.skip("symlinks not permitted")
+
+    html = convert_to_bytes(str(app_dir), entrypoint="app.py", follow_symlinks=True)
+    assert b'"linked/data.csv"' in html
+    result = convert_app(str(app_dir), "app", "app.py", follow_symlinks=True)
+    with open(result.output_path, "rb") as f:
+        assert html == f.read()
+
+
+def test_mapping_zip_and_directory_produce_the_same_bytes(tmp_path, write_tree):
+    write_tree(tmp_path, APP_FILES)
+    expected = convert_to_bytes(str(tmp_path), entrypoint="app.py", embed_mode="blocks")
+    assert convert_to_bytes(APP_FILES, entrypoint="app.py", embed_mode="blocks") == expected
+    assert convert_to_bytes(zip_bytes(APP_FILES), entrypoint="app.py", embed_mode="blocks") == expected
+    # Archives with a single top-level folder are rooted at that folder.
+    archive = tmp_path.parent / "app.zip"
+    archive.write_bytes(zip_bytes(APP_FILES, prefix="project-main/"))
+    assert convert_to_bytes(str(archive), entrypoint="app.py", embed_mode="blocks") == expected
+
+
+def test_output_content(tmp_path):
+    html = convert_to_bytes(APP_FILES, app_name="Mem App", entrypoint="app.py").decode("utf-8")
+    assert "<title>Mem App</title>" in html
+    assert "st.write(\\`\\${x}\\`)" in html
+    assert "st.title('page')\n" in html  # line endings normalized, as when read from disk
+    assert "'pandas'" in html
+    assert '"pages/1_page.py"' in html
+    assert "notes.tmp" not in html and "node_modules" not in html
+    assert "S2S_BLOBS" in html  # identical files embedded once
+
+
+def test_stream_is_chunked_and_equals_bytes():
+    chunks = list(convert_to_stream(APP_FILES, entrypoint="app.py", chunk_size=1024))
+    assert len(chunks) > 1
+    assert all(isinstance(chunk, bytes) for chunk in chunks)
+    assert b"".join(chunks) == convert_to_bytes(APP_FILES, entrypoint="app.py")
+
+
+def test_settings_yaml_in_source_is_used():
+    files = dict(APP_FILES)
+    files["settings.yaml"] = "APP_NAME: From Yaml\nAPP_ENTRYPOINT: app.py\nAPP_REQUIREMENTS:\n  - numpy\n"
+    html = convert_to_bytes(files).decode("utf-8")
+    assert "From Yaml" in html
+    assert "'numpy', 'pandas'" in html
+
+
+def test_settings_argument_is_not_modified():
+    settings = {"APP_NAME": "S", "APP_ENTRYPOINT": "app.py", "APP_FILES": [], "APP_REQUIREMENTS": []}
+    convert_to_bytes(APP_FILES, settings=settings)
+    assert settings == {"APP_NAME": "S", "APP_ENTRYPOINT": "app.py", "APP_FILES": [], "APP_REQUIREMENTS": []}
+
+
+def test_errors_are_raised_before_streaming():
+    with pytest.raises(ValueError, match="not found"):
+        convert_to_stream(APP_FILES, entrypoint="missing.py")
+    with pytest.raises(ValueError, match="settings.yaml"):
+        convert_to_stream({"app.py": "x"})
+    settings = {"APP_NAME": "S", "APP_ENTRYPOINT": "app.py", "EXTERNAL_ASSET_THRESHOLD": 10}
+    with pytest.raises(ValueError, match="EXTERNAL_ASSET_THRESHOLD"):
+        convert_to_stream(APP_FILES, settings=settings)
+    with pytest.raises(ValueError, match="zip"):
+        convert_to_bytes(b"not a zip", entrypoint="app.py")
+
+
+def test_member_paths_are_validated():
+    assert normalize_member_path("./pages//a.py") == os.path.join("pages", "a.py")
+    for bad in ("../secret.py", "/etc/passwd", "a/../../b", ""):
+        with pytest.raises(ValueError):
+            normalize_member_path(bad)
+    with pytest.raises(ValueError):
+        MappingSource({"../x.py": "x"})
+
+
+def test_sources(tmp_path, write_tree):
+    write_tree(tmp_path, APP_FILES)
+    with open_source(zip_bytes(APP_FILES)) as zipped:
+        assert isinstance(zipped, ZipSource)
+        mapped = open_source(APP_FILES)
+        directory = open_source(str(tmp_path))
+        assert isinstance(mapped, MappingSource) and isinstance(directory, DirectorySource)
+        for source in (zipped, mapped, directory):
+            logo = os.path.join("data", "logo.bin")
+            assert source.size(logo) == 256 * 40
+            assert source.sha256(logo) == directory.sha256(logo)
+            assert source.exists("app.py") and not source.exists("missing.py") and not source.exists("data")
+            assert source.discover() == directory.discover()
+            with pytest.raises(FileNotFoundError):
+                source.open("missing.py")
+        assert mapped.local_path("app.py") is None
+        assert directory.local_path("app.py") == os.path.join(str(tmp_path), "app.py")
@@ -0,0 +1,86 @@
+import json
+import os
+
+import pytest
+
+from script2stlite import convert_app, convert_to_bytes
+from script2stlite.reachability import find_reachable
+
+pytestmark = pytest.mark.usefixtures("offline_versions")
+
+FILES = {
+    "app.py": 'import helpers\nfrom pkg.sub import thing\nimport pandas as pd\ndf = pd.read_csv("data/a.csv")\n'
+              'LOGO = "assets/logo.png"\n',
+    "helpers.py": "from pathlib import Path\n\ndef load(name):\n"
+                  "    return open(Path(__file__).parent / 'cfg' / f'{name}.json')\n",
+    "cfg/x.json": "{}",
+    "cfg/y.json": "{}",
+    "pkg/__init__.py": "",
+    "pkg/sub.py": "from . import other\nfrom .deep import mod\nthing = 1\n",
+    "pkg/other.py": "",
+    "pkg/unused.py": "x = 1\n" * 100,
+    "pkg/deep/__init__.py": "",
+    "pkg/deep/mod.py": "import importlib\n\ndef plugin(name):\n    return importlib.import_module(name)\n",
+    "pkg/deep/plugin.py": "",
+    "data/a.csv": "a\n1\n",
+    "data/b.csv": "b\n" + "2\n" * 500,
+    "assets/logo.png": "png",
+    "assets/big.png": "x" * 2000,
+    "pages/1_reports.py": 'import glob\nglob.glob("reports/*.md")\nopen(f"logs/{day}.txt")\n',
+    "reports/a.md": "# a",
+    "reports/b.txt": "b",
+    "logs/1.txt": "log",
+    "dead/__init__.py": "",
+    "dead/mod.py": "import os\n" * 200,
+}
+UNREACHABLE = ["assets/big.png", "data/b.csv", "dead/__init__.py", "dead/mod.py", "pkg/unused.py", "reports/b.txt"]
+
+
+def test_find_reachable_follows_imports_paths_and_dynamic_fallbacks():
+    reachable, fallbacks = find_reachable(FILES, ["app.py"], FILES.__getitem__)
+    assert sorted(set(FILES) - reachable) == UNREACHABLE
+    # Computed paths include the folder of their literal prefix; a dynamic import its package.
+    assert fallbacks == ["logs", "cfg", "pkg/deep"]
+
+    files = {"app.py": "from pkg import *\n", "pkg/__init__.py": "__all__ = ['sub']\n", "pkg/sub.py": "",
+             "notes.txt": ""}
+    reachable, fallbacks = find_reachable(files, ["app.py"], files.__getitem__)
+    assert reachable == {"app.py", "pkg/__init__.py", "pkg/sub.py"} and fallbacks == ["pkg"]
+
+    files = {"app.py": "import os\nopen(os.environ['DATA'])\n", "sub/x.py": "", "y.txt": ""}
+    reachable, fallbacks = find_reachable(files, ["app.py"], files.__getitem__)
+    assert reachable == set(files) and fallbacks == [""]
+
+
+def test_reachable_discovery_mode(tmp_path, capsys, write_tree):
+    write_tree(tmp_path, FILES)
+    result = convert_app(str(tmp_path), "Shaken", "app.py", discovery_mode="reachable", size_report=True)
+    out = capsys.readouterr().out
+    removed_bytes = sum(len(FILES[f]) for f in UNREACHABLE)
+    assert f"Tree shaking: kept 15 of 21 discovered file(s); 6 unreachable file(s) left out ({removed_bytes:,} bytes)." in out
+    assert "including everything under pkg/deep/" in out
+    with open(result.output_path, encoding="utf-8") as f:
+        html = f.read()
+    assert '"pkg/sub.py"' in html and '"cfg/y.json"' in html and '"pkg/deep/plugin.py"' in html
+    assert '"dead/mod.py"' not in html and '"data/b.csv"' not in html
+    with open(result.output_path + ".size.json", encoding="utf-8") as f:
+        report = json.load(f)
+    assert report["tree_shaking"] == {"removed_files": UNREACHABLE, "removed_bytes": removed_bytes,
+                                      "dynamic_folders": ["logs", "cfg", "pkg/deep"]}
+
+    settings = {"APP_NAME": "Shaken", "APP_ENTRYPOINT": "app.py", "DISCOVERY_MODE": "reachable",
+                "APP_FILES": ["dead/mod.py"]}
+    html = convert_to_bytes(str(tmp_path), settings=settings).decode("utf-8")
+    assert '"dead/mod.py"' in html  # listed files are always bundled
+    assert '"pkg/unused.py"' not in html
+
+    with pytest.raises(ValueError, match="DISCOVERY_MODE"):
+        convert_app(str(tmp_path), "Shaken", "app.py", discovery_mode="some")
+
+
+def test_default_mode_bundles_everything(tmp_path, write_tree):
+    write_tree(tmp_path, FILES)
+    result = convert_app(str(tmp_path), "All", "app.py", size_report=True)
+    assert result.file_count == len(FILES)
+    assert "tree_shaking" not in result.size_report
+    assert os.path.isfile(result.output_path)
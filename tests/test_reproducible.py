@@ -0,0 +1,81 @@
+import hashlib
+import os
+import subprocess
+import sys
+
+from script2stlite import convert_app
+from script2stlite.discovery import load_build_manifest
+from script2stlite.functions import create_html
+
+SETTINGS = {
+    "|STLITE_CSS|": "css", "|STLITE_JS|": "js", "|PYODIDE_VERSION|": "pyodide",
+    "APP_NAME": "Repro", "APP_ENTRYPOINT": "app.py",
+}
+CONVERT_SCRIPT = """
+import sys
+from script2stlite.script2stlite import _s2s_convert_core
+settings = {"APP_NAME": "Repro", "APP_ENTRYPOINT": "app.py", "BUILD_CACHE": False}
+_s2s_convert_core(settings, sys.argv[1], versions=({"1": "css"}, "css", {"1": "js"}, "js", {"1": "pyodide"}, "pyodide"))
+"""
+
+
+def make_app(tmp_path):
+    (tmp_path / "app.py").write_text("import streamlit as st", encoding="utf-8")
+    for name in ["zeta.py", "alpha.csv", "pages/b.py", "pages/a.py", "assets/x.png", "m.json"]:
+        path = tmp_path / name
+        path.parent.mkdir(exist_ok=True)
+        path.write_bytes(name.encode("utf-8") * 10)
+    return tmp_path
+
+
+def sha256(path):
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def test_output_is_identical_across_hash_seeds(tmp_path):
+    """Discovery order no longer depends on set iteration order."""
+    app = make_app(tmp_path)
+    digests = set()
+    for seed in ("1", "2", "3"):
+        env = dict(os.environ, PYTHONHASHSEED=seed)
+        subprocess.run([sys.executable, "-c", CONVERT_SCRIPT, str(app)], env=env, check=True, capture_output=True)
+        digests.add(sha256(app / "Repro.html"))
+    assert len(digests) == 1
+
+
+def test_files_are_sorted(tmp_path, offline_versions):
+    app = make_app(tmp_path)
+    convert_app(str(app), "Repro", "app.py")
+    html = (app / "Repro.html").read_text(encoding="utf-8")
+    positions = [html.index(f'"{name}":') for name in ["alpha.csv", "assets/x.png", "m.json", "pages/a.py", "pages/b.py", "zeta.py"]]
+    assert positions == sorted(positions)
+
+
+def test_line_endings_are_normalized(tmp_path):
+    (tmp_path / "app.py").write_bytes(b"import streamlit as st\r\nst.write('hi')\r\n")
+    (tmp_path / "lib.py").write_bytes(b"x = 1\r\ny = 2\r\n")
+    html = create_html(str(tmp_path), dict(SETTINGS, APP_FILES=["lib.py"]))
+    assert "\r" not in html
+
+
+def test_config_serialization_is_stable_json(tmp_path):
+    """Config keys are sorted and string values are never rewritten."""
+    (tmp_path / "app.py").write_text("import streamlit as st", encoding="utf-8")
+    (tmp_path / "config.toml").write_text(
+        '[theme]\nfont = "TrueType"\nbase = "dark"\n[client]\nshowErrorDetails = false\n', encoding="utf-8")
+    html = create_html(str(tmp_path), dict(SETTINGS, APP_FILES=[], CONFIG="config.toml"))
+    assert 'streamlitConfig : {"client.showErrorDetails": false, "theme.base": "dark", "theme.font": "TrueType"},' in html
+
+
+def test_bundle_hash(tmp_path, offline_versions):
+    """The hash file matches the HTML, is only rewritten on change and is never embedded."""
+    app = make_app(tmp_path)
+    convert_app(str(app), "Repro", "app.py", bundle_hash=True)
+    hash_file = app / "Repro.html.sha256"
+    assert hash_file.read_text(encoding="utf-8") == f"{sha256(app / 'Repro.html')}  Repro.html\n"
+    assert "Repro.html.sha256" in load_build_manifest(str(app))
+
+    mtime = hash_file.stat().st_mtime_ns
+    convert_app(str(app), "Repro", "app.py", bundle_hash=True)
+    assert hash_file.stat().st_mtime_ns == mtime
+    assert "Repro.html.sha256" not in (app / "Repro.html").read_text(encoding="utf-8")
@@ -1,6 +1,7 @@
 import os
 import pytest
 from script2stlite import Script2StliteConverter
+from script2stlite.requirements import merge_requirements, unsatisfiable
 
 def test_requirements_file_merging(tmp_path):
     # Setup temporary app
@@ -43,8 +44,8 @@ numpy>=1.20
     # Parse requirements from the generated HTML JS object: requirements: ['...', ...]
     # We can just check string presence for now
 
-    # streamlit should be there (from settings or reqs)
-    assert "'streamlit'" in content
+    # streamlit is provided by stlite, so it is dropped from the requirements
+    assert "'streamlit'" not in content
 
     # pandas should be there (from reqs)
     assert "'pandas'" in content
@@ -78,3 +79,38 @@ APP_FILES: []
     content = output_html.read_text(encoding="utf-8")
 
     assert "'matplotlib'" in content
+
+
+def test_merge_requirements_normalizes_names_and_merges_specifiers():
+    merged = merge_requirements(
+        ["streamlit", "Pillow", "pandas", "numpy >= 1.20", "pillow", "pandas>=2", "Pandas[excel]<3",
+         "streamlit==1.30", 'pyarrow; python_version < "3.12"', "pyarrow", "emfs:/x.whl", "emfs:/x.whl"],
+        drop=["Streamlit"])
+    assert merged == ["Pillow", "pandas[excel]>=2,<3", "numpy >= 1.20", 'pyarrow; python_version < "3.12"',
+                      "pyarrow", "emfs:/x.whl"]
+    for specifier in ("==1.0,>=2", ">=2,<1", "<2,>=2", ">2,<=2", "==1.0,!=1.0", "~=1.4.2,>=1.5", ">=3,~=2.1"):
+        assert unsatisfiable(specifier), specifier
+    for specifier in ("", "==2.1,>=2", ">=2,<=2", "~=1.4.2,<1.4.9", "~=2.1,<3", "==1.*,>=2", "!=1.0", ">=2.x,<1"):
+        assert not unsatisfiable(specifier), specifier
+
+
+def test_duplicate_requirements_are_merged_in_html(tmp_path, capsys):
+    app_dir = tmp_path / "merge_app"
+    app_dir.mkdir()
+    (app_dir / "main.py").write_text("import streamlit as st", encoding="utf-8")
+    (app_dir / "settings.yaml").write_text(
+        "APP_NAME: Merge App\nAPP_ENTRYPOINT: main.py\nAPP_REQUIREMENTS:\n  - streamlit\n  - Pillow\n  - pandas\n",
+        encoding="utf-8")
+    (app_dir / "requirements.txt").write_text("streamlit\npillow\npandas>=2\n", encoding="utf-8")
+
+    Script2StliteConverter(directory=str(app_dir)).convert()
+    content = (app_dir / "Merge_App.html").read_text(encoding="utf-8")
+    assert "requirements: ['Pillow', 'pandas>=2']" in content
+    out = capsys.readouterr().out
+    assert "Dropped requirement provided by stlite: streamlit" in out
+    assert "Merged duplicate requirements ['pandas', 'pandas>=2'] into: pandas>=2" in out
+    assert "can match no version" not in out
+
+    (app_dir / "requirements.txt").write_text("numpy<2\nnumpy>=2\n", encoding="utf-8")
+    Script2StliteConverter(directory=str(app_dir)).convert()
+    assert "Warning: Requirement numpy<2,>=2 can match no version" in capsys.readouterr().out
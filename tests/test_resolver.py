@@ -0,0 +1,112 @@
+import json
+import os
+import zipfile
+
+import pytest
+
+from script2stlite import convert_app, convert_to_bytes
+from script2stlite.resolver import find_pyodide_lock, load_pyodide_lock, pyodide_version_number, resolve_requirements
+from script2stlite.wheels import find_wheels
+
+PYODIDE_URL = 'pyodideUrl: "https://cdn.jsdelivr.net/pyodide/v0.27.4/full/pyodide.js",'
+VERSIONS = ({"1": "css"}, "css", {"1": "js"}, "js", {"0.27.4": PYODIDE_URL}, PYODIDE_URL)
+
+LOCK = {
+    "info": {"version": "0.27.4", "python": "3.12.7"},
+    "packages": {
+        "numpy": {"name": "numpy", "version": "2.0.2", "depends": []},
+        "pandas": {"name": "pandas", "version": "2.2.3", "depends": ["numpy"]},
+        "scikit-learn": {"name": "scikit-learn", "version": "1.5.2", "depends": ["numpy"]},
+    },
+}
+
+
+@pytest.fixture(autouse=True)
+def pinned_pyodide(offline_versions):
+    offline_versions.return_value = VERSIONS
+
+
+def write_lock(path, lock=LOCK):
+    os.makedirs(os.path.dirname(str(path)), exist_ok=True)
+    with open(str(path), "w", encoding="utf-8") as f:
+        json.dump(lock, f)
+
+
+def write_wheel(directory, filename):
+    os.makedirs(str(directory), exist_ok=True)
+    with zipfile.ZipFile(os.path.join(str(directory), filename), "w") as wheel:
+        wheel.writestr("pkg/__init__.py", "")
+
+
+def test_resolve_requirements_pins_locked_and_indexed_versions(tmp_path):
+    write_lock(tmp_path / "pyodide-lock.json")
+    version, locked = load_pyodide_lock(str(tmp_path / "pyodide-lock.json"))
+    assert version == "0.27.4" and locked["scikit-learn"].version == "1.5.2"
+    write_wheel(tmp_path / "index", "streamlit_echarts-0.4.0-py3-none-any.whl")
+    write_wheel(tmp_path / "index", "streamlit_echarts-0.5.1-py3-none-any.whl")
+
+    requirements = ["streamlit", "Pandas[excel]>=2", 'scikit_learn; python_version >= "3.10"',
+                    "streamlit-echarts>=0.4.0", "numpy<2", "missing-pkg", "emfs:/home/pyodide/x.whl"]
+    resolved, problems = resolve_requirements(requirements, locked, find_wheels(str(tmp_path / "index")), "0.27.4")
+    assert resolved == ["streamlit", "Pandas[excel]==2.2.3", 'scikit_learn==1.5.2; python_version >= "3.10"',
+                        "streamlit-echarts==0.5.1", "numpy<2", "missing-pkg", "emfs:/home/pyodide/x.whl"]
+    assert problems == ["numpy<2: Pyodide 0.27.4 ships numpy 2.0.2, which does not match <2",
+                        "missing-pkg: not available in Pyodide 0.27.4 or the local package index"]
+
+
+def test_invalid_versions_are_reported_not_raised(tmp_path):
+    lock = {"packages": dict(LOCK["packages"], openssl={"name": "openssl", "version": "1.1.1n"})}
+    write_lock(tmp_path / "pyodide-lock.json", lock)
+    _, locked = load_pyodide_lock(str(tmp_path / "pyodide-lock.json"))
+    resolved, problems = resolve_requirements(["pandas>=2.x", "openssl>=1", "numpy"], locked)
+    assert resolved == ["pandas>=2.x", "openssl>=1", "numpy==2.0.2"]
+    assert len(problems) == 2 and all("cannot be checked against" in problem for problem in problems)
+
+
+def test_find_pyodide_lock(tmp_path):
+    assert pyodide_version_number(PYODIDE_URL) == "0.27.4"
+    assert pyodide_version_number("pyodide") is None and pyodide_version_number(None) is None
+    write_lock(tmp_path / "locks" / "0.27.4" / "pyodide-lock.json")
+    write_lock(tmp_path / "locks" / "pyodide-lock-0.26.0.json")
+    locks = str(tmp_path / "locks")
+    assert find_pyodide_lock(locks, "0.27.4") == os.path.join(locks, "0.27.4", "pyodide-lock.json")
+    assert find_pyodide_lock(locks, "0.26.0") == os.path.join(locks, "pyodide-lock-0.26.0.json")
+    with pytest.raises(ValueError, match="0.25.0"):
+        find_pyodide_lock(locks, "0.25.0")
+    with pytest.raises(ValueError, match="PYODIDE_LOCK not found"):
+        find_pyodide_lock(str(tmp_path / "missing.json"), "0.27.4")
+    (tmp_path / "bad.json").write_text("{}")
+    with pytest.raises(ValueError, match="not a Pyodide lock file"):
+        load_pyodide_lock(str(tmp_path / "bad.json"))
+
+
+def test_convert_app_emits_pinned_requirements(tmp_path, capsys):
+    (tmp_path / "app.py").write_text("import streamlit as st\n")
+    (tmp_path / "requirements.txt").write_text("pandas>=2\nnumpy\n")
+    write_lock(tmp_path / "locks" / "0.27.4" / "pyodide-lock.json")
+    result = convert_app(str(tmp_path), "Pinned", "app.py", pyodide_lock="locks")
+    with open(result.output_path, encoding="utf-8") as f:
+        html = f.read()
+    assert "'pandas==2.2.3', 'numpy==2.0.2'" in html
+    assert "Pinned requirement: pandas>=2 -> pandas==2.2.3" in capsys.readouterr().out
+    # The lock file is only read at build time, not embedded.
+    assert "pyodide-lock" not in html
+    assert convert_to_bytes(str(tmp_path), app_name="Pinned", entrypoint="app.py", pyodide_lock="locks") == \
+        open(result.output_path, "rb").read()
+
+
+def test_unavailable_requirements_warn_or_fail(tmp_path, capsys):
+    (tmp_path / "app.py").write_text("import streamlit as st\n")
+    (tmp_path / "requirements.txt").write_text("not-in-pyodide\n")
+    write_lock(tmp_path / "pyodide-lock.json", dict(LOCK, info={"version": "0.26.0"}))
+    result = convert_app(str(tmp_path), "Pinned", "app.py", pyodide_lock="pyodide-lock.json")
+    out = capsys.readouterr().out
+    assert "Warning: Unresolved requirement not-in-pyodide: not available in Pyodide 0.27.4" in out
+    assert "is for Pyodide 0.26.0, but Pyodide 0.27.4 is selected" in out
+    with open(result.output_path, encoding="utf-8") as f:
+        assert "'not-in-pyodide'" in f.read()
+
+    with pytest.raises(ValueError, match="could not be resolved"):
+        convert_app(str(tmp_path), "Pinned", "app.py", pyodide_lock="pyodide-lock.json", resolve_action="fail")
+    with pytest.raises(ValueError, match="RESOLVE_ACTION"):
+        convert_app(str(tmp_path), "Pinned", "app.py", pyodide_lock="pyodide-lock.json", resolve_action="ignore")
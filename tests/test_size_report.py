@@ -0,0 +1,118 @@
+import base64
+import json
+import os
+
+import pytest
+
+from script2stlite import convert_app
+from script2stlite.discovery import load_build_manifest
+from script2stlite.functions import write_html
+from script2stlite.size_report import SizeRecorder, build_size_report, check_size_budget
+
+pytestmark = pytest.mark.usefixtures("offline_versions")
+SETTINGS = {
+    "|STLITE_CSS|": "css", "|STLITE_JS|": "js", "|PYODIDE_VERSION|": "pyodide",
+    "APP_NAME": "Sizes", "APP_ENTRYPOINT": "app.py",
+}
+
+
+def make_app(tmp_path):
+    logo = os.urandom(3000)
+    (tmp_path / "app.py").write_text("import streamlit as st\nst.write('hé')\n", encoding="utf-8")
+    (tmp_path / "lib.py").write_text("x = 1\n", encoding="utf-8")
+    (tmp_path / "assets").mkdir()
+    (tmp_path / "assets" / "logo.png").write_bytes(logo)
+    (tmp_path / "assets" / "copy.png").write_bytes(logo)
+    (tmp_path / "data.csv").write_text("a,b\n" + "1,2\n" * 500, encoding="utf-8")
+    return tmp_path
+
+
+def load_report(app):
+    return json.loads((app / "Sizes.html.size.json").read_text(encoding="utf-8"))
+
+
+def test_recorded_sizes_match_the_html(tmp_path):
+    """Each file's encoded bytes are exactly the bytes it adds to the HTML."""
+    app = make_app(tmp_path)
+    recorder = SizeRecorder()
+    write_html(str(app / "out.html"), str(app), dict(SETTINGS, APP_FILES=["data.csv", "lib.py"]), recorder=recorder)
+    html = (app / "out.html").read_text(encoding="utf-8")
+    payload = base64.b64encode((app / "data.csv").read_bytes()).decode("ascii")
+    assert recorder.encoded["data.csv"] == len(f'"data.csv": Ou("{payload}"),')
+    assert recorder.encoded["lib.py"] == len('"lib.py":`x = 1\n`,')
+    assert recorder.encoded["app.py"] == len("import streamlit as st\nst.write('hé')\n".encode("utf-8"))
+    assert sum(recorder.encoded.values()) < len(html.encode("utf-8"))
+
+
+def test_size_report(tmp_path, capsys):
+    app = make_app(tmp_path)
+    convert_app(str(app), "Sizes", "app.py", extra_files=["lib.py"], size_report=True)
+    report = load_report(app)
+    files = {entry["path"]: entry for entry in report["files"]}
+
+    assert list(files) == sorted(files)
+    assert report["html_bytes"] == report["total_bytes"] == os.path.getsize(app / "Sizes.html")
+    assert report["template_bytes"] + sum(e["encoded_bytes"] for e in files.values()) == report["html_bytes"]
+    assert sum(e["source_bytes"] for e in files.values()) == report["source_bytes"]
+    assert files["app.py"]["included_by"] == "APP_ENTRYPOINT"
+    assert files["lib.py"]["included_by"] == "APP_FILES"
+    assert files["data.csv"]["included_by"] == "auto-discovery"
+    assert files["data.csv"]["source_bytes"] == os.path.getsize(app / "data.csv")
+    assert files["data.csv"]["share"] == round(files["data.csv"]["encoded_bytes"] / report["total_bytes"], 6)
+
+    # The second copy of the logo only costs its Bd() reference.
+    assert files["assets/logo.png"]["embedding"] == "shared"
+    assert files["assets/logo.png"]["duplicate_of"] == "assets/copy.png"
+    assert files["assets/logo.png"]["encoded_bytes"] < 50
+    assert report["dedup_saved_bytes"] == 3000
+
+    out = capsys.readouterr().out
+    assert f"* Bundle size: {report['total_bytes']:,} bytes (5 file(s); largest: assets/copy.png" in out
+    assert "Sizes.html.size.json" in load_build_manifest(str(app))
+
+    convert_app(str(app), "Sizes", "app.py", size_report=True)
+    assert "Sizes.html.size.json" not in (app / "Sizes.html").read_text(encoding="utf-8")
+
+
+def test_size_report_external_and_blocks(tmp_path):
+    app = make_app(tmp_path)
+    convert_app(str(app), "Sizes", "app.py", size_report=True, external_asset_threshold=2500, embed_mode="blocks")
+    report = load_report(app)
+    files = {entry["path"]: entry for entry in report["files"]}
+    assert files["assets/copy.png"]["embedding"] == "external"
+    assert files["assets/copy.png"]["encoded_bytes"] > 3000
+    assert files["data.csv"]["embedding"] == "blocks"
+    assert report["external_bytes"] == 6000
+    assert report["total_bytes"] == report["html_bytes"] + 6000
+
+
+def test_budget_warns(tmp_path, capsys):
+    app = make_app(tmp_path)
+    convert_app(str(app), "Sizes", "app.py", size_budget_per_file=3000)
+    out = capsys.readouterr().out
+    assert "Warning: size budget exceeded: assets/copy.png takes" in out
+    assert "data.csv" not in out.split("Warning:", 1)[1].splitlines()[0]
+
+
+def test_budget_fails_after_writing_report(tmp_path):
+    app = make_app(tmp_path)
+    with pytest.raises(RuntimeError, match=r"Bundle size budget exceeded \(1 violation\(s\)\): total size"):
+        convert_app(str(app), "Sizes", "app.py", size_report=True, size_budget_total=1000, size_budget_action="fail")
+    report = load_report(app)
+    assert report["budget"]["violations"] and report["budget"]["action"] == "fail"
+    assert (app / "Sizes.html").exists()
+
+
+@pytest.mark.parametrize("kwargs", [{"size_budget_total": -1}, {"size_budget_per_file": "1MB"},
+                                    {"size_budget_action": "explode"}])
+def test_invalid_budget(tmp_path, kwargs):
+    app = make_app(tmp_path)
+    with pytest.raises(ValueError, match="SIZE_BUDGET"):
+        convert_app(str(app), "Sizes", "app.py", **kwargs)
+    assert not (app / "Sizes.html").exists()
+
+
+def test_check_size_budget_without_limits(tmp_path):
+    report = {"total_bytes": 10, "files": [{"path": "a", "encoded_bytes": 10}]}
+    assert check_size_budget(report) == []
+    assert report["budget"] == {"total": None, "per_file": None, "action": "warn", "violations": []}
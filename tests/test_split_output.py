@@ -0,0 +1,95 @@
+import json
+import os
+import re
+
+import pytest
+
+from script2stlite import convert_app
+from script2stlite.discovery import load_build_manifest
+from script2stlite.functions import EXTERNAL_ASSETS_DIRNAME, create_html, hashed_asset_name
+
+SETTINGS = {
+    "|STLITE_CSS|": "css", "|STLITE_JS|": "js", "|PYODIDE_VERSION|": "pyodide",
+    "APP_NAME": "Split", "APP_ENTRYPOINT": "app.py",
+}
+
+
+def make_app(tmp_path):
+    (tmp_path / "app.py").write_text("import streamlit as st", encoding="utf-8")
+    (tmp_path / "data").mkdir()
+    (tmp_path / "data" / "big.csv").write_bytes(os.urandom(50_000))
+    (tmp_path / "small.json").write_text('{"a": 1}', encoding="utf-8")
+    (tmp_path / "helper.py").write_text("x = 1\n" * 20_000, encoding="utf-8")
+    return tmp_path
+
+
+def external_url(html, name):
+    match = re.search(rf'"{re.escape(name)}": {{url: new URL\(("[^"]*"), document.baseURI\).href}},', html)
+    return json.loads(match.group(1)) if match else None
+
+
+def test_hashed_asset_name():
+    assert hashed_asset_name("data/big.csv", "0123456789abcdef" * 4) == "big.0123456789abcdef.csv"
+    assert hashed_asset_name("LICENSE", "ab" * 32) == "LICENSE.abababababababab"
+
+
+def test_create_html_places_large_assets_outside(tmp_path):
+    """Assets over the threshold are copied under hashed names; small assets and .py files stay inline."""
+    app = make_app(tmp_path)
+    out = tmp_path / "site"
+    settings = dict(SETTINGS, APP_FILES=["data/big.csv", "small.json", "helper.py"], EXTERNAL_ASSET_THRESHOLD=10_000)
+    html = create_html(str(app), settings, output_dir=str(out))
+
+    url = external_url(html, "data/big.csv")
+    assert url is not None and url.startswith(EXTERNAL_ASSETS_DIRNAME + "/big.")
+    assert (out / url).read_bytes() == (app / "data" / "big.csv").read_bytes()
+    assert '"small.json": Ou("' in html
+    assert '"helper.py":`' in html
+
+
+def test_unchanged_asset_keeps_its_name(tmp_path):
+    """The hashed name changes only when the content changes."""
+    app = make_app(tmp_path)
+    settings = dict(SETTINGS, APP_FILES=["data/big.csv"], EXTERNAL_ASSET_THRESHOLD=0)
+    first = external_url(create_html(str(app), settings), "data/big.csv")
+    assert external_url(create_html(str(app), settings), "data/big.csv") == first
+
+    (app / "data" / "big.csv").write_bytes(b"changed")
+    second = external_url(create_html(str(app), settings), "data/big.csv")
+    assert second != first
+    assert (app / second).read_bytes() == b"changed"
+
+
+def test_invalid_threshold(tmp_path):
+    app = make_app(tmp_path)
+    with pytest.raises(ValueError, match="EXTERNAL_ASSET_THRESHOLD"):
+        create_html(str(app), dict(SETTINGS, APP_FILES=[], EXTERNAL_ASSET_THRESHOLD="1MB"))
+
+
+def test_convert_app_records_external_assets(tmp_path, offline_versions):
+    """External assets are recorded as build outputs and never embedded by later builds."""
+    app = make_app(tmp_path)
+    convert_app(str(app), "Split", "app.py", external_asset_threshold=10_000)
+    convert_app(str(app), "Split", "app.py", external_asset_threshold=10_000)
+
+    html = (app / "Split.html").read_text(encoding="utf-8")
+    url = external_url(html, "data/big.csv")
+    assert os.path.join(*url.split("/")) in load_build_manifest(str(app))
+    assert EXTERNAL_ASSETS_DIRNAME not in html.replace(f'"{url}"', "")
+
+
+def test_unused_assets_are_deleted(tmp_path, offline_versions, capsys):
+    """Rebuilding after an asset changes deletes its old copy, unless another app still refers to it."""
+    app = make_app(tmp_path)
+    convert_app(str(app), "Split", "app.py", external_asset_threshold=10_000)
+    convert_app(str(app), "Other", "app.py", external_asset_threshold=10_000)
+    shared = os.path.join(*external_url((app / "Split.html").read_text(encoding="utf-8"), "data/big.csv").split("/"))
+
+    (app / "data" / "big.csv").write_bytes(os.urandom(50_000))
+    convert_app(str(app), "Split", "app.py", external_asset_threshold=10_000)
+    assert (app / shared).is_file()  # still used by Other.html
+    convert_app(str(app), "Other", "app.py", external_asset_threshold=10_000)
+    assert f"Deleted unused asset: {shared}" in capsys.readouterr().out
+    assert not (app / shared).exists()
+    assert shared not in load_build_manifest(str(app))
+    assert len(os.listdir(app / EXTERNAL_ASSETS_DIRNAME)) == 1
@@ -0,0 +1,84 @@
+import base64
+import io
+import os
+import tracemalloc
+from unittest.mock import patch
+
+import pytest
+from script2stlite import functions
+from script2stlite.functions import create_html, iter_base64_chunks, iter_file_base64, write_html
+
+SETTINGS = {
+    "|STLITE_CSS|": "css", "|STLITE_JS|": "js", "|PYODIDE_VERSION|": "pyodide",
+    "APP_NAME": "Stream", "APP_ENTRYPOINT": "app.py",
+}
+
+
+class ShortReadStream(io.BytesIO):
+    """A stream that returns fewer bytes than requested, like a socket or pipe."""
+    def read(self, size=-1):
+        return super().read(min(size, 7) if size and size > 0 else size)
+
+
+def test_iter_base64_chunks_matches_b64encode():
+    """Chunked encoding concatenates to the same text as one-shot encoding."""
+    data = os.urandom(10_000)
+    expected = base64.b64encode(data).decode("ascii")
+    assert "".join(iter_base64_chunks(io.BytesIO(data), chunk_size=300)) == expected
+    assert "".join(iter_base64_chunks(ShortReadStream(data), chunk_size=300)) == expected
+
+
+def test_iter_base64_chunks_rejects_bad_chunk_size():
+    with pytest.raises(ValueError, match="multiple of 3"):
+        list(iter_base64_chunks(io.BytesIO(b"abc"), chunk_size=4))
+
+
+def test_iter_file_base64_mmap_path(tmp_path):
+    """Files above the mmap threshold are encoded from a memory map with the same result."""
+    path = tmp_path / "blob.bin"
+    data = os.urandom(50_000)
+    path.write_bytes(data)
+    with patch.object(functions, "MMAP_THRESHOLD", 1024):
+        encoded = "".join(iter_file_base64(str(path), chunk_size=3 * 1000))
+    assert encoded == base64.b64encode(data).decode("ascii")
+
+
+def test_write_html_matches_create_html(tmp_path):
+    """The streamed file is identical to the in-memory rendering."""
+    (tmp_path / "app.py").write_text("import streamlit as st", encoding="utf-8")
+    (tmp_path / "data.bin").write_bytes(os.urandom(1000))
+    settings = dict(SETTINGS, APP_FILES=["data.bin"])
+    out = tmp_path / "out.html"
+
+    write_html(str(out), str(tmp_path), dict(settings))
+    assert out.read_text(encoding="utf-8") == create_html(str(tmp_path), dict(settings))
+    assert not (tmp_path / "out.html.tmp").exists()
+
+
+def test_write_html_leaves_no_partial_file(tmp_path):
+    """A missing asset aborts the build without leaving a truncated or temporary file."""
+    (tmp_path / "app.py").write_text("import streamlit as st", encoding="utf-8")
+    settings = dict(SETTINGS, APP_FILES=["missing.bin"])
+    out = tmp_path / "out.html"
+
+    with pytest.raises(FileNotFoundError):
+        write_html(str(out), str(tmp_path), settings)
+    assert not out.exists()
+    assert not (tmp_path / "out.html.tmp").exists()
+
+
+def test_write_html_memory_is_bounded(tmp_path):
+    """Peak Python memory while streaming stays far below the bundle size."""
+    (tmp_path / "app.py").write_text("import streamlit as st", encoding="utf-8")
+    (tmp_path / "big.bin").write_bytes(os.urandom(8 * 1024 * 1024))
+    settings = dict(SETTINGS, APP_FILES=["big.bin"])
+
+    tracemalloc.start()
+    try:
+        write_html(str(tmp_path / "out.html"), str(tmp_path), settings)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert (tmp_path / "out.html").stat().st_size > 10 * 1024 * 1024
+    assert peak < 2 * 1024 * 1024
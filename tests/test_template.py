@@ -0,0 +1,46 @@
+import pytest
+from script2stlite.template import parse_template, render_template, template_placeholders
+from script2stlite.functions import create_html
+
+
+def test_parse_template_segments():
+    """Templates are split into literal and placeholder segments."""
+    segments = parse_template("<title>|APP_NAME|</title>|CONFIG|")
+    assert segments == (("<title>", False), ("|APP_NAME|", True), ("</title>", False), ("|CONFIG|", True))
+    assert template_placeholders(parse_template("|A| |B| |A|")) == ("|A|", "|B|")
+
+
+def test_parse_template_ignores_non_placeholders():
+    """Lower-case or empty pipe pairs (e.g. JS `||`) are literal text."""
+    assert parse_template("a || b |not_one|") == (("a || b |not_one|", False),)
+
+
+def test_parse_template_is_cached():
+    """Parsing the same text twice returns the cached result."""
+    text = "cached |APP_NAME| template"
+    assert parse_template(text) is parse_template(text)
+
+
+def test_render_template_single_pass():
+    """Substituted values are not scanned for further placeholders."""
+    segments = parse_template("|APP_HOME| / |CONFIG|")
+    html = render_template(segments, {"|APP_HOME|": "print('|CONFIG|')", "|CONFIG|": "{}"})
+    assert html == "print('|CONFIG|') / {}"
+
+
+def test_render_template_missing_value():
+    """A placeholder without a value raises ValueError."""
+    with pytest.raises(ValueError, match=r"\|APP_NAME\|"):
+        render_template(parse_template("|APP_NAME|"), {})
+
+
+def test_create_html_leaves_placeholders_in_user_code(tmp_path):
+    """Placeholder-like text inside the entrypoint survives into the HTML unchanged."""
+    (tmp_path / "app.py").write_text("st.write('|CONFIG| and |SHARED_WORKER_OPTION|')", encoding="utf-8")
+    settings = {
+        "|STLITE_CSS|": "css", "|STLITE_JS|": "js", "|PYODIDE_VERSION|": "pyodide",
+        "APP_NAME": "Test", "APP_ENTRYPOINT": "app.py", "APP_FILES": [],
+    }
+    html = create_html(str(tmp_path), settings)
+    assert "st.write('|CONFIG| and |SHARED_WORKER_OPTION|')" in html
+    assert "streamlitConfig : {}," in html
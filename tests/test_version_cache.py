@@ -0,0 +1,79 @@
+import pytest
+import requests
+from unittest.mock import MagicMock, patch
+from script2stlite.version_cache import load_versions_yaml, load_snapshot, get_cache_dir
+
+URL = "http://example.com/stlite_versions/js.yaml"
+
+
+def make_response(status_code=200, text="0.1.0: url-a\n", headers=None):
+    response = MagicMock()
+    response.status_code = status_code
+    response.text = text
+    response.headers = headers or {}
+    response.raise_for_status = MagicMock()
+    return response
+
+
+def test_fresh_cache_makes_no_network_call(tmp_path):
+    """A cached index younger than the TTL is returned without touching the network."""
+    with patch("requests.get", return_value=make_response(headers={"ETag": '"v1"'})) as mock_get:
+        assert load_versions_yaml(URL, cache_dir=str(tmp_path)) == {"0.1.0": "url-a"}
+        assert load_versions_yaml(URL, cache_dir=str(tmp_path)) == {"0.1.0": "url-a"}
+        assert mock_get.call_count == 1
+
+
+def test_expired_cache_revalidates_with_etag(tmp_path):
+    """An expired cache entry is revalidated with conditional headers and kept on 304."""
+    headers = {"ETag": '"v1"', "Last-Modified": "Wed, 01 Jan 2025 00:00:00 GMT"}
+    with patch("requests.get", return_value=make_response(headers=headers)):
+        load_versions_yaml(URL, cache_dir=str(tmp_path), ttl=0)
+
+    with patch("requests.get", return_value=make_response(status_code=304, text="")) as mock_get:
+        assert load_versions_yaml(URL, cache_dir=str(tmp_path), ttl=0) == {"0.1.0": "url-a"}
+        sent = mock_get.call_args[1]["headers"]
+        assert sent["If-None-Match"] == '"v1"'
+        assert sent["If-Modified-Since"] == headers["Last-Modified"]
+
+
+def test_network_failure_uses_stale_cache(tmp_path):
+    """A stale cached copy is used when the network request fails."""
+    with patch("requests.get", return_value=make_response(text="0.2.0: url-b\n")):
+        load_versions_yaml(URL, cache_dir=str(tmp_path), ttl=0)
+
+    with patch("requests.get", side_effect=requests.exceptions.ConnectionError("offline")):
+        assert load_versions_yaml(URL, cache_dir=str(tmp_path), ttl=0) == {"0.2.0": "url-b"}
+
+
+def test_network_failure_falls_back_to_snapshot(tmp_path):
+    """Without a cached copy the snapshot shipped with the package is used."""
+    with patch("requests.get", side_effect=requests.exceptions.Timeout("slow")) as mock_get:
+        data = load_versions_yaml(URL, cache_dir=str(tmp_path), ttl=0)
+        assert data == load_snapshot(URL)
+        assert len(data) > 0
+
+        # Subsequent calls skip the network for a while after a failure.
+        load_versions_yaml(URL, cache_dir=str(tmp_path), ttl=0)
+        assert mock_get.call_count == 1
+
+
+def test_offline_mode_skips_network(tmp_path, monkeypatch):
+    """S2S_OFFLINE=1 never issues a request."""
+    monkeypatch.setenv("S2S_OFFLINE", "1")
+    with patch("requests.get") as mock_get:
+        data = load_versions_yaml("http://example.com/pyodide.yaml", cache_dir=str(tmp_path))
+        mock_get.assert_not_called()
+    assert any("pyodide" in value for value in data.values())
+
+
+def test_no_cache_and_no_snapshot_raises(tmp_path):
+    """An unknown index that cannot be fetched raises RuntimeError."""
+    with patch("requests.get", side_effect=requests.exceptions.ConnectionError("offline")):
+        with pytest.raises(RuntimeError, match="no cached copy is available"):
+            load_versions_yaml("http://example.com/unknown.yaml", cache_dir=str(tmp_path), ttl=0)
+
+
+def test_cache_dir_env_override(tmp_path, monkeypatch):
+    """S2S_CACHE_DIR overrides the default cache location."""
+    monkeypatch.setenv("S2S_CACHE_DIR", str(tmp_path))
+    assert get_cache_dir() == str(tmp_path)
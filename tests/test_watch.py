@@ -0,0 +1,96 @@
+import threading
+import time
+import urllib.request
+
+from script2stlite import Script2StliteConverter
+from script2stlite.watch import LiveReloadServer, RELOAD_SNIPPET, snapshot_tree
+
+
+def wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def test_snapshot_ignores_build_outputs(tmp_path, offline_versions):
+    """Writing the bundle does not change the watched snapshot."""
+    (tmp_path / "app.py").write_text("x = 1", encoding="utf-8")
+    converter = Script2StliteConverter(directory=str(tmp_path))
+    converter.convert_from_entrypoint(app_name="Watch App", entrypoint="app.py")
+    before = snapshot_tree(str(tmp_path))
+    assert "app.py" in before
+    assert "Watch_App.html" not in before
+
+    converter.convert_from_entrypoint(app_name="Watch App", entrypoint="app.py")
+    assert snapshot_tree(str(tmp_path)) == before
+
+
+def test_live_reload_server_injects_snippet_and_streams_reload(tmp_path):
+    """The dev server injects the reload script and pushes a reload event on notify."""
+    (tmp_path / "App.html").write_text("<html><body>hi</body></html>", encoding="utf-8")
+    server = LiveReloadServer(str(tmp_path), page="App.html", port=0)
+    server.start()
+    try:
+        page = urllib.request.urlopen(server.url, timeout=5).read().decode("utf-8")
+        assert RELOAD_SNIPPET + "</body>" in page
+
+        events = urllib.request.urlopen(server.url + "__s2s_events", timeout=5)
+        assert events.readline() == b": connected\n"
+        events.readline()
+        server.notify_reload()
+        assert events.readline() == b"data: reload\n"
+    finally:
+        server.stop()
+
+
+def test_watch_debounces_and_rebuilds(tmp_path, offline_versions):
+    """A burst of saves results in a single rebuild containing the latest content."""
+    (tmp_path / "app.py").write_text("st.write('v1')", encoding="utf-8")
+    converter = Script2StliteConverter(directory=str(tmp_path))
+
+    builds = []
+    original = converter.convert_from_entrypoint
+
+    def counting_convert(**kwargs):
+        original(**kwargs)
+        builds.append(time.monotonic())
+
+    converter.convert_from_entrypoint = counting_convert
+    stop = threading.Event()
+    thread = threading.Thread(
+        target=converter.watch,
+        kwargs=dict(app_name="Watch App", entrypoint="app.py", serve=False, open_browser=False,
+                    poll_interval=0.05, debounce=0.3, stop_event=stop),
+        daemon=True,
+    )
+    thread.start()
+    try:
+        assert wait_for(lambda: len(builds) == 1)
+        for i in range(2, 5):
+            (tmp_path / "app.py").write_text(f"st.write('v{i}')", encoding="utf-8")
+            time.sleep(0.1)
+        saved = time.monotonic()
+        assert wait_for(lambda: len(builds) == 2)
+        time.sleep(0.5)
+        assert len(builds) == 2
+        assert builds[1] - saved < 1.0
+        html = (tmp_path / "Watch_App.html").read_text(encoding="utf-8")
+        assert "st.write('v4')" in html
+    finally:
+        stop.set()
+        thread.join(timeout=5)
+
+
+def test_watch_scans_with_the_build_settings(tmp_path, mocker, offline_versions):
+    """The watched tree is scanned with the same USE_GITIGNORE/FOLLOW_SYMLINKS as the build."""
+    watch = mocker.patch("script2stlite.script2stlite._watch")
+    converter = Script2StliteConverter(directory=str(tmp_path))
+    converter.watch(app_name="Watch App", entrypoint="app.py", use_gitignore=True)
+    assert watch.call_args.kwargs["scan_options"]() == {"use_gitignore": True, "follow_symlinks": False}
+
+    (tmp_path / "settings.yaml").write_text("APP_NAME: Watch App\nFOLLOW_SYMLINKS: true\n", encoding="utf-8")
+    converter.watch()
+    assert watch.call_args.kwargs["scan_options"]() == {"use_gitignore": False, "follow_symlinks": True}
@@ -0,0 +1,119 @@
+import base64
+import os
+import zipfile
+
+import pytest
+
+from script2stlite import convert_app, convert_to_bytes
+from script2stlite.requirements import normalize_name, parse_requirement, version_key, version_matches
+from script2stlite.wheels import embed_wheels, find_wheels, match_wheel, parse_wheel_filename
+
+pytestmark = pytest.mark.usefixtures("offline_versions")
+
+
+def write_wheel(directory, filename):
+    path = os.path.join(str(directory), filename)
+    os.makedirs(str(directory), exist_ok=True)
+    with zipfile.ZipFile(path, "w") as wheel:
+        wheel.writestr("pkg/__init__.py", f"# {filename}\n")
+    return path
+
+
+def make_project(root, requirements="my-pkg>=1.0\nother\n"):
+    (root / "app.py").write_text("import streamlit as st\n")
+    (root / "requirements.txt").write_text(requirements)
+    wheelhouse = root / "wheels"
+    write_wheel(wheelhouse, "my_pkg-1.0-py3-none-any.whl")
+    write_wheel(wheelhouse, "my_pkg-1.2-py2.py3-none-any.whl")
+    write_wheel(wheelhouse, "my_pkg-2.0-cp311-cp311-manylinux_2_17_x86_64.whl")
+    write_wheel(wheelhouse, "unused-0.1-py3-none-any.whl")
+    return wheelhouse
+
+
+def test_requirement_parsing_and_versions():
+    parsed = parse_requirement('Foo_Bar[plot] >= 1.2, <2 ; python_version >= "3.10"')
+    assert parsed.key == "foo-bar" and parsed.extras == "[plot]"
+    assert parsed.specifier == ">=1.2,<2" and parsed.marker == 'python_version >= "3.10"'
+    for line in ("emfs:/home/pyodide/x.whl", "https://example.com/x.whl", "-r other.txt", "pkg @ https://x/y.whl"):
+        assert parse_requirement(line) is None
+    assert normalize_name("Foo.Bar__baz") == "foo-bar-baz"
+    assert version_key("1.0") == version_key("1.0.0")
+    assert sorted(["1.0", "1.0rc1", "1.0.post1", "1.0.dev1", "0.9"], key=version_key) == \
+        ["0.9", "1.0.dev1", "1.0rc1", "1.0", "1.0.post1"]
+    assert version_matches("1.4.2", "~=1.4.0") and not version_matches("1.5", "~=1.4.0")
+    assert version_matches("1.4.2", "==1.4.*") and not version_matches("1.4.2", "!=1.4.*")
+    assert version_matches("2.0", "") and not version_matches("2.0", ">=1,<2")
+
+
+def test_wheel_matching(tmp_path):
+    wheelhouse = make_project(tmp_path)
+    assert parse_wheel_filename("not-a-wheel.zip") is None
+    wheels = find_wheels(str(wheelhouse))
+    assert [wheel.filename for wheel in wheels] == ["my_pkg-1.0-py3-none-any.whl", "my_pkg-1.2-py2.py3-none-any.whl",
+                                                   "unused-0.1-py3-none-any.whl"]
+    assert match_wheel("My.Pkg", wheels).version == "1.2"
+    assert match_wheel("my-pkg<1.2", wheels).version == "1.0"
+    assert match_wheel("my-pkg>=2", wheels) is None
+    assert match_wheel('my-pkg; sys_platform == "emscripten"', wheels) is None
+
+    requirements, embedded = embed_wheels(["streamlit", "my-pkg==1.0", "unused"], str(wheelhouse))
+    assert requirements == ["streamlit", "emfs:/home/pyodide/s2s_wheels/my_pkg-1.0-py3-none-any.whl",
+                            "emfs:/home/pyodide/s2s_wheels/unused-0.1-py3-none-any.whl"]
+    assert embedded == {os.path.join("s2s_wheels", name): os.path.join(str(wheelhouse), name)
+                        for name in ("my_pkg-1.0-py3-none-any.whl", "unused-0.1-py3-none-any.whl")}
+    with pytest.raises(ValueError, match="WHEELHOUSE"):
+        find_wheels(str(tmp_path / "missing"))
+
+
+def test_prereleases_and_extras(tmp_path, capsys):
+    write_wheel(tmp_path, "mypkg-1.0-py3-none-any.whl")
+    write_wheel(tmp_path, "mypkg-2.0rc1-py3-none-any.whl")
+    write_wheel(tmp_path, "beta-1.0b2-py3-none-any.whl")
+    wheels = find_wheels(str(tmp_path))
+    assert match_wheel("mypkg", wheels).version == "1.0"
+    assert match_wheel("mypkg>=1.0", wheels).version == "1.0"
+    assert match_wheel("mypkg>=2.0rc1", wheels).version == "2.0rc1"
+    assert match_wheel("beta", wheels).version == "1.0b2"  # only pre-releases match
+
+    requirements, embedded = embed_wheels(["mypkg[extra]>=1.0", "beta"], str(tmp_path))
+    assert requirements == ["mypkg[extra]>=1.0", "emfs:/home/pyodide/s2s_wheels/beta-1.0b2-py3-none-any.whl"]
+    assert list(embedded) == [os.path.join("s2s_wheels", "beta-1.0b2-py3-none-any.whl")]
+    assert "Warning: Not embedding mypkg-1.0-py3-none-any.whl for requirement mypkg[extra]>=1.0" in capsys.readouterr().out
+
+
+def test_convert_app_embeds_matching_wheels(tmp_path):
+    make_project(tmp_path)
+    result = convert_app(str(tmp_path), "Wheels", "app.py", wheelhouse="wheels", size_report=True)
+    with open(result.output_path, encoding="utf-8") as f:
+        html = f.read()
+    emfs_path = "emfs:/home/pyodide/s2s_wheels/my_pkg-1.2-py2.py3-none-any.whl"
+    assert f"'{emfs_path}', 'other'" in html
+    assert '"s2s_wheels/my_pkg-1.2-py2.py3-none-any.whl"' in html
+    with open(tmp_path / "wheels" / "my_pkg-1.2-py2.py3-none-any.whl", "rb") as f:
+        assert base64.b64encode(f.read()).decode("ascii") in html
+    # The wheelhouse itself is not discovered as app files.
+    assert "wheels/my_pkg-1.0" not in html and "unused-0.1" not in html
+    report = {entry["path"]: entry for entry in result.size_report["files"]}
+    assert report["s2s_wheels/my_pkg-1.2-py2.py3-none-any.whl"]["included_by"] == "WHEELHOUSE"
+
+    # A second (cached) build produces the same bytes.
+    again = convert_app(str(tmp_path), "Wheels", "app.py", wheelhouse="wheels", size_report=True)
+    assert again.cache_hits > 0
+    with open(again.output_path, encoding="utf-8") as f:
+        assert f.read() == html
+
+
+def test_in_memory_conversion_embeds_wheels(tmp_path):
+    make_project(tmp_path)
+    expected = convert_app(str(tmp_path), "Wheels", "app.py", wheelhouse="wheels").output_path
+    with open(expected, "rb") as f:
+        expected_bytes = f.read()
+    assert convert_to_bytes(str(tmp_path), app_name="Wheels", entrypoint="app.py", wheelhouse="wheels") == expected_bytes
+
+
+def test_no_matching_wheel_leaves_requirements_unchanged(tmp_path):
+    make_project(tmp_path, requirements="pandas\n")
+    result = convert_app(str(tmp_path), "Wheels", "app.py", wheelhouse="wheels")
+    with open(result.output_path, encoding="utf-8") as f:
+        html = f.read()
+    assert "'pandas'" in html and "emfs:" not in html and "s2s_wheels" not in html